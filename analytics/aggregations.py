@@ -1,34 +1,281 @@
 """
 Responsibility:
 Provides functions to aggregate activity data over time and categories.
-All functions operate on raw log dictionaries.
+
+The core is a stream of per-day summaries (iter_day_summaries) computed
+one day at a time, so any iterable of day logs, including one streamed
+from the Store, is folded in constant memory. aggregate_logs /
+aggregate_user fold the stream into an ActivityAggregates object. The
+per-metric functions accept raw log dictionaries, which they stream, or
+an ActivityAggregates, so callers that already hold one never walk the
+activities again.
 """
 
-from typing import Dict, List
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+from core.columnar import ActivityTable, ColumnarUser
+from core.day_log import DayLog
+from core.user import User
 
 
 # -----------------------------
-# Daily aggregations
+# Streaming core
 # -----------------------------
 
-def total_duration_per_day(logs: List[dict]) -> Dict[str, int]:
+class DaySummary:
+    """
+    Totals for a single day, computed from one day log.
     """
-    Compute total activity duration per day.
 
-    Returns:
-        { "YYYY-MM-DD": total_minutes }
+    __slots__ = (
+        "date",
+        "total",
+        "count",
+        "category_minutes",
+        "category_counts",
+        "mood_sum",
+        "mood_count",
+    )
+
+    def __init__(self, date: str):
+        self.date = date
+        self.total = 0
+        self.count = 0
+        self.category_minutes: Dict[str, int] = {}
+        self.category_counts: Dict[str, int] = {}
+        self.mood_sum = 0
+        self.mood_count = 0
+
+    def _add(self, category: str, duration: int, mood) -> None:
+        self.total += duration
+        self.count += 1
+        self.category_minutes[category] = self.category_minutes.get(category, 0) + duration
+        self.category_counts[category] = self.category_counts.get(category, 0) + 1
+
+        if mood is not None:
+            self.mood_sum += mood
+            self.mood_count += 1
+
+
+def summarize_log(log: dict) -> DaySummary:
     """
-    totals: Dict[str, int] = {}
+    Summarize one day log dictionary.
+    """
+    summary = DaySummary(log["date"])
+
+    for activity in log.get("activities", []):
+        summary._add(
+            activity["category"],
+            activity["duration_minutes"],
+            activity.get("mood"),
+        )
+
+    return summary
+
+
+def _summarize_day_log(day_log: DayLog) -> DaySummary:
+    summary = DaySummary(day_log.get_date().isoformat())
+
+    for activity in day_log.get_activities():
+        summary._add(
+            activity.get_category(),
+            activity.get_duration_minutes(),
+            activity.get_mood(),
+        )
+
+    return summary
 
+
+def iter_day_summaries(logs: Iterable[dict]) -> Iterator[DaySummary]:
+    """
+    Lazily summarize day logs one at a time, in input order.
+    """
     for log in logs:
-        date = log["date"]
-        activities = log.get("activities", [])
-        totals[date] = sum(a["duration_minutes"] for a in activities)
+        yield summarize_log(log)
 
+
+def iter_daily_totals(logs: Iterable[dict]) -> Iterator[Tuple[str, int]]:
+    """
+    Stream (date, total_minutes) pairs.
+    """
+    for summary in iter_day_summaries(logs):
+        yield summary.date, summary.total
+
+
+def iter_daily_category_minutes(
+    logs: Iterable[dict],
+) -> Iterator[Tuple[str, Dict[str, int]]]:
+    """
+    Stream (date, {category: minutes}) pairs.
+    """
+    for summary in iter_day_summaries(logs):
+        yield summary.date, summary.category_minutes
+
+
+def _fold_categories(
+    summaries: Iterable[DaySummary],
+    field: str,
+) -> Dict[str, int]:
+    totals: Dict[str, int] = {}
+    for summary in summaries:
+        for category, value in getattr(summary, field).items():
+            totals[category] = totals.get(category, 0) + value
     return totals
 
 
-def daily_category_minutes(logs: List[dict]) -> Dict[str, Dict[str, int]]:
+# -----------------------------
+# Fused aggregation result
+# -----------------------------
+
+class ActivityAggregates:
+    """
+    Everything the analytics layer needs from one pass over activities.
+
+    Per-day mappings are keyed by "YYYY-MM-DD" in input order.
+    """
+
+    def __init__(self):
+        self.daily_totals: Dict[str, int] = {}
+        self.daily_category_minutes: Dict[str, Dict[str, int]] = {}
+        self.daily_counts: Dict[str, int] = {}
+        self.daily_mood_sums: Dict[str, int] = {}
+        self.daily_mood_counts: Dict[str, int] = {}
+        self.category_totals: Dict[str, int] = {}
+        self.category_counts: Dict[str, int] = {}
+
+    def get_dates(self) -> List[str]:
+        return list(self.daily_totals)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ActivityAggregates):
+            return NotImplemented
+        return vars(self) == vars(other)
+
+    def add_day(self, summary: DaySummary) -> None:
+        """
+        Fold one day into the aggregates.
+        """
+        self._set_day(
+            summary.date,
+            summary.total,
+            summary.category_minutes,
+            summary.count,
+            summary.mood_sum,
+            summary.mood_count,
+        )
+
+        for category, minutes in summary.category_minutes.items():
+            self.category_totals[category] = self.category_totals.get(category, 0) + minutes
+        for category, count in summary.category_counts.items():
+            self.category_counts[category] = self.category_counts.get(category, 0) + count
+
+    def _set_day(
+        self,
+        date: str,
+        total: int,
+        category_minutes: Dict[str, int],
+        count: int,
+        mood_sum: int,
+        mood_count: int,
+    ) -> None:
+        self.daily_totals[date] = total
+        self.daily_category_minutes[date] = category_minutes
+        self.daily_counts[date] = count
+        self.daily_mood_sums[date] = mood_sum
+        self.daily_mood_counts[date] = mood_count
+
+
+LogsOrAggregates = Union[Iterable[dict], ActivityAggregates]
+
+
+def _fold(summaries: Iterable[DaySummary]) -> ActivityAggregates:
+    result = ActivityAggregates()
+    for summary in summaries:
+        result.add_day(summary)
+    return result
+
+
+def aggregate_logs(logs: Iterable[dict]) -> ActivityAggregates:
+    """
+    Aggregate raw log dictionaries in a single streaming pass.
+    """
+    return _fold(iter_day_summaries(logs))
+
+
+def _aggregate_table(table: ActivityTable) -> ActivityAggregates:
+    """
+    Vectorized aggregation over a columnar table.
+    """
+    result = ActivityAggregates()
+    categories = table.categories
+
+    dates = [date.fromordinal(d).isoformat() for d in table.days.tolist()]
+    mood_sums, mood_counts = table.daily_mood_sums()
+
+    for day, total, minutes, counts, count, mood_sum, mood_count in zip(
+        dates,
+        table.daily_totals().tolist(),
+        table.daily_category_minutes().tolist(),
+        table.daily_category_counts().tolist(),
+        table.daily_counts().tolist(),
+        mood_sums.tolist(),
+        mood_counts.tolist(),
+    ):
+        day_categories = {
+            categories[i]: minutes[i]
+            for i in range(len(categories))
+            if counts[i] > 0
+        }
+        result._set_day(day, total, day_categories, count, mood_sum, mood_count)
+
+    for i, (total, count) in enumerate(
+        zip(table.category_totals().tolist(), table.category_counts().tolist())
+    ):
+        if count > 0:
+            result.category_totals[categories[i]] = total
+            result.category_counts[categories[i]] = count
+
+    return result
+
+
+def aggregate_user(user: User) -> ActivityAggregates:
+    """
+    Aggregate a user's activities in a single pass over domain objects,
+    or with vectorized reductions when the user is columnar.
+    """
+    if isinstance(user, ColumnarUser):
+        return _aggregate_table(user.get_table())
+
+    return _fold(_summarize_day_log(day_log) for day_log in user.get_all_logs())
+
+
+def as_aggregates(logs: LogsOrAggregates) -> ActivityAggregates:
+    """
+    Return ``logs`` unchanged if already aggregated, otherwise aggregate it.
+    """
+    if isinstance(logs, ActivityAggregates):
+        return logs
+    return aggregate_logs(logs)
+
+
+# -----------------------------
+# Daily aggregations
+# -----------------------------
+
+def total_duration_per_day(logs: LogsOrAggregates) -> Dict[str, int]:
+    """
+    Compute total activity duration per day.
+
+    Returns:
+        { "YYYY-MM-DD": total_minutes }
+    """
+    if isinstance(logs, ActivityAggregates):
+        return dict(logs.daily_totals)
+    return dict(iter_daily_totals(logs))
+
+
+def daily_category_minutes(logs: LogsOrAggregates) -> Dict[str, Dict[str, int]]:
     """
     Compute per-category activity duration for each day.
 
@@ -41,51 +288,31 @@ def daily_category_minutes(logs: List[dict]) -> Dict[str, Dict[str, int]]:
             }
         }
     """
-    result: Dict[str, Dict[str, int]] = {}
-
-    for log in logs:
-        date = log["date"]
-        result[date] = {}
-
-        for activity in log.get("activities", []):
-            category = activity["category"]
-            duration = activity["duration_minutes"]
-
-            result[date][category] = (
-                result[date].get(category, 0) + duration
-            )
-
-    return result
+    if isinstance(logs, ActivityAggregates):
+        return {
+            date: dict(categories)
+            for date, categories in logs.daily_category_minutes.items()
+        }
+    return dict(iter_daily_category_minutes(logs))
 
 
 # -----------------------------
 # Cross-day aggregations
 # -----------------------------
 
-def total_duration_per_category(logs: List[dict]) -> Dict[str, int]:
+def total_duration_per_category(logs: LogsOrAggregates) -> Dict[str, int]:
     """
     Compute total activity duration per category across all days.
     """
-    totals: Dict[str, int] = {}
-
-    for log in logs:
-        for activity in log.get("activities", []):
-            category = activity["category"]
-            duration = activity["duration_minutes"]
-            totals[category] = totals.get(category, 0) + duration
-
-    return totals
+    if isinstance(logs, ActivityAggregates):
+        return dict(logs.category_totals)
+    return _fold_categories(iter_day_summaries(logs), "category_minutes")
 
 
-def activity_count_per_category(logs: List[dict]) -> Dict[str, int]:
+def activity_count_per_category(logs: LogsOrAggregates) -> Dict[str, int]:
     """
     Count number of activities per category across all days.
     """
-    counts: Dict[str, int] = {}
-
-    for log in logs:
-        for activity in log.get("activities", []):
-            category = activity["category"]
-            counts[category] = counts.get(category, 0) + 1
-
-    return counts
+    if isinstance(logs, ActivityAggregates):
+        return dict(logs.category_counts)
+    return _fold_categories(iter_day_summaries(logs), "category_counts")
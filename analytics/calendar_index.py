@@ -0,0 +1,196 @@
+"""
+Responsibility:
+Indexes a user's active days on the calendar.
+
+A CalendarIndex is built once from the {date: total} mapping and holds:
+    - the active days as sorted date ordinals, with their ISO strings and
+      totals, so "the last n active days" is a slice;
+    - a dense, zero-filled array over every calendar day of the span with
+      a mask of the days that have data, so "the last n calendar days" is
+      a slice too and gaps stay explicit;
+    - the ISO-week (Monday) boundaries of the span;
+    - a DayWindows engine over the active days for window lookups.
+Dates are parsed in one vectorized call and never formatted back.
+"""
+
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from analytics.windows import GAP_INSUFFICIENT, GAP_SKIP, DayWindows, Window, check_gap_policy
+from config.settings import DAYS_PER_WEEK
+
+
+# Proleptic ordinal of the datetime64 epoch (1970-01-01)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def parse_ordinals(dates: List[str]) -> np.ndarray:
+    """
+    Proleptic date ordinals (date.toordinal) of ISO date strings.
+    """
+    if not dates:
+        return np.empty(0, dtype=np.int64)
+    return np.array(dates, dtype="datetime64[D]").astype(np.int64) + _EPOCH_ORDINAL
+
+
+class CalendarIndex:
+    """
+    Active days and the dense calendar of one user's history.
+
+    Attributes:
+        dates: (days,) ISO strings of the active days, ascending.
+        ordinals: (days,) their date ordinals.
+        values: (days,) their totals.
+        start: Ordinal of the first active day (dense position 0).
+        dense: (span,) totals per calendar day, 0 on days without data.
+        present: (span,) True on days with data.
+        positions: (days,) dense position of each active day.
+        week_starts: (weeks,) ordinals of the Mondays of every ISO week
+            touching the span; ISO week i covers dense positions
+            week_bounds[i]:week_bounds[i + 1].
+        windows: DayWindows over the active days and their totals.
+    """
+
+    def __init__(self, dates: List[str], values: np.ndarray, ordinals: Optional[np.ndarray] = None):
+        if ordinals is None:
+            ordinals = parse_ordinals(dates)
+        ordinals = np.asarray(ordinals, dtype=np.int64)
+        values = np.asarray(values, dtype=float)
+
+        if len(dates) != len(ordinals) or len(values) != len(ordinals):
+            raise ValueError("dates, ordinals and values must have the same length.")
+        if np.any(np.diff(ordinals) <= 0):
+            raise ValueError("dates must be unique and in ascending order.")
+
+        self.dates = list(dates)
+        self.ordinals = ordinals
+        self.values = values
+
+        self.start = int(ordinals[0]) if len(ordinals) else 0
+        span = int(ordinals[-1]) - self.start + 1 if len(ordinals) else 0
+
+        self.positions = ordinals - self.start
+        self.dense = np.zeros(span)
+        self.dense[self.positions] = values
+        self.present = np.zeros(span, dtype=bool)
+        self.present[self.positions] = True
+
+        # date.weekday() of an ordinal is (ordinal - 1) % 7; Monday is 0
+        first_monday = self.start - (self.start - 1) % DAYS_PER_WEEK
+        self.week_starts = np.arange(first_monday, self.start + span, DAYS_PER_WEEK, dtype=np.int64)
+        self.week_bounds = np.append(
+            np.clip(self.week_starts - self.start, 0, span), span
+        ).astype(np.int64)
+
+        self.windows = DayWindows(ordinals, values)
+
+    @classmethod
+    def from_daily_totals(cls, daily_totals: Dict[str, float]) -> "CalendarIndex":
+        """
+        Index a {"YYYY-MM-DD": total} mapping in any key order.
+        """
+        keys = list(daily_totals)
+        ordinals = parse_ordinals(keys)
+        values = np.fromiter(daily_totals.values(), dtype=float, count=len(keys))
+
+        order = np.argsort(ordinals, kind="stable")
+        return cls([keys[i] for i in order.tolist()], values[order], ordinals[order])
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def span_days(self) -> int:
+        return len(self.dense)
+
+    # -----------------------------
+    # Windows
+    # -----------------------------
+
+    def recent_windows(
+        self,
+        days: int = DAYS_PER_WEEK,
+        count: int = 2,
+        gaps: str = GAP_SKIP,
+    ) -> List[Optional[List[str]]]:
+        """
+        ISO strings of ``count`` consecutive windows of ``days`` days ending
+        at the latest active day, newest first, under a gap policy of
+        analytics.windows. "skip" windows hold active days only and are
+        shorter (or empty) near the start; calendar windows hold every day
+        and are None when they start before the first active day or, under
+        "insufficient", miss a day.
+        """
+        fill_gaps = gaps != GAP_SKIP
+        return [
+            self.window_dates(window, fill_gaps)
+            if gaps == GAP_SKIP or window.sufficient else None
+            for window in self.windows.rolling(days, count, gaps=gaps)
+        ]
+
+    def window_dates(self, window: Window, fill_gaps: bool = False) -> List[str]:
+        """
+        ISO strings of the active days in ``window``, or with ``fill_gaps``
+        of every calendar day it covers within the span.
+        """
+        if not fill_gaps:
+            return self.dates[window.lo:window.hi]
+        span = self.span_days()
+        return self.dense_dates(
+            min(max(window.start - self.start, 0), span),
+            min(max(window.stop - self.start, 0), span),
+        )
+
+    def dense_dates(self, start: int, stop: int) -> List[str]:
+        """
+        ISO strings of dense positions start..stop; only the gap days need
+        to be formatted.
+        """
+        i = int(np.searchsorted(self.positions, start))
+        dates = []
+        for p in range(start, stop):
+            if i < len(self.positions) and self.positions[i] == p:
+                dates.append(self.dates[i])
+                i += 1
+            else:
+                dates.append(date.fromordinal(self.start + p).isoformat())
+        return dates
+
+    # -----------------------------
+    # Weekly totals
+    # -----------------------------
+
+    def block_totals(
+        self,
+        days: int = DAYS_PER_WEEK,
+        gaps: str = GAP_SKIP,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (totals, usable) of consecutive, complete blocks of ``days`` days
+        from the first active day: active days under "skip", calendar days
+        otherwise, with "insufficient" marking blocks that miss a day.
+        """
+        check_gap_policy(gaps)
+        values = self.values if gaps == GAP_SKIP else self.dense
+        n_blocks = len(values) // days
+        totals = values[:n_blocks * days].reshape(n_blocks, days).sum(axis=1)
+
+        if gaps == GAP_INSUFFICIENT:
+            usable = self.present[:n_blocks * days].reshape(n_blocks, days).all(axis=1)
+        else:
+            usable = np.ones(n_blocks, dtype=bool)
+        return totals, usable
+
+    def iso_week_totals(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (week_starts, totals, days_with_data) per ISO week of the span.
+        """
+        if not len(self):
+            empty = np.empty(0, dtype=np.int64)
+            return empty, np.empty(0), empty
+
+        starts = self.week_bounds[:-1]
+        totals = np.add.reduceat(self.dense, starts)
+        days_with_data = np.add.reduceat(self.present.astype(np.int64), starts)
+        return self.week_starts, totals, days_with_data
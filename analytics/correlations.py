@@ -2,11 +2,21 @@
 Responsibility:
 Computes simple correlations between activity dimensions.
 All functions are pure and operate on numeric inputs.
+
+Series are aligned on a dense day x category matrix in which a category
+missing on a day counts as zero minutes; whole correlation matrices,
+rolling windows and cohort batches are each computed in one NumPy pass.
+Undefined correlations (fewer than two days, or a constant series) are
+None in dict results and NaN in array results.
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 import math
 
+import numpy as np
+
+from config.constants import CATEGORY_ORDER
+
 
 # -----------------------------
 # Core math
@@ -29,13 +39,214 @@ def _pearson_correlation(x: List[float], y: List[float]) -> Optional[float]:
     return num / math.sqrt(den_x * den_y)
 
 
+def _safe_divide(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    out = np.full(np.broadcast(num, den).shape, np.nan)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def rank_average(values: np.ndarray, axis: int = -1) -> np.ndarray:
+    """
+    Rank values along ``axis`` (1-based), giving ties their average rank.
+    """
+    values = np.moveaxis(np.asarray(values, dtype=float), axis, -1)
+    n = values.shape[-1]
+
+    order = np.argsort(values, axis=-1, kind="stable")
+    ordered = np.take_along_axis(values, order, axis=-1)
+
+    positions = np.broadcast_to(np.arange(n), values.shape)
+    new_group = np.ones(values.shape, dtype=bool)
+    new_group[..., 1:] = ordered[..., 1:] != ordered[..., :-1]
+    ends_group = np.ones(values.shape, dtype=bool)
+    ends_group[..., :-1] = new_group[..., 1:]
+
+    first = np.maximum.accumulate(np.where(new_group, positions, 0), axis=-1)
+    last = np.flip(
+        np.minimum.accumulate(
+            np.flip(np.where(ends_group, positions, n - 1), axis=-1), axis=-1
+        ),
+        axis=-1,
+    )
+
+    ranks = np.empty(values.shape)
+    np.put_along_axis(ranks, order, (first + last) / 2.0 + 1.0, axis=-1)
+    return np.moveaxis(ranks, -1, axis)
+
+
+def pearson_matrix(matrix: np.ndarray) -> np.ndarray:
+    """
+    Pearson correlation between every pair of columns of a days x series
+    matrix.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    if matrix.ndim != 2:
+        raise ValueError("matrix must be two-dimensional (days x series).")
+
+    if matrix.shape[0] < 2:
+        return np.full((matrix.shape[1], matrix.shape[1]), np.nan)
+
+    centered = matrix - matrix.mean(axis=0)
+    cov = centered.T @ centered
+    norms = np.sqrt(np.diag(cov))
+    # Constant columns leave only rounding noise after centering
+    norms[norms <= 1e-12 * np.sqrt((matrix ** 2).sum(axis=0))] = 0.0
+    return np.clip(_safe_divide(cov, np.outer(norms, norms)), -1.0, 1.0)
+
+
+def spearman_matrix(matrix: np.ndarray) -> np.ndarray:
+    """
+    Spearman rank correlation between every pair of columns.
+    """
+    return pearson_matrix(rank_average(matrix, axis=0))
+
+
+def rolling_correlation(
+    x: Sequence[float],
+    y: Sequence[float],
+    window: int,
+) -> np.ndarray:
+    """
+    Pearson correlation of x and y over each window of ``window`` days.
+
+    Returns one value per window end, starting at index ``window - 1``.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    if x.shape != y.shape or x.ndim != 1:
+        raise ValueError("x and y must be one-dimensional and of equal length.")
+    if window < 2:
+        raise ValueError("window must be at least 2.")
+    if len(x) < window:
+        return np.empty(0)
+
+    # Center first so the prefix-sum differences stay well conditioned
+    x = x - x.mean()
+    y = y - y.mean()
+
+    def window_sums(values: np.ndarray) -> np.ndarray:
+        prefix = np.concatenate(([0.0], np.cumsum(values)))
+        return prefix[window:] - prefix[:-window]
+
+    sum_x, sum_y = window_sums(x), window_sums(y)
+    sq_x, sq_y = window_sums(x * x), window_sums(y * y)
+    cov = window_sums(x * y) - sum_x * sum_y / window
+    var_x = sq_x - sum_x ** 2 / window
+    var_y = sq_y - sum_y ** 2 / window
+
+    # Constant windows leave only rounding noise in the variance
+    var_x[var_x <= 1e-12 * sq_x] = 0.0
+    var_y[var_y <= 1e-12 * sq_y] = 0.0
+
+    return np.clip(_safe_divide(cov, np.sqrt(var_x * var_y)), -1.0, 1.0)
+
+
+def batched_pearson(
+    x: np.ndarray,
+    y: np.ndarray,
+    mask: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Pearson correlation along the last axis for every leading index.
+
+    Args:
+        x, y: Arrays of equal shape, e.g. (users, days).
+        mask: Optional boolean array of the same shape; False entries
+            (e.g. days outside a user's history) are ignored.
+
+    Returns:
+        Array of the leading shape, e.g. (users,).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    if x.shape != y.shape:
+        raise ValueError("x and y must have the same shape.")
+
+    weights = np.ones(x.shape) if mask is None else np.asarray(mask, dtype=float)
+    if weights.shape != x.shape:
+        raise ValueError("mask must have the same shape as x and y.")
+
+    n = weights.sum(axis=-1)
+    safe_n = np.maximum(n, 1.0)
+    cx = (x - (weights * x).sum(axis=-1, keepdims=True) / safe_n[..., None]) * weights
+    cy = (y - (weights * y).sum(axis=-1, keepdims=True) / safe_n[..., None]) * weights
+
+    num = (cx * cy).sum(axis=-1)
+    den = np.sqrt((cx * cx).sum(axis=-1) * (cy * cy).sum(axis=-1))
+    corr = np.clip(_safe_divide(num, den), -1.0, 1.0)
+    corr[n < 2] = np.nan
+    return corr
+
+
+# -----------------------------
+# Matrix construction
+# -----------------------------
+
+def daily_category_matrix(
+    daily_category_minutes: Dict[str, Dict[str, int]],
+    days: Optional[List[str]] = None,
+    categories: Optional[List[str]] = None,
+) -> Tuple[List[str], List[str], np.ndarray]:
+    """
+    Dense, zero-filled day x category minutes matrix.
+
+    Days default to every day in sorted order; categories default to those
+    present, in CATEGORY_ORDER first and then by first appearance.
+
+    Returns:
+        (days, categories, matrix)
+    """
+    if days is None:
+        days = sorted(daily_category_minutes)
+
+    if categories is None:
+        seen: Dict[str, None] = {}
+        for day in days:
+            for category in daily_category_minutes.get(day, {}):
+                seen.setdefault(category, None)
+        categories = [c for c in CATEGORY_ORDER if c in seen]
+        categories += [c for c in seen if c not in CATEGORY_ORDER]
+
+    column = {category: j for j, category in enumerate(categories)}
+    matrix = np.zeros((len(days), len(categories)))
+
+    for i, day in enumerate(days):
+        for category, minutes in daily_category_minutes.get(day, {}).items():
+            j = column.get(category)
+            if j is not None:
+                matrix[i, j] = minutes
+
+    return days, categories, matrix
+
+
 # -----------------------------
 # Public API
 # -----------------------------
 
+def category_correlation_matrix(
+    daily_category_minutes: Dict[str, Dict[str, int]],
+    method: str = "pearson",
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Correlation between every pair of categories across days.
+
+    Returns:
+        (categories, correlation matrix)
+    """
+    if method not in ("pearson", "spearman"):
+        raise ValueError("method must be 'pearson' or 'spearman'.")
+
+    _, categories, matrix = daily_category_matrix(daily_category_minutes)
+    compute = pearson_matrix if method == "pearson" else spearman_matrix
+    return categories, compute(matrix)
+
+
 def category_total_correlation(
     daily_category_minutes: Dict[str, Dict[str, int]],
     total_minutes_per_day: Dict[str, int],
+    method: str = "pearson",
 ) -> Dict[str, Optional[float]]:
     """
     Correlate per-category daily minutes with total daily activity.
@@ -51,10 +262,14 @@ def category_total_correlation(
                 "2026-01-01": 300,
                 ...
             }
+        method: "pearson" or "spearman".
 
     Returns:
         Mapping of category -> correlation coefficient
     """
+    if method not in ("pearson", "spearman"):
+        raise ValueError("method must be 'pearson' or 'spearman'.")
+
     correlations: Dict[str, Optional[float]] = {}
 
     if not daily_category_minutes or not total_minutes_per_day:
@@ -66,16 +281,58 @@ def category_total_correlation(
     if len(days) < 2:
         return correlations
 
-    totals = [total_minutes_per_day[d] for d in days]
-
-    # Collect per-category series
-    category_series: Dict[str, List[float]] = {}
+    _, categories, matrix = daily_category_matrix(daily_category_minutes, days)
+    totals = np.array([total_minutes_per_day[d] for d in days], dtype=float)
 
-    for day in days:
-        for category, minutes in daily_category_minutes[day].items():
-            category_series.setdefault(category, []).append(minutes)
+    combined = np.column_stack([matrix, totals])
+    compute = pearson_matrix if method == "pearson" else spearman_matrix
+    against_total = compute(combined)[:-1, -1]
 
-    for category, series in category_series.items():
-        correlations[category] = _pearson_correlation(series, totals)
+    for category, value in zip(categories, against_total.tolist()):
+        correlations[category] = None if math.isnan(value) else value
 
     return correlations
+
+
+def cohort_category_total_correlation(
+    minutes: np.ndarray,
+    mask: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Per-user correlation of each category with daily totals.
+
+    Args:
+        minutes: (users, days, categories) zero-filled minutes.
+        mask: Optional (users, days) boolean array of days to include.
+
+    Returns:
+        (users, categories) correlations, NaN where undefined.
+    """
+    minutes = np.asarray(minutes, dtype=float)
+    if minutes.ndim != 3:
+        raise ValueError("minutes must be three-dimensional (users x days x categories).")
+
+    weights = (
+        np.ones(minutes.shape[:2]) if mask is None
+        else np.asarray(mask, dtype=float)
+    )
+    if weights.shape != minutes.shape[:2]:
+        raise ValueError("mask must have shape (users, days).")
+
+    n = weights.sum(axis=1)
+    safe_n = np.maximum(n, 1.0)[:, None]
+    totals = minutes.sum(axis=2)
+
+    category_mean = np.einsum("udc,ud->uc", minutes, weights) / safe_n
+    centered = (minutes - category_mean[:, None, :]) * weights[:, :, None]
+    centered_totals = (totals - (totals * weights).sum(axis=1, keepdims=True) / safe_n) * weights
+
+    num = np.einsum("udc,ud->uc", centered, centered_totals)
+    den = np.sqrt(
+        np.einsum("udc,udc->uc", centered, centered)
+        * (centered_totals ** 2).sum(axis=1)[:, None]
+    )
+
+    corr = np.clip(_safe_divide(num, den), -1.0, 1.0)
+    corr[n < 2] = np.nan
+    return corr
@@ -0,0 +1,414 @@
+"""
+Responsibility:
+Maintains activity statistics incrementally as new data arrives.
+
+Each object is updated in O(1) per activity or per day (O(categories) when
+a day leaves a window), so long-running processes can keep daily and
+weekly metrics current without rescanning history. Results match the
+batch functions in analytics.statistics.
+"""
+
+import math
+from collections import deque
+from datetime import date, timedelta
+from typing import Deque, Dict, List, Optional, Tuple
+
+from analytics.aggregations import ActivityAggregates
+from analytics.windows import GAP_INSUFFICIENT, GAP_SKIP, check_gap_policy
+from config.settings import DAYS_PER_WEEK, ROLLING_WINDOW_DAYS, WEEKLY_GAP_POLICY
+
+
+# -----------------------------
+# Mean / variance
+# -----------------------------
+
+class RunningStats:
+    """
+    Welford mean and population variance, supporting removal.
+    """
+
+    def __init__(self):
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, value: float) -> None:
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+
+    def remove(self, value: float) -> None:
+        if self._count == 0:
+            raise ValueError("Cannot remove from empty statistics.")
+
+        if self._count == 1:
+            self._count = 0
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+
+        self._count -= 1
+        delta = value - self._mean
+        self._mean -= delta / self._count
+        self._m2 = max(0.0, self._m2 - delta * (value - self._mean))
+
+    def mean(self) -> Optional[float]:
+        if self._count == 0:
+            return None
+        return self._mean
+
+    def variance(self) -> Optional[float]:
+        if self._count == 0:
+            return None
+        return self._m2 / self._count
+
+    def standard_deviation(self) -> Optional[float]:
+        var = self.variance()
+        if var is None:
+            return None
+        return math.sqrt(var)
+
+
+# -----------------------------
+# Rolling window
+# -----------------------------
+
+class RollingWindow:
+    """
+    The last ``size`` values with their sum, mean, variance and maximum.
+
+    Only the newest value may change after it is pushed, and only upward
+    (activities add positive minutes to the current day), which keeps the
+    monotonic maximum queue valid.
+    """
+
+    def __init__(self, size: int):
+        if size <= 0:
+            raise ValueError("Window size must be a positive integer.")
+
+        self.size = size
+        self._values: Deque[float] = deque()
+        self._offset = 0  # index of self._values[0] since creation
+        self._sum = 0.0
+        self._stats = RunningStats()
+        self._max: Deque[Tuple[int, float]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def is_full(self) -> bool:
+        return len(self._values) == self.size
+
+    def values(self) -> List[float]:
+        return list(self._values)
+
+    def push(self, value: float) -> Optional[float]:
+        """
+        Append a value; returns the value evicted from the window, if any.
+        """
+        evicted = None
+
+        if self.is_full():
+            evicted = self._values.popleft()
+            self._sum -= evicted
+            self._stats.remove(evicted)
+            if self._max and self._max[0][0] == self._offset:
+                self._max.popleft()
+            self._offset += 1
+
+        self._values.append(value)
+        self._sum += value
+        self._stats.add(value)
+        self._push_max(self._offset + len(self._values) - 1, value)
+
+        return evicted
+
+    def add_to_last(self, delta: float) -> None:
+        """
+        Increase the newest value by a non-negative ``delta``.
+        """
+        if not self._values:
+            raise ValueError("Window is empty.")
+        if delta < 0:
+            raise ValueError("delta must be non-negative.")
+
+        old = self._values[-1]
+        new = old + delta
+        self._values[-1] = new
+        self._sum += delta
+        self._stats.remove(old)
+        self._stats.add(new)
+
+        index = self._offset + len(self._values) - 1
+        if self._max and self._max[-1][0] == index:
+            self._max.pop()
+        self._push_max(index, new)
+
+    def _push_max(self, index: int, value: float) -> None:
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+
+    def sum(self) -> float:
+        return self._sum
+
+    def mean(self) -> Optional[float]:
+        return self._stats.mean()
+
+    def variance(self) -> Optional[float]:
+        return self._stats.variance()
+
+    def standard_deviation(self) -> Optional[float]:
+        return self._stats.standard_deviation()
+
+    def max(self) -> Optional[float]:
+        if not self._max:
+            return None
+        return self._max[0][1]
+
+
+# -----------------------------
+# Category mix
+# -----------------------------
+
+def _plogp(minutes: float) -> float:
+    return minutes * math.log(minutes) if minutes > 0 else 0.0
+
+
+class CategoryMix:
+    """
+    Running per-category minutes with O(1) entropy.
+
+    Entropy is kept as ``log(T) - S / T`` where ``S`` is the running sum of
+    ``m * log(m)`` over categories, so a single update never revisits the
+    other categories.
+    """
+
+    def __init__(self):
+        self._minutes: Dict[str, float] = {}
+        self._total = 0.0
+        self._plogp_sum = 0.0
+        self._positive = 0
+
+    def add(self, category: str, minutes: float) -> None:
+        self._update(category, minutes)
+
+    def remove(self, category: str, minutes: float) -> None:
+        if self._minutes.get(category, 0) < minutes:
+            raise ValueError(f"Cannot remove more minutes than held for {category!r}.")
+        self._update(category, -minutes)
+
+    def _update(self, category: str, delta: float) -> None:
+        old = self._minutes.get(category, 0)
+        new = old + delta
+
+        self._plogp_sum += _plogp(new) - _plogp(old)
+        self._total += delta
+        self._positive += (new > 0) - (old > 0)
+
+        if new > 0:
+            self._minutes[category] = new
+        else:
+            self._minutes.pop(category, None)
+
+    def total(self) -> float:
+        return self._total
+
+    def minutes(self) -> Dict[str, float]:
+        return dict(self._minutes)
+
+    def shares(self) -> Dict[str, float]:
+        if self._total <= 0:
+            return {category: 0.0 for category in self._minutes}
+        return {
+            category: minutes / self._total
+            for category, minutes in self._minutes.items()
+        }
+
+    def entropy(self) -> float:
+        if self._total <= 0:
+            return 0.0
+        return max(0.0, math.log(self._total) - self._plogp_sum / self._total)
+
+    def balance(self) -> float:
+        """
+        Same value as statistics.category_balance over the held minutes.
+        """
+        if self._positive <= 1:
+            return 0.0
+        return self.entropy() / math.log(self._positive)
+
+    def dominance_ratio(self) -> float:
+        """
+        Same value as statistics.dominance_ratio; categories are few, so
+        the maximum is taken directly.
+        """
+        if self._total <= 0:
+            return 0.0
+        return max(self._minutes.values()) / self._total
+
+
+# -----------------------------
+# Per-user activity statistics
+# -----------------------------
+
+class ActivityStatistics:
+    """
+    Live daily and weekly metrics for one user.
+
+    Days are the dates that have activity, in ascending order; activities
+    may only be added to the latest day or to a later one. Daily metrics
+    cover those days. Weekly and rolling windows end at the latest day
+    and follow the ``gaps`` policy of analytics.windows, matching
+    split_into_weeks: the last ``week_days`` days with activity ("skip"),
+    or the last ``week_days`` calendar days with days in between entering
+    as empty ("zero_fill", "insufficient"; see week_is_sufficient).
+    """
+
+    def __init__(
+        self,
+        week_days: int = DAYS_PER_WEEK,
+        rolling_days: int = ROLLING_WINDOW_DAYS,
+        gaps: str = WEEKLY_GAP_POLICY,
+    ):
+        check_gap_policy(gaps)
+        self.gaps = gaps
+        self.daily = RunningStats()
+        self.week = RollingWindow(week_days)
+        self.rolling = RollingWindow(rolling_days)
+        self.week_mix = CategoryMix()
+
+        # Per day of the week: its category minutes, None for a gap day
+        self._week_days: Deque[Tuple[date, Optional[Dict[str, float]]]] = deque()
+        self._last_date: Optional[date] = None
+        self._last_total = 0.0
+
+    @classmethod
+    def from_aggregates(
+        cls,
+        aggregates: ActivityAggregates,
+        week_days: int = DAYS_PER_WEEK,
+        rolling_days: int = ROLLING_WINDOW_DAYS,
+        gaps: str = WEEKLY_GAP_POLICY,
+    ) -> "ActivityStatistics":
+        stats = cls(week_days, rolling_days, gaps)
+        for date_str in sorted(aggregates.daily_category_minutes):
+            stats.add_day(
+                date.fromisoformat(date_str),
+                aggregates.daily_category_minutes[date_str],
+            )
+        return stats
+
+    def get_last_date(self) -> Optional[date]:
+        return self._last_date
+
+    def add_day(self, day: date, category_minutes: Dict[str, float]) -> None:
+        """
+        Add a complete day after the latest one.
+        """
+        if self._last_date is not None and day <= self._last_date:
+            raise ValueError("Days must be added in ascending order.")
+
+        self._start_day(day)
+        for category, minutes in category_minutes.items():
+            self._add_minutes(category, minutes)
+
+    def add_activity(self, day: date, category: str, minutes: float) -> None:
+        """
+        Add one activity to the latest day or start a new day with it.
+        """
+        if minutes <= 0:
+            raise ValueError("Activity minutes must be positive.")
+
+        if self._last_date is None or day > self._last_date:
+            self._start_day(day)
+        elif day < self._last_date:
+            raise ValueError("Activities must not precede the latest day.")
+
+        self._add_minutes(category, minutes)
+
+    def _start_day(self, day: date) -> None:
+        if self.gaps != GAP_SKIP and self._last_date is not None:
+            # Calendar days without data enter the windows empty; more
+            # than a full window of them leaves only empty days
+            gap = (day - self._last_date).days - 1
+            for offset in range(max(0, gap - max(self.week.size, self.rolling.size)), gap):
+                self._push_day(self._last_date + timedelta(days=offset + 1), None)
+
+        self._last_date = day
+        self._last_total = 0.0
+
+        self.daily.add(0.0)
+        self._push_day(day, {})
+
+    def _push_day(self, day: date, category_minutes: Optional[Dict[str, float]]) -> None:
+        self.rolling.push(0.0)
+        self.week.push(0.0)
+
+        if len(self._week_days) == self.week.size:
+            _, evicted = self._week_days.popleft()
+            for category, minutes in (evicted or {}).items():
+                self.week_mix.remove(category, minutes)
+        self._week_days.append((day, category_minutes))
+
+    def _add_minutes(self, category: str, minutes: float) -> None:
+        if minutes <= 0:
+            return
+
+        self.daily.remove(self._last_total)
+        self._last_total += minutes
+        self.daily.add(self._last_total)
+
+        self.rolling.add_to_last(minutes)
+        self.week.add_to_last(minutes)
+
+        day_minutes = self._week_days[-1][1]
+        day_minutes[category] = day_minutes.get(category, 0) + minutes
+        self.week_mix.add(category, minutes)
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+
+    def week_is_sufficient(self) -> bool:
+        """
+        Whether the last week is a full week under the gap policy: it does
+        not reach before the first day and, under "insufficient", every
+        one of its days has activity.
+        """
+        if not self.week.is_full():
+            return False
+        if self.gaps == GAP_INSUFFICIENT:
+            return all(minutes is not None for _, minutes in self._week_days)
+        return True
+
+    def daily_average(self) -> Optional[float]:
+        return self.daily.mean()
+
+    def activity_variability(self) -> Optional[float]:
+        return self.daily.standard_deviation()
+
+    def daily_variability(self) -> float:
+        """
+        Population standard deviation of the last week's daily totals.
+        """
+        return self.week.standard_deviation() or 0.0
+
+    def dominance_ratio(self) -> float:
+        """
+        Share of the last week's minutes spent on its busiest day.
+        """
+        total = self.week.sum()
+        if total <= 0:
+            return 0.0
+        return self.week.max() / total
+
+    def category_balance(self) -> float:
+        return self.week_mix.balance()
+
+    def category_dominance_ratio(self) -> float:
+        return self.week_mix.dominance_ratio()
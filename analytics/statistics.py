@@ -68,16 +68,22 @@ def category_share(category_minutes: Dict[str, int]) -> Dict[str, float]:
         for category, minutes in category_minutes.items()
     }
 
-def category_balance(category_minutes: Dict[str, int]) -> float:
+def category_balance(
+    category_minutes: Dict[str, int],
+    total: Optional[float] = None,
+) -> float:
     """
     Measure how evenly time is distributed across categories.
     Returns a value between 0.0 (single category dominates)
     and 1.0 (perfectly balanced).
+
+    ``total`` may pass in an already known sum of the minutes.
     """
     if not category_minutes:
         return 0.0
 
-    total = sum(category_minutes.values())
+    if total is None:
+        total = sum(category_minutes.values())
     if total == 0:
         return 0.0
 
@@ -94,15 +100,21 @@ def category_balance(category_minutes: Dict[str, int]) -> float:
     max_entropy = math.log(len(proportions))
 
     return entropy / max_entropy
-def dominance_ratio(category_minutes: Dict[str, int]) -> float:
+def dominance_ratio(
+    category_minutes: Dict[str, int],
+    total: Optional[float] = None,
+) -> float:
     """
     Measures how dominant the top category is.
     Returns a value between 0.0 and 1.0.
+
+    ``total`` may pass in an already known sum of the minutes.
     """
     if not category_minutes:
         return 0.0
 
-    total = sum(category_minutes.values())
+    if total is None:
+        total = sum(category_minutes.values())
     if total == 0:
         return 0.0
 
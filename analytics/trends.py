@@ -3,45 +3,112 @@ Responsibility:
 Analyzes temporal patterns and changes in activity behavior.
 """
 
-from typing import Dict, List, Tuple
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
 
+from analytics.aggregations import (
+    ActivityAggregates,
+    LogsOrAggregates,
+    iter_day_summaries,
+    total_duration_per_category,
+)
+from analytics.windows import GAP_SKIP, DayWindows
+from config.settings import DAYS_PER_WEEK, WEEKLY_GAP_POLICY
 
-def split_weeks(logs: List[dict]) -> Tuple[List[dict], List[dict]]:
+
+def _read_recent(logs: Iterable[dict], enough) -> Tuple[List[dict], List[int]]:
+    """
+    Read newest-first logs until ``enough(ordinals)`` holds and every log
+    of the last date is read (reading stops at the first log of an older
+    date, which is dropped), returning the logs and the distinct ordinals
+    (descending). Out-of-order input is read in full and sorted instead.
+    """
+    read: List[dict] = []
+    ordinals: List[int] = []
+    iterator = iter(logs)
+    done = False
+
+    for log in iterator:
+        ordinal = date.fromisoformat(log["date"]).toordinal()
+        if ordinals and ordinal > ordinals[-1]:
+            read.append(log)
+            read.extend(iterator)
+            read.sort(key=lambda item: item["date"], reverse=True)
+            ordinals = sorted(
+                {date.fromisoformat(item["date"]).toordinal() for item in read},
+                reverse=True,
+            )
+            break
+        if done and ordinal != ordinals[-1]:
+            break
+        read.append(log)
+        if not ordinals or ordinal != ordinals[-1]:
+            ordinals.append(ordinal)
+        done = done or enough(ordinals)
+
+    return read, ordinals
+
+
+def split_weeks(
+    logs: Iterable[dict],
+    gaps: str = WEEKLY_GAP_POLICY,
+) -> Tuple[List[dict], List[dict]]:
     """
     Split logs into current week and previous week.
 
+    Weeks end at the newest date and follow the ``gaps`` policy of
+    analytics.windows: the 7 newest dates with logs ("skip"), or the 7
+    newest calendar days ("zero_fill", "insufficient"). A calendar week
+    is returned empty when it starts before the oldest date or, under
+    "insufficient", misses a day. Several logs of one date fall into the
+    same week.
+
     Args:
-        logs: List of day log dictionaries sorted by date descending.
+        logs: Day log dictionaries sorted by date descending; an iterator
+            is consumed only as far as the two weeks reach, up to the
+            first log of the next older date (under "skip", of the 15th
+            date). Unsorted input is read in full.
 
     Returns:
-        A tuple of (current_week_logs, previous_week_logs).
+        A tuple of (current_week_logs, previous_week_logs), newest first.
     """
-    current_week = logs[:7]
-    previous_week = logs[7:14]
-    return current_week, previous_week
+    week = DAYS_PER_WEEK
 
+    def enough(ordinals: List[int]) -> bool:
+        if gaps == GAP_SKIP:
+            return len(ordinals) >= 2 * week
+        # A date two calendar weeks older than the newest one
+        return ordinals[0] - ordinals[-1] >= 2 * week
 
-def weekly_total_duration(logs: List[dict]) -> int:
+    read, ordinals = _read_recent(logs, enough)
+    if not read:
+        return [], []
+
+    windows = DayWindows(ordinals[::-1])
+    weeks: Tuple[List[dict], List[dict]] = ([], [])
+    current, previous = windows.rolling(week, count=2, gaps=gaps)
+
+    for log in read:
+        ordinal = date.fromisoformat(log["date"]).toordinal()
+        for target, window in zip(weeks, (current, previous)):
+            usable = gaps == GAP_SKIP or window.sufficient
+            if usable and window.lo < window.hi and window.start <= ordinal < window.stop:
+                target.append(log)
+
+    return weeks
+
+
+def weekly_total_duration(logs: LogsOrAggregates) -> int:
     """
     Compute total activity duration for a set of logs.
     """
-    total = 0
-    for log in logs:
-        for activity in log.get("activities", []):
-            total += activity["duration_minutes"]
-    return total
+    if isinstance(logs, ActivityAggregates):
+        return sum(logs.category_totals.values())
+    return sum(summary.total for summary in iter_day_summaries(logs))
 
 
-def weekly_category_totals(logs: List[dict]) -> Dict[str, int]:
+def weekly_category_totals(logs: LogsOrAggregates) -> Dict[str, int]:
     """
     Compute total duration per category for a week.
     """
-    totals: Dict[str, int] = {}
-
-    for log in logs:
-        for activity in log.get("activities", []):
-            category = activity["category"]
-            duration = activity["duration_minutes"]
-            totals[category] = totals.get(category, 0) + duration
-
-    return totals
+    return total_duration_per_category(logs)
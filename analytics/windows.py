@@ -0,0 +1,221 @@
+"""
+Responsibility:
+Finds day windows over a sorted array of date ordinals.
+
+Three kinds of windows are supported, all returned newest first:
+    rolling: consecutive blocks of ``days`` days ending at ``end``;
+    anchored: calendar blocks whose boundaries fall on ``anchor`` plus a
+        multiple of ``days`` (e.g. a fixed weekday or billing date);
+    iso_weeks: anchored windows starting on Mondays.
+Every window is located with a binary search, so each costs O(log n)
+however sparse or long the history is.
+
+Gap policies decide what a day without data means:
+    skip: the day does not count; rolling windows hold ``days`` days that
+        have data, however far apart (not valid for anchored windows).
+    zero_fill: the day counts with zero activity; windows are calendar
+        blocks and sufficient wherever they lie within the history (first
+        to last day with data), so a block reaching past either end is
+        never mistaken for a full one.
+    insufficient: windows are calendar blocks and only sufficient when at
+        least ``min_days`` (default: all) of their days have data.
+"""
+
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import DAYS_PER_WEEK
+
+
+GAP_SKIP = "skip"
+GAP_ZERO_FILL = "zero_fill"
+GAP_INSUFFICIENT = "insufficient"
+GAP_POLICIES: Tuple[str, ...] = (GAP_SKIP, GAP_ZERO_FILL, GAP_INSUFFICIENT)
+
+# Ordinal 1 (0001-01-01) is a Monday
+_MONDAY_ORDINAL = 1
+
+
+class Window(NamedTuple):
+    """
+    Days ``start`` <= ordinal < ``stop``; ``days[lo:hi]`` are those with data.
+    """
+    start: int
+    stop: int
+    lo: int
+    hi: int
+    sufficient: bool
+
+    def days_with_data(self) -> int:
+        return self.hi - self.lo
+
+
+def check_gap_policy(gaps: str) -> None:
+    if gaps not in GAP_POLICIES:
+        raise ValueError(f"gaps must be one of {', '.join(GAP_POLICIES)}.")
+
+
+class DayWindows:
+    """
+    Window lookups over one history of days with data.
+
+    Args:
+        days: Date ordinals of the days with data, strictly ascending.
+        values: Optional per-day values; enables total() / totals().
+    """
+
+    def __init__(self, days: Sequence[int], values: Optional[Sequence[float]] = None):
+        days = np.asarray(days, dtype=np.int64)
+        if days.ndim != 1 or np.any(np.diff(days) <= 0):
+            raise ValueError("days must be strictly ascending.")
+        self.days = days
+
+        self._sums: Optional[np.ndarray] = None
+        if values is not None:
+            values = np.asarray(values, dtype=float)
+            if values.shape != days.shape:
+                raise ValueError("values must have one entry per day.")
+            self._sums = np.concatenate(([0.0], np.cumsum(values)))
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def locate(self, start: int, stop: int) -> Tuple[int, int]:
+        """
+        (lo, hi) such that days[lo:hi] are the days in [start, stop).
+        """
+        lo, hi = np.searchsorted(self.days, [start, stop])
+        return int(lo), int(hi)
+
+    def _default_end(self, end: Optional[int]) -> int:
+        if end is not None:
+            return int(end)
+        return int(self.days[-1]) + 1 if len(self) else 0
+
+    def _calendar_windows(
+        self,
+        starts: np.ndarray,
+        days: int,
+        gaps: str,
+        min_days: Optional[int],
+    ) -> List[Window]:
+        stops = starts + days
+        lo = np.searchsorted(self.days, starts)
+        hi = np.searchsorted(self.days, stops)
+
+        if gaps == GAP_INSUFFICIENT:
+            required = days if min_days is None else min_days
+            sufficient = (hi - lo) >= required
+        elif len(self):
+            sufficient = (starts >= self.days[0]) & (stops <= self.days[-1] + 1)
+        else:
+            sufficient = np.zeros(len(starts), dtype=bool)
+
+        return [
+            Window(*row)
+            for row in zip(
+                starts.tolist(), stops.tolist(), lo.tolist(), hi.tolist(), sufficient.tolist()
+            )
+        ]
+
+    # -----------------------------
+    # Window kinds
+    # -----------------------------
+
+    def rolling(
+        self,
+        days: int = DAYS_PER_WEEK,
+        count: int = 2,
+        end: Optional[int] = None,
+        gaps: str = GAP_SKIP,
+        min_days: Optional[int] = None,
+    ) -> List[Window]:
+        """
+        ``count`` consecutive windows of ``days`` days before ``end``
+        (default: the day after the latest day with data), newest first.
+        """
+        check_gap_policy(gaps)
+        if days <= 0 or count <= 0:
+            raise ValueError("days and count must be positive integers.")
+
+        end = self._default_end(end)
+
+        if gaps != GAP_SKIP:
+            starts = end - days * np.arange(1, count + 1, dtype=np.int64)
+            return self._calendar_windows(starts, days, gaps, min_days)
+
+        hi = int(np.searchsorted(self.days, end))
+        windows = []
+        for _ in range(count):
+            lo = max(0, hi - days)
+            if lo < hi:
+                start, stop = int(self.days[lo]), int(self.days[hi - 1]) + 1
+            else:
+                start = stop = windows[-1].start if windows else end
+            windows.append(Window(start, stop, lo, hi, hi - lo == days))
+            hi = lo
+        return windows
+
+    def anchored(
+        self,
+        anchor: int,
+        days: int = DAYS_PER_WEEK,
+        end: Optional[int] = None,
+        count: Optional[int] = None,
+        gaps: str = GAP_ZERO_FILL,
+        min_days: Optional[int] = None,
+    ) -> List[Window]:
+        """
+        Calendar windows with boundaries on ``anchor + k * days``, from the
+        one holding the day before ``end`` back ``count`` windows (default:
+        back to the one holding the first day), newest first.
+        """
+        check_gap_policy(gaps)
+        if gaps == GAP_SKIP:
+            raise ValueError("Anchored windows are calendar windows; use zero_fill or insufficient.")
+        if days <= 0 or (count is not None and count <= 0):
+            raise ValueError("days and count must be positive integers.")
+
+        end = self._default_end(end)
+        last_start = anchor + ((end - 1 - anchor) // days) * days
+
+        if count is None:
+            if not len(self) or self.days[0] >= end:
+                return []
+            first_start = anchor + ((int(self.days[0]) - anchor) // days) * days
+            count = (last_start - first_start) // days + 1
+
+        starts = last_start - days * np.arange(count, dtype=np.int64)
+        return self._calendar_windows(starts, days, gaps, min_days)
+
+    def iso_weeks(
+        self,
+        end: Optional[int] = None,
+        count: Optional[int] = None,
+        gaps: str = GAP_ZERO_FILL,
+        min_days: Optional[int] = None,
+    ) -> List[Window]:
+        """
+        Monday-to-Sunday weeks, newest first.
+        """
+        return self.anchored(_MONDAY_ORDINAL, DAYS_PER_WEEK, end, count, gaps, min_days)
+
+    # -----------------------------
+    # Values
+    # -----------------------------
+
+    def total(self, window: Window) -> float:
+        """
+        Sum of the values inside ``window``; gap days add nothing.
+        """
+        if self._sums is None:
+            raise ValueError("DayWindows was built without values.")
+        return float(self._sums[window.hi] - self._sums[window.lo])
+
+    def totals(self, windows: Sequence[Window]) -> np.ndarray:
+        if self._sums is None:
+            raise ValueError("DayWindows was built without values.")
+        lo = np.fromiter((w.lo for w in windows), dtype=np.int64, count=len(windows))
+        hi = np.fromiter((w.hi for w in windows), dtype=np.int64, count=len(windows))
+        return self._sums[hi] - self._sums[lo]
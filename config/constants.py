@@ -20,6 +20,14 @@ ALL_CATEGORIES = {
     LEISURE,
 }
 
+# Stable ordering used wherever categories become array columns
+CATEGORY_ORDER = (
+    WORK,
+    STUDY,
+    HEALTH,
+    LEISURE,
+)
+
 
 # -----------------------------
 # Category → activity mapping
@@ -30,6 +30,6 @@ FIGURES_DIR = REPORTS_DIR / "figures"
 
 
 # -----------------------------
-# Models & artifacts (future)
+# Models & artifacts
 # -----------------------------
 MODELS_DIR = PROJECT_ROOT / "models"
@@ -14,6 +14,12 @@ MIN_ACTIVE_MINUTES_PER_DAY = 30
 # Number of days required to compute weekly trends
 DAYS_PER_WEEK = 7
 
+# How weekly windows treat days without data: "zero_fill" (calendar weeks,
+# missing days count 0), "insufficient" (calendar weeks with a missing day
+# are not used) or "skip" (weeks are the last 7 active days, however far
+# apart). Reports, training, baselines and backtests all follow it.
+WEEKLY_GAP_POLICY = "zero_fill"
+
 
 # -----------------------------
 # Insight thresholds
@@ -47,6 +53,87 @@ TRAIN_SPLIT_RATIO = 0.8
 # Random seed for reproducibility (if used later)
 RANDOM_SEED = 42
 
+# Least-squares solver for LinearRegressionModel ("lstsq", "qr", "cholesky", "pinv")
+REGRESSION_SOLVER = "lstsq"
+
+# Ridge penalty on regression coefficients (0 is ordinary least squares)
+REGRESSION_RIDGE_ALPHA = 0.0
+
+# Season length of the seasonal naive backtest baseline, in weeks
+BACKTEST_SEASON_WEEKS = 4
+
+# Weeks averaged by the moving-average backtest baseline
+BACKTEST_MOVING_AVERAGE_WEEKS = 4
+
+# Weight kept by past samples at each online model update (1 never forgets)
+ONLINE_FORGETTING_FACTOR = 1.0
+
+# Ridge penalty the online model starts from before any samples arrive
+ONLINE_INITIAL_RIDGE = 1e-6
+
+# Calendar days of history read by the weekly pipeline (None reads everything)
+WEEKLY_LOOKBACK_DAYS = 26 * DAYS_PER_WEEK
+
+# Active days between consecutive sliding weekly training windows
+WEEKLY_TRAINING_STRIDE_DAYS = 1
+
+# Most recent active days used to build weekly training windows (None uses all)
+WEEKLY_TRAINING_LOOKBACK_DAYS = None
+
+
+# -----------------------------
+# Batch processing
+# -----------------------------
+
+# Users handed to a worker process per task
+BATCH_CHUNK_SIZE = 64
+
+# Worker processes for batch runs (None uses every available core)
+BATCH_MAX_WORKERS = None
+
+# Worker tasks each user's backtest cutoffs are split into
+BACKTEST_CUTOFF_SPLITS = 1
+
+
+# -----------------------------
+# Caching
+# -----------------------------
+
+# Approximate memory budget for cached per-user analyses
+ANALYSIS_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Maximum number of cached per-user analyses
+ANALYSIS_CACHE_MAX_ENTRIES = 256
+
+# Stored model artifacts kept per user (least recently used are evicted first)
+MODEL_STORE_MAX_PER_USER = 3
+
+# Days after its last use before a stored model artifact is evicted
+MODEL_STORE_MAX_AGE_DAYS = 30
+
+
+# -----------------------------
+# Report service
+# -----------------------------
+
+# Interface and port the weekly report service listens on
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+
+# Worker processes computing reports (None uses every available core)
+SERVICE_MAX_WORKERS = None
+
+# Finished weekly reports the report service keeps in memory (one per user)
+SERVICE_REPORT_CACHE_ENTRIES = 1024
+
+
+# -----------------------------
+# Storage
+# -----------------------------
+
+# Journal segment size that triggers a background compaction into the snapshot
+JOURNAL_COMPACTION_BYTES = 1_000_000
+
 
 # -----------------------------
 # Reporting
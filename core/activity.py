@@ -3,14 +3,39 @@ Responsibility:
 Defines the Activity entity representing a single logged action.
 """
 
+import sys
 from datetime import datetime
 
+from config.constants import CATEGORY_ACTIVITIES
+
+
+# Canonical string objects for known categories and activity names, so
+# every Activity shares one copy instead of one per decoded record.
+_CANONICAL = {
+    sys.intern(value): sys.intern(value)
+    for category, names in CATEGORY_ACTIVITIES.items()
+    for value in (category, *names)
+}
+
+
+_canonical = _CANONICAL.get
+_intern = sys.intern
+_new_object = object.__new__
+
 
 class Activity:
     """
     Represents a single, atomic activity performed by a user.
     """
 
+    __slots__ = (
+        "_name",
+        "_category",
+        "_duration_minutes",
+        "_timestamp",
+        "_mood",
+    )
+
     def __init__(
         self,
         name: str,
@@ -35,12 +60,34 @@ class Activity:
             if not isinstance(mood, int) or not (1 <= mood <= 5):
                 raise ValueError("Mood must be an integer between 1 and 5.")
 
-        self._name = name
-        self._category = category
+        self._name = _canonical(name) or _intern(name)
+        self._category = _canonical(category) or _intern(category)
         self._duration_minutes = duration_minutes
         self._timestamp = timestamp
         self._mood = mood
 
+    @classmethod
+    def from_trusted(
+        cls,
+        name: str,
+        category: str,
+        duration_minutes: int,
+        timestamp: datetime,
+        mood: int | None = None,
+    ) -> "Activity":
+        """
+        Build an Activity without re-validating its fields.
+
+        Only for records the Store validated when they were written.
+        """
+        activity = _new_object(cls)
+        activity._name = _canonical(name) or _intern(name)
+        activity._category = _canonical(category) or _intern(category)
+        activity._duration_minutes = duration_minutes
+        activity._timestamp = timestamp
+        activity._mood = mood
+        return activity
+
     def get_name(self) -> str:
         return self._name
 
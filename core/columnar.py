@@ -0,0 +1,471 @@
+"""
+Responsibility:
+Provides a columnar, NumPy-backed store for a user's activity history.
+User, DayLog and Activity objects are materialized on demand as thin views.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.constants import CATEGORY_ACTIVITIES, CATEGORY_ORDER
+from core.activity import Activity
+from core.day_log import DayLog
+from core.user import User
+
+
+# -----------------------------
+# Encoding constants
+# -----------------------------
+
+# Stored in the mood column when no mood was recorded
+MOOD_MISSING = 0
+
+# Stored in the utc_offset column for naive timestamps
+NAIVE_OFFSET = int(np.iinfo(np.int32).min)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _wall_micros(ts: datetime) -> int:
+    """
+    Microseconds since 1970-01-01 on the timestamp's own wall clock.
+    """
+    delta = ts.replace(tzinfo=None) - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _utc_offset_seconds(ts: datetime) -> int:
+    offset = ts.utcoffset()
+    if offset is None:
+        return NAIVE_OFFSET
+    return int(offset.total_seconds())
+
+
+def _from_wall_micros(micros: int, offset: int) -> datetime:
+    ts = _EPOCH + timedelta(microseconds=micros)
+    if offset != NAIVE_OFFSET:
+        ts = ts.replace(tzinfo=timezone(timedelta(seconds=offset)))
+    return ts
+
+
+def _default_categories() -> List[str]:
+    return list(CATEGORY_ORDER)
+
+
+def _default_names() -> List[str]:
+    return [
+        name
+        for category in CATEGORY_ORDER
+        for name in sorted(CATEGORY_ACTIVITIES[category])
+    ]
+
+
+# -----------------------------
+# Column builder
+# -----------------------------
+
+class _ColumnBuilder:
+    """
+    Accumulates activities into Python lists before freezing them as arrays.
+    """
+
+    def __init__(self, categories: List[str], names: List[str]):
+        self.categories = list(categories)
+        self.names = list(names)
+        self._category_codes = {c: i for i, c in enumerate(self.categories)}
+        self._name_codes = {n: i for i, n in enumerate(self.names)}
+
+        self.day: List[int] = []
+        self.category: List[int] = []
+        self.name: List[int] = []
+        self.duration: List[int] = []
+        self.timestamp: List[int] = []
+        self.utc_offset: List[int] = []
+        self.mood: List[int] = []
+
+    def _code(self, value: str, codes: Dict[str, int], table: List[str]) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = len(table)
+            codes[value] = code
+            table.append(value)
+        return code
+
+    def add(self, activity: Activity) -> None:
+        ts = activity.get_timestamp()
+        mood = activity.get_mood()
+
+        self.day.append(ts.date().toordinal())
+        self.category.append(
+            self._code(activity.get_category(), self._category_codes, self.categories)
+        )
+        self.name.append(
+            self._code(activity.get_name(), self._name_codes, self.names)
+        )
+        self.duration.append(activity.get_duration_minutes())
+        self.timestamp.append(_wall_micros(ts))
+        self.utc_offset.append(_utc_offset_seconds(ts))
+        self.mood.append(MOOD_MISSING if mood is None else mood)
+
+
+# -----------------------------
+# Column store
+# -----------------------------
+
+class ActivityTable:
+    """
+    Immutable column store for one user's activities.
+
+    Rows are ordered by (day, timestamp). ``days`` lists every logged date
+    as a proleptic ordinal, including dates whose DayLog holds no activities.
+    Categories and names are stored as codes into ``categories`` / ``names``.
+    """
+
+    def __init__(
+        self,
+        days: np.ndarray,
+        day: np.ndarray,
+        category: np.ndarray,
+        name: np.ndarray,
+        duration: np.ndarray,
+        timestamp: np.ndarray,
+        utc_offset: np.ndarray,
+        mood: np.ndarray,
+        categories: Sequence[str],
+        names: Sequence[str],
+    ):
+        n = len(day)
+        for column in (category, name, duration, timestamp, utc_offset, mood):
+            if len(column) != n:
+                raise ValueError("All activity columns must have the same length.")
+
+        self.days = np.asarray(days, dtype=np.int32)
+        self.day = np.asarray(day, dtype=np.int32)
+        self.category = np.asarray(category, dtype=np.int16)
+        self.name = np.asarray(name, dtype=np.int32)
+        self.duration = np.asarray(duration, dtype=np.int32)
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.utc_offset = np.asarray(utc_offset, dtype=np.int32)
+        self.mood = np.asarray(mood, dtype=np.int8)
+        self.categories = list(categories)
+        self.names = list(names)
+
+        self._positions: Optional[np.ndarray] = None
+
+    # -----------------------------
+    # Construction
+    # -----------------------------
+
+    @classmethod
+    def empty(cls) -> "ActivityTable":
+        return cls._from_builder(
+            _ColumnBuilder(_default_categories(), _default_names()), []
+        )
+
+    @classmethod
+    def from_day_logs(cls, day_logs: Iterable[DayLog]) -> "ActivityTable":
+        """
+        Build a table from DayLog objects (in any date order).
+        """
+        builder = _ColumnBuilder(_default_categories(), _default_names())
+        days: List[int] = []
+
+        for log in sorted(day_logs, key=lambda log: log.get_date()):
+            days.append(log.get_date().toordinal())
+            for activity in log.get_activities():
+                builder.add(activity)
+
+        return cls._from_builder(builder, days)
+
+    @classmethod
+    def from_user(cls, user: User) -> "ActivityTable":
+        if isinstance(user, ColumnarUser):
+            return user.get_table()
+        return cls.from_day_logs(user.get_all_logs())
+
+    @classmethod
+    def _from_builder(
+        cls,
+        builder: _ColumnBuilder,
+        days: Iterable[int],
+    ) -> "ActivityTable":
+        return cls(
+            days=np.unique(np.asarray(list(days), dtype=np.int32)),
+            day=np.asarray(builder.day, dtype=np.int32),
+            category=np.asarray(builder.category, dtype=np.int16),
+            name=np.asarray(builder.name, dtype=np.int32),
+            duration=np.asarray(builder.duration, dtype=np.int32),
+            timestamp=np.asarray(builder.timestamp, dtype=np.int64),
+            utc_offset=np.asarray(builder.utc_offset, dtype=np.int32),
+            mood=np.asarray(builder.mood, dtype=np.int8),
+            categories=builder.categories,
+            names=builder.names,
+        )
+
+    def extend(
+        self,
+        activities: Sequence[Activity],
+        days: Iterable[int] = (),
+    ) -> "ActivityTable":
+        """
+        Return a new table holding these rows plus the given activities.
+
+        ``days`` adds date ordinals that should exist even without activities.
+        Ties on timestamp keep existing rows first, matching DayLog ordering.
+        """
+        builder = _ColumnBuilder(self.categories, self.names)
+        for activity in activities:
+            builder.add(activity)
+
+        added = self._from_builder(builder, list(days) + builder.day)
+
+        day = np.concatenate([self.day, added.day])
+        timestamp = np.concatenate([self.timestamp, added.timestamp])
+        utc_offset = np.concatenate([self.utc_offset, added.utc_offset])
+
+        order = np.lexsort((_instants(timestamp, utc_offset), day))
+
+        return ActivityTable(
+            days=np.union1d(self.days, added.days),
+            day=day[order],
+            category=np.concatenate([self.category, added.category])[order],
+            name=np.concatenate([self.name, added.name])[order],
+            duration=np.concatenate([self.duration, added.duration])[order],
+            timestamp=timestamp[order],
+            utc_offset=utc_offset[order],
+            mood=np.concatenate([self.mood, added.mood])[order],
+            categories=added.categories,
+            names=added.names,
+        )
+
+    # -----------------------------
+    # Shape & slicing
+    # -----------------------------
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            column.nbytes
+            for column in (
+                self.days,
+                self.day,
+                self.category,
+                self.name,
+                self.duration,
+                self.timestamp,
+                self.utc_offset,
+                self.mood,
+            )
+        )
+
+    def has_day(self, ordinal: int) -> bool:
+        i = int(np.searchsorted(self.days, ordinal))
+        return i < len(self.days) and int(self.days[i]) == ordinal
+
+    def row_bounds(self, ordinal: int) -> Tuple[int, int]:
+        """
+        Return the [start, stop) row range holding activities for one day.
+        """
+        lo = int(np.searchsorted(self.day, ordinal, side="left"))
+        hi = int(np.searchsorted(self.day, ordinal, side="right"))
+        return lo, hi
+
+    def slice_days(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> "ActivityTable":
+        """
+        Return a view of the table restricted to ordinals in [start, end].
+
+        Columns of the returned table share memory with this one.
+        """
+        lo_day = 0 if start is None else int(np.searchsorted(self.days, start, "left"))
+        hi_day = len(self.days) if end is None else int(np.searchsorted(self.days, end, "right"))
+        lo = 0 if start is None else int(np.searchsorted(self.day, start, "left"))
+        hi = len(self.day) if end is None else int(np.searchsorted(self.day, end, "right"))
+
+        return ActivityTable(
+            days=self.days[lo_day:hi_day],
+            day=self.day[lo:hi],
+            category=self.category[lo:hi],
+            name=self.name[lo:hi],
+            duration=self.duration[lo:hi],
+            timestamp=self.timestamp[lo:hi],
+            utc_offset=self.utc_offset[lo:hi],
+            mood=self.mood[lo:hi],
+            categories=self.categories,
+            names=self.names,
+        )
+
+    # -----------------------------
+    # Domain views
+    # -----------------------------
+
+    def activity(self, row: int) -> Activity:
+        mood = int(self.mood[row])
+        return Activity.from_trusted(
+            name=self.names[int(self.name[row])],
+            category=self.categories[int(self.category[row])],
+            duration_minutes=int(self.duration[row]),
+            timestamp=_from_wall_micros(
+                int(self.timestamp[row]), int(self.utc_offset[row])
+            ),
+            mood=None if mood == MOOD_MISSING else mood,
+        )
+
+    def day_log(self, ordinal: int) -> Optional[DayLog]:
+        if not self.has_day(ordinal):
+            return None
+
+        day_log = DayLog(date.fromordinal(ordinal))
+        lo, hi = self.row_bounds(ordinal)
+        day_log.extend(self.activity(row) for row in range(lo, hi))
+
+        return day_log
+
+    def iter_day_logs(self) -> Iterator[DayLog]:
+        for ordinal in self.days.tolist():
+            yield self.day_log(ordinal)
+
+    # -----------------------------
+    # Vectorized reductions
+    # -----------------------------
+
+    def day_positions(self) -> np.ndarray:
+        """
+        Index into ``days`` for every activity row.
+        """
+        if self._positions is None:
+            self._positions = np.searchsorted(self.days, self.day)
+        return self._positions
+
+    def daily_totals(self) -> np.ndarray:
+        """
+        Total minutes per entry of ``days``.
+        """
+        return np.bincount(
+            self.day_positions(),
+            weights=self.duration,
+            minlength=len(self.days),
+        ).astype(np.int64)
+
+    def daily_counts(self) -> np.ndarray:
+        return np.bincount(self.day_positions(), minlength=len(self.days))
+
+    def daily_category_minutes(self) -> np.ndarray:
+        """
+        Minutes per (day, category) as a ``len(days) x len(categories)`` matrix.
+        """
+        n_days = len(self.days)
+        n_categories = len(self.categories)
+        flat = self.day_positions() * n_categories + self.category
+        return np.bincount(
+            flat,
+            weights=self.duration,
+            minlength=n_days * n_categories,
+        ).astype(np.int64).reshape(n_days, n_categories)
+
+    def daily_category_counts(self) -> np.ndarray:
+        n_days = len(self.days)
+        n_categories = len(self.categories)
+        flat = self.day_positions() * n_categories + self.category
+        return np.bincount(
+            flat,
+            minlength=n_days * n_categories,
+        ).reshape(n_days, n_categories)
+
+    def category_totals(self) -> np.ndarray:
+        return np.bincount(
+            self.category,
+            weights=self.duration,
+            minlength=len(self.categories),
+        ).astype(np.int64)
+
+    def category_counts(self) -> np.ndarray:
+        return np.bincount(self.category, minlength=len(self.categories))
+
+    def daily_mood_sums(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (mood sum, mood count) per day, ignoring unrecorded moods.
+        """
+        recorded = self.mood != MOOD_MISSING
+        positions = self.day_positions()[recorded]
+        sums = np.bincount(
+            positions,
+            weights=self.mood[recorded],
+            minlength=len(self.days),
+        ).astype(np.int64)
+        counts = np.bincount(positions, minlength=len(self.days))
+        return sums, counts
+
+
+def _instants(timestamp: np.ndarray, utc_offset: np.ndarray) -> np.ndarray:
+    """
+    Sort keys that order aware timestamps by instant and naive ones by wall clock.
+    """
+    aware = utc_offset != NAIVE_OFFSET
+    return timestamp - np.where(aware, utc_offset.astype(np.int64) * 1_000_000, 0)
+
+
+# -----------------------------
+# Domain facade
+# -----------------------------
+
+class ColumnarUser(User):
+    """
+    User whose activity history lives in an ActivityTable.
+
+    DayLogs returned by this class are views materialized from the table;
+    record new data through log_activity / add_activity_log rather than
+    mutating a returned DayLog.
+    """
+
+    def __init__(self, user_id: str, table: Optional[ActivityTable] = None):
+        super().__init__(user_id)
+        self._table = table if table is not None else ActivityTable.empty()
+        self._pending: List[Activity] = []
+        self._pending_days: set = set()
+
+    def log_activity(self, activity: Activity) -> None:
+        if not isinstance(activity, Activity):
+            raise TypeError("Only Activity instances can be logged.")
+
+        self._pending.append(activity)
+        self._pending_days.add(activity.get_timestamp().date().toordinal())
+
+    def add_activity_log(self, day_log: DayLog) -> None:
+        if not isinstance(day_log, DayLog):
+            raise TypeError("Only DayLog instances can be added.")
+
+        log_date = day_log.get_date()
+        ordinal = log_date.toordinal()
+
+        if ordinal in self._pending_days or self._table.has_day(ordinal):
+            raise ValueError(
+                f"DayLog for date {log_date} already exists for this user."
+            )
+
+        self._pending.extend(day_log.get_activities())
+        self._pending_days.add(ordinal)
+
+    def get_day_log(self, log_date: date) -> Optional[DayLog]:
+        if not isinstance(log_date, date):
+            raise TypeError("log_date must be a date instance.")
+
+        return self.get_table().day_log(log_date.toordinal())
+
+    def get_all_logs(self) -> List[DayLog]:
+        return list(self.get_table().iter_day_logs())
+
+    def get_table(self) -> ActivityTable:
+        if self._pending_days:
+            self._table = self._table.extend(self._pending, self._pending_days)
+            self._pending = []
+            self._pending_days = set()
+        return self._table
@@ -3,14 +3,22 @@ Responsibility:
 Represents a collection of activities associated with a single date.
 """
 
-from datetime import date
-from typing import List
+from bisect import insort_right
+from datetime import date, datetime
+from typing import Iterable, List
 from core.activity import Activity
 
 
+def _timestamp(activity: Activity) -> datetime:
+    return activity.get_timestamp()
+
+
 class DayLog:
     """
     Groups all activities that occur on a single calendar date.
+
+    Activities are kept ordered by timestamp; activities sharing a
+    timestamp keep the order in which they were added.
     """
 
     def __init__(self, log_date: date):
@@ -20,7 +28,7 @@ class DayLog:
         self._date = log_date
         self._activities: List[Activity] = []
 
-    def add_activity(self, activity: Activity) -> None:
+    def _validate(self, activity: Activity) -> None:
         if not isinstance(activity, Activity):
             raise TypeError("Only Activity instances can be added.")
 
@@ -30,8 +38,30 @@ class DayLog:
                 f"Activity date {activity_date} does not match DayLog date {self._date}."
             )
 
-        self._activities.append(activity)
-        self._activities.sort(key=lambda a: a.get_timestamp())
+    def add_activity(self, activity: Activity) -> None:
+        self._validate(activity)
+
+        activities = self._activities
+        if not activities or _timestamp(activities[-1]) <= activity.get_timestamp():
+            # Fast path: input arriving in chronological order
+            activities.append(activity)
+        else:
+            insort_right(activities, activity, key=_timestamp)
+
+    def extend(self, activities: Iterable[Activity]) -> None:
+        """
+        Add many activities at once.
+
+        Every activity is validated before any is added, and the log is
+        sorted once (linear when the input is already ordered).
+        """
+        new_activities = list(activities)
+
+        for activity in new_activities:
+            self._validate(activity)
+
+        self._activities.extend(new_activities)
+        self._activities.sort(key=_timestamp)
 
     def get_activities(self) -> List[Activity]:
         return list(self._activities)
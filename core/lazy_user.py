@@ -0,0 +1,58 @@
+"""
+Responsibility:
+Defines a User whose DayLogs are decoded only when first accessed.
+"""
+
+from datetime import date
+from typing import Callable, Dict, List, Optional
+
+from core.activity import Activity
+from core.day_log import DayLog
+from core.user import User
+
+
+class LazyUser(User):
+    """
+    User holding one loader per date; each DayLog is decoded on first use.
+    """
+
+    def __init__(
+        self,
+        user_id: str,
+        loaders: Dict[date, Callable[[], DayLog]],
+    ):
+        super().__init__(user_id)
+        self._loaders = dict(loaders)
+
+    def _materialize(self, log_date: date) -> None:
+        loader = self._loaders.pop(log_date, None)
+        if loader is not None:
+            self._day_logs[log_date] = loader()
+
+    def log_activity(self, activity: Activity) -> None:
+        if isinstance(activity, Activity):
+            self._materialize(activity.get_timestamp().date())
+        super().log_activity(activity)
+
+    def add_activity_log(self, day_log: DayLog) -> None:
+        if isinstance(day_log, DayLog) and day_log.get_date() in self._loaders:
+            raise ValueError(
+                f"DayLog for date {day_log.get_date()} already exists for this user."
+            )
+        super().add_activity_log(day_log)
+
+    def get_day_log(self, log_date: date) -> Optional[DayLog]:
+        if isinstance(log_date, date):
+            self._materialize(log_date)
+        return super().get_day_log(log_date)
+
+    def get_all_logs(self) -> List[DayLog]:
+        for log_date in sorted(self._loaders):
+            self._materialize(log_date)
+        return super().get_all_logs()
+
+    def get_dates(self) -> List[date]:
+        """
+        All dates held by this user, without decoding any DayLog.
+        """
+        return sorted(set(self._loaders) | set(self._day_logs))
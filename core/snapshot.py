@@ -0,0 +1,180 @@
+"""
+Responsibility:
+Reads and writes the versioned binary snapshot format for user histories.
+
+Layout (little-endian):
+    header   64 bytes   magic, version, record size, counts, string table
+    days     int32[n_days], padded to 8 bytes
+    records  RECORD_DTYPE[n_rows], fixed width
+    strings  UTF-8 JSON: user_id, categories, names
+
+Records are memory-mapped and exposed as NumPy views without copying.
+"""
+
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+from core.columnar import ActivityTable
+
+
+# -----------------------------
+# Format definition
+# -----------------------------
+
+MAGIC = b"ALSNAP\x00\x00"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sIIQQQQQ")
+HEADER_SIZE = 64
+
+RECORD_DTYPE = np.dtype(
+    {
+        "names": [
+            "day",
+            "category",
+            "mood",
+            "name",
+            "duration",
+            "timestamp",
+            "utc_offset",
+        ],
+        "formats": ["<i4", "<i2", "i1", "<i4", "<i4", "<i8", "<i4"],
+        "offsets": [0, 4, 6, 8, 12, 16, 24],
+        "itemsize": 32,
+    }
+)
+
+
+def _align8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+# -----------------------------
+# Writing
+# -----------------------------
+
+def write_snapshot(
+    path: Path,
+    user_id: str,
+    table: ActivityTable,
+    journal_seq: int = 0,
+) -> None:
+    """
+    Write a table as a binary snapshot, replacing ``path`` atomically.
+    """
+    n_days = len(table.days)
+    n_rows = len(table)
+
+    records = np.zeros(n_rows, dtype=RECORD_DTYPE)
+    records["day"] = table.day
+    records["category"] = table.category
+    records["mood"] = table.mood
+    records["name"] = table.name
+    records["duration"] = table.duration
+    records["timestamp"] = table.timestamp
+    records["utc_offset"] = table.utc_offset
+
+    strings = json.dumps(
+        {
+            "user_id": user_id,
+            "categories": table.categories,
+            "names": table.names,
+        }
+    ).encode("utf-8")
+
+    days_bytes = table.days.astype("<i4").tobytes()
+    days_padding = b"\x00" * (_align8(len(days_bytes)) - len(days_bytes))
+    records_offset = HEADER_SIZE + len(days_bytes) + len(days_padding)
+    strings_offset = records_offset + records.nbytes
+
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        RECORD_DTYPE.itemsize,
+        n_days,
+        n_rows,
+        journal_seq,
+        strings_offset,
+        len(strings),
+    )
+
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    with tmp_path.open("wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\x00"))
+        f.write(days_bytes)
+        f.write(days_padding)
+        f.write(records.tobytes())
+        f.write(strings)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+
+def read_snapshot(path: Path) -> Tuple[str, ActivityTable, int]:
+    """
+    Memory-map a binary snapshot.
+
+    Returns:
+        (user_id, table, journal_seq) where the table's columns are
+        read-only views into the mapped file.
+    """
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+
+    if len(buffer) < HEADER_SIZE:
+        raise ValueError(f"{path} is too short to be a snapshot.")
+
+    (
+        magic,
+        version,
+        record_size,
+        n_days,
+        n_rows,
+        journal_seq,
+        strings_offset,
+        strings_length,
+    ) = _HEADER.unpack_from(buffer, 0)
+
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a binary user snapshot.")
+
+    if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(
+            f"Unsupported snapshot version {version} (record size {record_size})."
+        )
+
+    records_offset = HEADER_SIZE + _align8(n_days * 4)
+
+    days = np.ndarray((n_days,), dtype="<i4", buffer=buffer, offset=HEADER_SIZE)
+    records = np.ndarray(
+        (n_rows,), dtype=RECORD_DTYPE, buffer=buffer, offset=records_offset
+    )
+
+    strings = json.loads(
+        bytes(buffer[strings_offset:strings_offset + strings_length]).decode("utf-8")
+    )
+
+    table = ActivityTable(
+        days=days,
+        day=records["day"],
+        category=records["category"],
+        name=records["name"],
+        duration=records["duration"],
+        timestamp=records["timestamp"],
+        utc_offset=records["utc_offset"],
+        mood=records["mood"],
+        categories=strings["categories"],
+        names=strings["names"],
+    )
+
+    return strings["user_id"], table, journal_seq
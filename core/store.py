@@ -1,17 +1,430 @@
 """
 Responsibility:
 Handles persistence of user activity data.
-Converts between JSON storage format and core domain objects.
+Converts between storage formats (JSON, binary snapshot) and core domain objects.
+
+Each user has a snapshot file (<user_id>.json or <user_id>.snap, chosen by
+extension) plus an optional journal of append-only segment files
+(journal/<user_id>/<seq>.jsonl). New activities are appended to the active
+segment; compaction folds sealed segments into the snapshot. JSON snapshots
+carry a date -> byte offset index (<user_id>.idx) so date windows can be
+read without decoding the whole history. A single writer process per data
+directory is assumed.
+
+data_version() gives a cheap token that changes whenever a user's stored
+data changes, and write listeners are told about every write in this
+process, so derived results can be cached and dropped on time.
 """
 
 import json
+import os
+import re
+import threading
+from bisect import bisect_left, bisect_right
 from pathlib import Path
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from config.settings import JOURNAL_COMPACTION_BYTES
 from core.user import User
 from core.day_log import DayLog
 from core.activity import Activity
+from core.columnar import ActivityTable, ColumnarUser
+from core.lazy_user import LazyUser
+from core.snapshot import read_snapshot, write_snapshot
+
+
+JSON_SUFFIX = ".json"
+BINARY_SUFFIX = ".snap"
+SNAPSHOT_SUFFIXES = (JSON_SUFFIX, BINARY_SUFFIX)
+INDEX_SUFFIX = ".idx"
+
+
+# Journal bookkeeping is shared by every Store in the process so that two
+# instances pointing at the same directory never race on a segment.
+_JOURNAL_LOCK = threading.RLock()
+_ACTIVE_SEGMENTS: Dict[Tuple[Path, str], int] = {}
+_COMPACTION_LOCKS: Dict[Tuple[Path, str], threading.Lock] = {}
+_COMPACTIONS: Dict[Tuple[Path, str], threading.Thread] = {}
+
+# Called with (resolved data_dir, user_id) after every write in this process
+_WRITE_LISTENERS: List[Callable[[Path, str], None]] = []
+
+
+# -----------------------------
+# Record conversion
+# -----------------------------
+
+def _activity_to_record(activity: Activity) -> dict:
+    return {
+        "name": activity.get_name(),
+        "category": activity.get_category(),
+        "duration_minutes": activity.get_duration_minutes(),
+        "timestamp": activity.get_timestamp().isoformat(),
+        "mood": activity.get_mood(),
+    }
+
+
+def _record_to_activity(record: dict) -> Activity:
+    # Records were validated as Activity objects when they were written
+    return Activity.from_trusted(
+        name=record["name"],
+        category=record["category"],
+        duration_minutes=record["duration_minutes"],
+        timestamp=datetime.fromisoformat(record["timestamp"]),
+        mood=record.get("mood"),
+    )
+
+
+def _user_to_dict(user: User) -> dict:
+    return {
+        "user_id": user.get_user_id(),
+        "logs": [
+            {
+                "date": log.get_date().isoformat(),
+                "activities": [
+                    _activity_to_record(activity)
+                    for activity in log.get_activities()
+                ],
+            }
+            for log in user.get_all_logs()
+        ],
+    }
+
+
+def _day_log_from_dict(log_data: dict) -> DayLog:
+    day_log = DayLog(log_date=datetime.fromisoformat(log_data["date"]).date())
+
+    day_log.extend(
+        _record_to_activity(a) for a in log_data.get("activities", [])
+    )
+
+    return day_log
+
+
+def _user_from_dict(raw: dict) -> User:
+    user = User(
+        user_id=raw["user_id"],
+    )
+
+    for log_data in raw.get("logs", []):
+        user.add_activity_log(_day_log_from_dict(log_data))
+
+    return user
+
+
+def _in_window(day: date, start: Optional[date], end: Optional[date]) -> bool:
+    return (start is None or day >= start) and (end is None or day <= end)
+
+
+def _write_json_atomic(path: Path, data: dict) -> None:
+    """
+    Write JSON to a temporary file and rename it over the target.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+
+
+def _merge_journal_days(
+    days: Iterator[dict],
+    journal: Dict[str, List[dict]],
+) -> Iterator[dict]:
+    """
+    Merge journal records, grouped by date, into a date-sorted day stream.
+    """
+    pending = sorted(journal)
+    i = 0
+
+    for log in days:
+        day = log["date"]
+        while i < len(pending) and pending[i] < day:
+            yield {"date": pending[i], "activities": journal[pending[i]]}
+            i += 1
+        if i < len(pending) and pending[i] == day:
+            log["activities"] = log.get("activities", []) + journal[day]
+            i += 1
+        yield log
+
+    for day in pending[i:]:
+        yield {"date": day, "activities": journal[day]}
+
+
+# -----------------------------
+# JSON date index
+# -----------------------------
+
+_LOGS_KEY = re.compile(r'(?<!\\)"logs"\s*:\s*\[')
+_USER_ID_KEY = re.compile(r'(?<!\\)"user_id"\s*:\s*')
+_JOURNAL_SEQ_KEY = re.compile(r'(?<!\\)"journal_seq"\s*:\s*(\d+)')
+
+
+# Bytes read per step when streaming a JSON snapshot
+STREAM_CHUNK_BYTES = 1 << 20
+
+
+class _JsonLogStream:
+    """
+    Incrementally parse the "logs" array of a JSON snapshot.
+
+    The file is read in chunks; only the current chunk and the day entry
+    being decoded are held in memory. ``user_id`` and ``journal_seq`` are
+    filled in as they are encountered, and are final once iteration ends.
+    """
+
+    def __init__(self, path: Path, chunk_size: int = STREAM_CHUNK_BYTES):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.user_id: str = path.stem
+        self.journal_seq = 0
+
+    def _scan_keys(self, text: str) -> None:
+        user_id_match = _USER_ID_KEY.search(text)
+        if user_id_match is not None:
+            try:
+                self.user_id = json.JSONDecoder().raw_decode(text, user_id_match.end())[0]
+            except json.JSONDecodeError:
+                pass
+
+        journal_seq_match = _JOURNAL_SEQ_KEY.search(text)
+        if journal_seq_match is not None:
+            self.journal_seq = int(journal_seq_match.group(1))
+
+    def __iter__(self) -> Iterator[Tuple[dict, str, int, int]]:
+        """
+        Yield (entry, raw, offset, length) for every day entry.
+
+        ``raw`` is the entry's text decoded as latin-1, which maps bytes
+        1:1 onto characters so offsets are byte offsets. ``entry`` was
+        parsed from it and is exact whenever ``raw.isascii()``.
+        """
+        decoder = json.JSONDecoder()
+
+        with self.path.open("rb") as f:
+            buf = ""
+            base = 0
+            eof = False
+
+            def fill() -> bool:
+                nonlocal buf, eof
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    eof = True
+                    return False
+                buf += chunk.decode("latin-1")
+                return True
+
+            # Header: everything before the logs array
+            logs_match = None
+            while logs_match is None:
+                logs_match = _LOGS_KEY.search(buf)
+                if logs_match is None and not fill():
+                    self._scan_keys(buf)
+                    return
+
+            self._scan_keys(buf[:logs_match.start()])
+            pos = logs_match.end()
+
+            while True:
+                while True:
+                    while pos < len(buf) and buf[pos] in " \t\r\n,":
+                        pos += 1
+                    if pos < len(buf) or not fill():
+                        break
+
+                if pos >= len(buf) or buf[pos] == "]":
+                    break
+
+                while True:
+                    try:
+                        entry, end = decoder.raw_decode(buf, pos)
+                        break
+                    except json.JSONDecodeError:
+                        if eof or not fill():
+                            raise
+
+                yield entry, buf[pos:end], base + pos, end - pos
+
+                # Drop consumed text so memory stays bounded
+                base += end
+                buf = buf[end:]
+                pos = 0
+
+            # Trailer: keys written after the logs array
+            while fill():
+                pass
+            self._scan_keys(buf[pos:])
+
+
+def _decode_stream_entry(entry: dict, raw: str) -> dict:
+    if raw.isascii():
+        return entry
+    return json.loads(raw.encode("latin-1").decode("utf-8"))
+
+
+def _build_json_index(path: Path) -> dict:
+    """
+    Stream a JSON snapshot once and record where each day's entry lives.
+
+    Returns an index with parallel, date-sorted "dates", "offsets" and
+    "lengths" lists plus the file size and mtime it was built from.
+    """
+    stat = path.stat()
+    stream = _JsonLogStream(path)
+
+    entries: List[Tuple[str, int, int]] = [
+        (entry["date"], offset, length)
+        for entry, _, offset, length in stream
+    ]
+    entries.sort()
+
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "user_id": stream.user_id,
+        "journal_seq": stream.journal_seq,
+        "dates": [e[0] for e in entries],
+        "offsets": [e[1] for e in entries],
+        "lengths": [e[2] for e in entries],
+    }
+
+
+def load_json_index(path: Path) -> dict:
+    """
+    Return the date index for a JSON snapshot, rebuilding it when stale.
+    """
+    index_path = path.with_suffix(INDEX_SUFFIX)
+    stat = path.stat()
+
+    try:
+        with index_path.open("r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index["size"] == stat.st_size and index["mtime_ns"] == stat.st_mtime_ns:
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = _build_json_index(path)
+
+    # The sidecar is only a cache; a read-only data dir still gets the
+    # in-memory index
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+    return index
+
+
+def _read_json_window(
+    path: Path,
+    start: Optional[date],
+    end: Optional[date],
+) -> Tuple[User, int]:
+    """
+    Read only the indexed byte ranges of days within [start, end].
+    """
+    index = load_json_index(path)
+    dates = index["dates"]
+
+    lo = 0 if start is None else bisect_left(dates, start.isoformat())
+    hi = len(dates) if end is None else bisect_right(dates, end.isoformat())
+
+    wanted = sorted(
+        zip(index["offsets"][lo:hi], index["lengths"][lo:hi], dates[lo:hi])
+    )
+    raw_days: Dict[date, bytes] = {}
+
+    with path.open("rb") as f:
+        for offset, length, day in wanted:
+            f.seek(offset)
+            raw_days[date.fromisoformat(day)] = f.read(length)
+
+    loaders = {
+        day: (lambda raw=raw: _day_log_from_dict(json.loads(raw.decode("utf-8"))))
+        for day, raw in raw_days.items()
+    }
+
+    return LazyUser(index["user_id"], loaders), index["journal_seq"]
+
+
+def read_user_file(path: Path) -> Tuple[User, int]:
+    """
+    Read a snapshot file in the format given by its extension.
+
+    Returns:
+        (user, journal_seq) where journal_seq is the last journal segment
+        folded into the snapshot.
+    """
+    if path.suffix == BINARY_SUFFIX:
+        user_id, table, journal_seq = read_snapshot(path)
+        return ColumnarUser(user_id, table), journal_seq
+
+    if path.suffix == JSON_SUFFIX:
+        with path.open("r", encoding="utf-8") as f:
+            raw = json.load(f)
+        return _user_from_dict(raw), raw.get("journal_seq", 0)
+
+    raise ValueError(f"Unsupported snapshot extension: {path.suffix!r}")
+
+
+def read_user_window(
+    path: Path,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Tuple[User, int]:
+    """
+    Read only the days within [start, end] from a snapshot file.
+
+    JSON snapshots use their date index and return a LazyUser; binary
+    snapshots return a ColumnarUser over a sliced, memory-mapped table.
+    """
+    if path.suffix == BINARY_SUFFIX:
+        user_id, table, journal_seq = read_snapshot(path)
+        window = table.slice_days(
+            None if start is None else start.toordinal(),
+            None if end is None else end.toordinal(),
+        )
+        return ColumnarUser(user_id, window), journal_seq
+
+    if path.suffix == JSON_SUFFIX:
+        return _read_json_window(path, start, end)
+
+    raise ValueError(f"Unsupported snapshot extension: {path.suffix!r}")
+
+
+def write_user_file(path: Path, user: User, journal_seq: int = 0) -> None:
+    """
+    Atomically write a snapshot file in the format given by its extension.
+    """
+    if path.suffix == BINARY_SUFFIX:
+        write_snapshot(
+            path,
+            user.get_user_id(),
+            ActivityTable.from_user(user),
+            journal_seq=journal_seq,
+        )
+        return
+
+    if path.suffix == JSON_SUFFIX:
+        data = _user_to_dict(user)
+        if journal_seq:
+            data["journal_seq"] = journal_seq
+        _write_json_atomic(path, data)
+        return
+
+    raise ValueError(f"Unsupported snapshot extension: {path.suffix!r}")
 
 
 class Store:
@@ -19,73 +432,538 @@ class Store:
     Central persistence layer for loading and saving user data.
     """
 
-    def __init__(self, data_dir: Path):
+    def __init__(
+        self,
+        data_dir: Path,
+        compaction_threshold_bytes: Optional[int] = JOURNAL_COMPACTION_BYTES,
+        suffix: str = JSON_SUFFIX,
+    ):
+        if suffix not in SNAPSHOT_SUFFIXES:
+            raise ValueError(f"suffix must be one of {SNAPSHOT_SUFFIXES}.")
+
         self.data_dir = data_dir
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.compaction_threshold_bytes = compaction_threshold_bytes
+        self.suffix = suffix
+
+    # -----------------------------
+    # Paths
+    # -----------------------------
+
+    def _snapshot_path(self, user_id: str) -> Path:
+        """
+        Path snapshots are written to, in this store's preferred format.
+        """
+        return self.data_dir / f"{user_id}{self.suffix}"
 
-    def load_user(self, user_id: str) -> Optional[User]:
+    def _existing_snapshot(self, user_id: str) -> Optional[Path]:
         """
-        Load a user and all associated activity logs from storage.
+        Existing snapshot for a user, preferring this store's format.
         """
-        file_path = self.data_dir / f"{user_id}.json"
+        preferred = self._snapshot_path(user_id)
+        if preferred.exists():
+            return preferred
 
-        if not file_path.exists():
-            return None
+        for suffix in SNAPSHOT_SUFFIXES:
+            path = self.data_dir / f"{user_id}{suffix}"
+            if path.exists():
+                return path
 
-        with file_path.open("r", encoding="utf-8") as f:
-            raw = json.load(f)
+        return None
 
-        user = User(
-            user_id=raw["user_id"],
-        )
+    def _journal_dir(self, user_id: str) -> Path:
+        return self.data_dir / "journal" / user_id
 
-        for log_data in raw.get("logs", []):
-            date = datetime.fromisoformat(log_data["date"]).date()
-            day_log = DayLog(log_date=date)
-
-            for a in log_data.get("activities", []):
-                activity = Activity(
-                    name=a["name"],
-                    category=a["category"],
-                    duration_minutes=a["duration_minutes"],
-                    timestamp=datetime.fromisoformat(a["timestamp"]),
-                    mood=a.get("mood"),
-                )
-                day_log.add_activity(activity)
+    def _segment_path(self, user_id: str, seq: int) -> Path:
+        return self._journal_dir(user_id) / f"{seq:08d}.jsonl"
+
+    def _journal_key(self, user_id: str) -> Tuple[Path, str]:
+        return self.data_dir.resolve(), user_id
+
+    def _segments(self, user_id: str) -> List[int]:
+        journal_dir = self._journal_dir(user_id)
+        if not journal_dir.exists():
+            return []
+        return sorted(int(p.stem) for p in journal_dir.glob("*.jsonl"))
+
+    def _active_segment(self, user_id: str) -> int:
+        """
+        Sequence number new records are appended to. Caller holds the lock.
+        """
+        key = self._journal_key(user_id)
+        if key not in _ACTIVE_SEGMENTS:
+            segments = self._segments(user_id)
+            _ACTIVE_SEGMENTS[key] = segments[-1] if segments else 1
+        return _ACTIVE_SEGMENTS[key]
+
+    def _open_segment(self, user_id: str, seq: int) -> None:
+        """
+        Make ``seq`` the active segment. Caller holds the lock.
+        """
+        path = self._segment_path(user_id, seq)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch(exist_ok=True)
+        _ACTIVE_SEGMENTS[self._journal_key(user_id)] = seq
+
+    def _compaction_lock(self, user_id: str) -> threading.Lock:
+        with _JOURNAL_LOCK:
+            return _COMPACTION_LOCKS.setdefault(
+                self._journal_key(user_id), threading.Lock()
+            )
+
+    # -----------------------------
+    # Reading
+    # -----------------------------
+
+    def _read_snapshot(
+        self,
+        user_id: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Tuple[Optional[User], int]:
+        file_path = self._existing_snapshot(user_id)
+
+        if file_path is None:
+            return None, 0
+
+        if start is None and end is None:
+            return read_user_file(file_path)
+
+        return read_user_window(file_path, start, end)
+
+    def _read_segment(self, user_id: str, seq: int) -> List[dict]:
+        """
+        Read journal records, skipping a torn line left by a crash.
+        """
+        records: List[dict] = []
+        path = self._segment_path(user_id, seq)
+
+        if not path.exists():
+            return records
+
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+
+        return records
+
+    def _replay(
+        self,
+        user_id: str,
+        upto: Optional[int] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Optional[User]:
+        user, folded = self._read_snapshot(user_id, start, end)
 
-            user.add_activity_log(day_log)
+        segments = [
+            seq for seq in self._segments(user_id)
+            if seq > folded and (upto is None or seq <= upto)
+        ]
 
+        if user is None:
+            if not any(
+                self._segment_path(user_id, seq).stat().st_size for seq in segments
+            ):
+                return None
+            user = User(user_id=user_id)
+
+        for seq in segments:
+            for record in self._read_segment(user_id, seq):
+                activity = _record_to_activity(record)
+                if _in_window(activity.get_timestamp().date(), start, end):
+                    user.log_activity(activity)
+
+        if start is not None or end is not None:
+            user.mark_window(start, end)
         return user
 
+    def load_user(
+        self,
+        user_id: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Optional[User]:
+        """
+        Load a user and associated activity logs from storage.
+
+        The snapshot is read first, then any journal segments not yet
+        folded into it are replayed in order. When ``start`` / ``end``
+        (inclusive) are given, only DayLogs in that window are read, and
+        they are decoded lazily on first access; such a user is marked
+        with its window and cannot be passed to save_user.
+        """
+        with self._compaction_lock(user_id):
+            return self._replay(user_id, start=start, end=end)
+
+    def iter_day_logs(
+        self,
+        user_id: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Iterator[dict]:
+        """
+        Stream a user's days as log dictionaries, in ascending date order.
+
+        Each day is {"date": "YYYY-MM-DD", "activities": [record, ...]},
+        the layout the analytics functions consume. Only one snapshot day
+        is decoded at a time, so memory is bounded by the date index and
+        the journal records not yet compacted (bounded by the compaction
+        threshold), which are merged into their days. The data is
+        captured when this is called, so later writes and compactions do
+        not affect an iteration in progress.
+        """
+        with self._compaction_lock(user_id):
+            snapshot_days, folded = self._snapshot_day_stream(user_id, start, end)
+
+            journal: Dict[str, List[dict]] = {}
+            for seq in self._segments(user_id):
+                if seq <= folded:
+                    continue
+                for record in self._read_segment(user_id, seq):
+                    day = datetime.fromisoformat(record["timestamp"]).date()
+                    if _in_window(day, start, end):
+                        journal.setdefault(day.isoformat(), []).append(record)
+
+        return _merge_journal_days(snapshot_days, journal)
+
+    def _snapshot_day_stream(
+        self,
+        user_id: str,
+        start: Optional[date],
+        end: Optional[date],
+    ) -> Tuple[Iterator[dict], int]:
+        """
+        Open the snapshot and return a lazy stream of its days in the window.
+        """
+        file_path = self._existing_snapshot(user_id)
+
+        if file_path is None:
+            return iter(()), 0
+
+        if file_path.suffix == BINARY_SUFFIX:
+            _, table, journal_seq = read_snapshot(file_path)
+            window = table.slice_days(
+                None if start is None else start.toordinal(),
+                None if end is None else end.toordinal(),
+            )
+            days = (
+                {
+                    "date": day_log.get_date().isoformat(),
+                    "activities": [
+                        _activity_to_record(a) for a in day_log.get_activities()
+                    ],
+                }
+                for day_log in window.iter_day_logs()
+            )
+            return days, journal_seq
+
+        # Open before releasing the lock: a later os.replace cannot
+        # change the file this handle reads
+        f = file_path.open("rb")
+        try:
+            index = load_json_index(file_path)
+        except Exception:
+            f.close()
+            raise
+
+        dates = index["dates"]
+        lo = 0 if start is None else bisect_left(dates, start.isoformat())
+        hi = len(dates) if end is None else bisect_right(dates, end.isoformat())
+        ranges = list(zip(index["offsets"][lo:hi], index["lengths"][lo:hi]))
+
+        def read_days() -> Iterator[dict]:
+            with f:
+                for offset, length in ranges:
+                    f.seek(offset)
+                    yield json.loads(f.read(length).decode("utf-8"))
+
+        return read_days(), index["journal_seq"]
+
+    def iter_user_ids(self) -> Iterator[str]:
+        """
+        Yield the id of every stored user without loading any of them.
+
+        Users are discovered from snapshot files and from journals that
+        have not been compacted yet; the directory is streamed, not listed.
+        """
+        with os.scandir(self.data_dir) as entries:
+            for entry in entries:
+                stem, suffix = os.path.splitext(entry.name)
+                if suffix not in SNAPSHOT_SUFFIXES or not entry.is_file():
+                    continue
+                # A user written in both formats is reported once
+                if suffix != JSON_SUFFIX and (self.data_dir / f"{stem}{JSON_SUFFIX}").exists():
+                    continue
+                yield stem
+
+        journal_root = self.data_dir / "journal"
+        if not journal_root.exists():
+            return
+
+        with os.scandir(journal_root) as entries:
+            for entry in entries:
+                if entry.is_dir() and self._existing_snapshot(entry.name) is None:
+                    if self._segments(entry.name):
+                        yield entry.name
+
+    def data_version(self, user_id: str) -> Optional[Tuple]:
+        """
+        Token identifying the current contents of a user's stored data.
+
+        Built from the size and modification time of the snapshot and of
+        every non-empty journal segment, so it costs a few stat calls,
+        holds across processes and changes on every save or append.
+        Returns None when nothing is stored for the user.
+        """
+        with self._compaction_lock(user_id):
+            parts: List[Tuple] = []
+            file_path = self._existing_snapshot(user_id)
+
+            if file_path is not None:
+                stat = file_path.stat()
+                parts.append((file_path.suffix, stat.st_size, stat.st_mtime_ns))
+
+            for seq in self._segments(user_id):
+                stat = self._segment_path(user_id, seq).stat()
+                if stat.st_size:
+                    parts.append((seq, stat.st_size, stat.st_mtime_ns))
+
+            return tuple(parts) or None
+
+    def date_bounds(self, user_id: str) -> Optional[Tuple[date, date]]:
+        """
+        Return the first and last logged dates without loading any DayLog.
+        """
+        with self._compaction_lock(user_id):
+            days: List[date] = []
+            folded = 0
+            file_path = self._existing_snapshot(user_id)
+
+            if file_path is not None and file_path.suffix == BINARY_SUFFIX:
+                _, table, folded = read_snapshot(file_path)
+                if len(table.days):
+                    days += [
+                        date.fromordinal(int(table.days[0])),
+                        date.fromordinal(int(table.days[-1])),
+                    ]
+            elif file_path is not None:
+                index = load_json_index(file_path)
+                folded = index["journal_seq"]
+                if index["dates"]:
+                    days += [
+                        date.fromisoformat(index["dates"][0]),
+                        date.fromisoformat(index["dates"][-1]),
+                    ]
+
+            for seq in self._segments(user_id):
+                if seq > folded:
+                    days += [
+                        datetime.fromisoformat(record["timestamp"]).date()
+                        for record in self._read_segment(user_id, seq)
+                    ]
+
+            if not days:
+                return None
+
+            return min(days), max(days)
+
+    # -----------------------------
+    # Writing
+    # -----------------------------
+
     def save_user(self, user: User) -> None:
         """
         Persist a user and all activity logs to storage.
+
+        The snapshot is replaced atomically and supersedes any journal
+        segments written before the call. A user loaded for a date window
+        holds only part of the history and is refused with ValueError;
+        add its new activities with append_activities instead.
         """
-        file_path = self.data_dir / f"{user.get_user_id()}.json"
+        user_id = user.get_user_id()
 
-        data = {
-            "user_id": user.get_user_id(),
-            "logs": [],
-        }
+        if user.get_window() is not None:
+            raise ValueError(
+                f"User {user_id!r} was loaded for a date window; saving it "
+                "would drop the rest of its history."
+            )
 
-        for log in user.get_all_logs():
-            log_entry = {
-                "date": log.get_date().isoformat(),
-                "activities": [],
-            }
+        with self._compaction_lock(user_id):
+            with _JOURNAL_LOCK:
+                sealed = self._active_segment(user_id)
+                has_journal = bool(self._segments(user_id))
+                if has_journal:
+                    self._open_segment(user_id, sealed + 1)
+
+            self._write_snapshot(user, sealed if has_journal else 0)
+
+            if has_journal:
+                self._drop_segments(user_id, sealed)
+
+        self._notify_write(user_id)
+
+    def _write_snapshot(self, user: User, journal_seq: int) -> None:
+        """
+        Write the snapshot in this store's format and drop other formats.
+        """
+        user_id = user.get_user_id()
+        path = self._snapshot_path(user_id)
+        write_user_file(path, user, journal_seq)
+
+        if self.suffix == JSON_SUFFIX:
+            load_json_index(path)
+        else:
+            path.with_suffix(INDEX_SUFFIX).unlink(missing_ok=True)
+
+        for suffix in SNAPSHOT_SUFFIXES:
+            if suffix != self.suffix:
+                (self.data_dir / f"{user_id}{suffix}").unlink(missing_ok=True)
+
+    @staticmethod
+    def convert(source: Path, target: Path) -> None:
+        """
+        Losslessly convert a snapshot between formats, by file extension.
+        """
+        user, journal_seq = read_user_file(source)
+        write_user_file(target, user, journal_seq)
 
-            for activity in log.get_activities():
-                log_entry["activities"].append(
-                    {
-                        "name": activity.get_name(),
-                        "category": activity.get_category(),
-                        "duration_minutes": activity.get_duration_minutes(),
-                        "timestamp": activity.get_timestamp().isoformat(),
-                        "mood": activity.get_mood(),
-                    }
+    def append_activities(
+        self,
+        user_id: str,
+        activities: Iterable[Activity],
+    ) -> None:
+        """
+        Append activities to the user's journal.
+
+        Cost is proportional to the number of new activities, not to the
+        size of the stored history.
+        """
+        lines: List[str] = []
+        for activity in activities:
+            if not isinstance(activity, Activity):
+                raise TypeError("Only Activity instances can be appended.")
+            lines.append(json.dumps(_activity_to_record(activity)) + "\n")
+
+        if not lines:
+            return
+
+        with _JOURNAL_LOCK:
+            seq = self._active_segment(user_id)
+            path = self._segment_path(user_id, seq)
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            with path.open("a+b") as f:
+                # Terminate a torn record so it cannot swallow the next one
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                f.write("".join(lines).encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+
+            size = path.stat().st_size
+
+        self._notify_write(user_id)
+
+        if (
+            self.compaction_threshold_bytes is not None
+            and size >= self.compaction_threshold_bytes
+        ):
+            self.compact(user_id, background=True)
+
+    def log_activity(self, user_id: str, activity: Activity) -> None:
+        """
+        Append a single activity to the user's journal.
+        """
+        self.append_activities(user_id, [activity])
+
+    # -----------------------------
+    # Write listeners
+    # -----------------------------
+
+    @staticmethod
+    def add_write_listener(listener: Callable[[Path, str], None]) -> None:
+        """
+        Register ``listener(data_dir, user_id)``, called after any Store in
+        this process writes data for a user. ``data_dir`` is resolved.
+        """
+        with _JOURNAL_LOCK:
+            if listener not in _WRITE_LISTENERS:
+                _WRITE_LISTENERS.append(listener)
+
+    @staticmethod
+    def remove_write_listener(listener: Callable[[Path, str], None]) -> None:
+        with _JOURNAL_LOCK:
+            if listener in _WRITE_LISTENERS:
+                _WRITE_LISTENERS.remove(listener)
+
+    def _notify_write(self, user_id: str) -> None:
+        with _JOURNAL_LOCK:
+            listeners = list(_WRITE_LISTENERS)
+
+        data_dir, _ = self._journal_key(user_id)
+        for listener in listeners:
+            listener(data_dir, user_id)
+
+    # -----------------------------
+    # Compaction
+    # -----------------------------
+
+    def compact(
+        self,
+        user_id: str,
+        background: bool = False,
+    ) -> Optional[threading.Thread]:
+        """
+        Fold journal segments into the snapshot.
+
+        The active segment is sealed first, so appends continue while the
+        snapshot is rebuilt. The new snapshot records the last folded
+        sequence number and is renamed into place before any segment is
+        deleted; a crash at any point leaves either the old snapshot with
+        all segments, or the new snapshot with segments that are skipped
+        on replay.
+        """
+        if background:
+            key = self._journal_key(user_id)
+            with _JOURNAL_LOCK:
+                running = _COMPACTIONS.get(key)
+                if running is not None and running.is_alive():
+                    return running
+
+                thread = threading.Thread(
+                    target=self.compact,
+                    args=(user_id,),
+                    name=f"compact-{user_id}",
+                    daemon=True,
                 )
+                _COMPACTIONS[key] = thread
+                thread.start()
+                return thread
+
+        with self._compaction_lock(user_id):
+            with _JOURNAL_LOCK:
+                if not self._segments(user_id):
+                    return None
+                sealed = self._active_segment(user_id)
+                self._open_segment(user_id, sealed + 1)
+
+            user = self._replay(user_id, upto=sealed)
+            if user is not None:
+                self._write_snapshot(user, sealed)
+
+            self._drop_segments(user_id, sealed)
 
-            data["logs"].append(log_entry)
+        return None
 
-        with file_path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+    def _drop_segments(self, user_id: str, upto: int) -> None:
+        for seq in self._segments(user_id):
+            if seq <= upto:
+                self._segment_path(user_id, seq).unlink(missing_ok=True)
@@ -4,7 +4,7 @@ Defines the User entity that owns and manages activity logs.
 """
 
 from datetime import date
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from core.activity import Activity
 from core.day_log import DayLog
 
@@ -20,6 +20,7 @@ class User:
 
         self._user_id = user_id
         self._day_logs: Dict[date, DayLog] = {}
+        self._window: Optional[Tuple[Optional[date], Optional[date]]] = None
 
     def log_activity(self, activity: Activity) -> None:
         if not isinstance(activity, Activity):
@@ -56,3 +57,15 @@ class User:
 
     def get_user_id(self) -> str:
         return self._user_id
+
+    def mark_window(self, start: Optional[date], end: Optional[date]) -> None:
+        """
+        Record that only the days within [start, end] were loaded.
+        """
+        self._window = (start, end)
+
+    def get_window(self) -> Optional[Tuple[Optional[date], Optional[date]]]:
+        """
+        (start, end) of the loaded date window, or None for a full history.
+        """
+        return self._window
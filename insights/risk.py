@@ -1,3 +1,6 @@
+from collections.abc import Mapping
+
+
 # -----------------------------
 # Risk thresholds (v1.1)
 # -----------------------------
@@ -6,8 +9,11 @@ DAILY_VARIABILITY_HIGH = 90.0     # minutes (raw scale)
 DOMINANCE_RATIO_HIGH  = 0.65
 CATEGORY_BALANCE_LOW  = 0.35
 
+# The only weekly features the classifier reads
+RISK_FEATURES = ("daily_variability", "dominance_ratio", "category_balance")
 
-def _get_feature(features: dict, *keys: str, default: float = 0.0) -> float:
+
+def _get_feature(features: Mapping, *keys: str, default: float = 0.0) -> float:
     """
     Helper to support multiple feature aliases.
     """
@@ -17,10 +23,13 @@ def _get_feature(features: dict, *keys: str, default: float = 0.0) -> float:
     return default
 
 
-def classify_weekly_risk(features: dict[str, float]) -> dict:
+def classify_weekly_risk(features: Mapping[str, float]) -> dict:
     """
     Classify structural trajectory risk based on weekly features.
 
+    Only RISK_FEATURES are read, so a lazy mapping (e.g.
+    ml.train.weekly_feature_window) computes nothing else.
+
     Returns:
         {
             "risk_level": "R0" | "R1" | "R2" | "R3" | "R4",
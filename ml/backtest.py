@@ -0,0 +1,398 @@
+"""
+Responsibility:
+Rolling-origin backtesting of weekly forecasts.
+
+Every cutoff in a user's history (a day index with at least one week
+before it and one week after it) is one fold: each method forecasts the
+total of the 7 days from the cutoff using only the days before it. Days
+follow the gap policy of the weekly pipeline (WEEKLY_GAP_POLICY): active
+days under "skip", calendar days otherwise; under "insufficient", folds
+whose forecast week misses a day are left out and methods whose input
+weeks miss one have no forecast.
+Methods:
+    previous_week: total of the last 7 days (the production baseline).
+    seasonal_naive: total of the same week one season (BACKTEST_SEASON_WEEKS) ago.
+    moving_average: mean weekly total over BACKTEST_MOVING_AVERAGE_WEEKS weeks.
+    linear_model: train_weekly_model refit on the sliding windows whose
+        target ends before the cutoff, as the weekly pipeline would.
+
+Baselines are computed for all cutoffs at once from prefix sums; the
+linear model is refit per cutoff. Results are kept in a compact columnar
+BacktestResults table.
+"""
+
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from analytics.aggregations import ActivityAggregates, aggregate_user
+from analytics.windows import GAP_INSUFFICIENT
+from config.settings import (
+    BACKTEST_MOVING_AVERAGE_WEEKS,
+    BACKTEST_SEASON_WEEKS,
+    DAYS_PER_WEEK,
+    WEEKLY_GAP_POLICY,
+    WEEKLY_TRAINING_LOOKBACK_DAYS,
+    WEEKLY_TRAINING_STRIDE_DAYS,
+)
+from ml.metrics import grouped_metrics, mean_absolute_error, root_mean_squared_error
+from ml.train import daily_series
+from ml.train_weekly_model import train_weekly_model
+from ml.weekly_features import sliding_weekly_features
+
+
+BACKTEST_METHODS: Tuple[str, ...] = (
+    "previous_week",
+    "seasonal_naive",
+    "moving_average",
+    "linear_model",
+)
+
+
+# -----------------------------
+# Results table
+# -----------------------------
+
+class BacktestResults:
+    """
+    One row per (user, cutoff) fold.
+
+    Attributes:
+        user_ids: Users referenced by ``user``.
+        user: (folds,) index into user_ids.
+        cutoff: (folds,) date ordinal of the first forecast day.
+        y_true: (folds,) actual totals of the forecast week.
+        y_pred: (folds, methods) forecasts, NaN where a method is undefined.
+    """
+
+    def __init__(
+        self,
+        user_ids: List[str],
+        user: np.ndarray,
+        cutoff: np.ndarray,
+        y_true: np.ndarray,
+        y_pred: np.ndarray,
+        methods: Sequence[str] = BACKTEST_METHODS,
+    ):
+        if y_pred.shape != (len(y_true), len(methods)):
+            raise ValueError("y_pred must have shape (folds, methods).")
+
+        self.user_ids = list(user_ids)
+        self.methods = tuple(methods)
+        self.user = np.asarray(user, dtype=np.int64)
+        self.cutoff = np.asarray(cutoff, dtype=np.int64)
+        self.y_true = np.asarray(y_true, dtype=float)
+        self.y_pred = np.asarray(y_pred, dtype=float)
+
+    def __len__(self) -> int:
+        return len(self.y_true)
+
+    @classmethod
+    def empty(cls, user_ids: Optional[List[str]] = None) -> "BacktestResults":
+        return cls(
+            user_ids or [],
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.int64),
+            np.empty(0),
+            np.empty((0, len(BACKTEST_METHODS))),
+        )
+
+    @classmethod
+    def concat(cls, parts: Sequence["BacktestResults"]) -> "BacktestResults":
+        """
+        Merge results (e.g. from several workers), sorted by user then cutoff.
+        """
+        user_ids: Dict[str, int] = {}
+        users, cutoffs, y_true, y_pred = [], [], [], []
+
+        for part in parts:
+            remap = np.array(
+                [user_ids.setdefault(u, len(user_ids)) for u in part.user_ids],
+                dtype=np.int64,
+            )
+            users.append(remap[part.user] if len(part) else part.user)
+            cutoffs.append(part.cutoff)
+            y_true.append(part.y_true)
+            y_pred.append(part.y_pred)
+
+        if not parts:
+            return cls.empty()
+
+        merged = cls(
+            list(user_ids),
+            np.concatenate(users),
+            np.concatenate(cutoffs),
+            np.concatenate(y_true),
+            np.concatenate(y_pred),
+            parts[0].methods,
+        )
+        order = np.lexsort((merged.cutoff, merged.user))
+        return merged._take(order)
+
+    def _take(self, rows: np.ndarray) -> "BacktestResults":
+        return BacktestResults(
+            self.user_ids,
+            self.user[rows],
+            self.cutoff[rows],
+            self.y_true[rows],
+            self.y_pred[rows],
+            self.methods,
+        )
+
+    def for_user(self, user_id: str) -> "BacktestResults":
+        if user_id not in self.user_ids:
+            return BacktestResults.empty([user_id])
+        return self._take(np.flatnonzero(self.user == self.user_ids.index(user_id)))
+
+    def summary(self, user_id: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """
+        MAE and RMSE per method over the folds where every method has a
+        forecast, so the methods are compared on the same weeks.
+        """
+        results = self if user_id is None else self.for_user(user_id)
+        common = ~np.isnan(results.y_pred).any(axis=1)
+
+        shape = results.y_pred.shape
+        y_true = np.broadcast_to(results.y_true[:, None], shape)
+        mask = np.broadcast_to(common[:, None], shape)
+        mae = mean_absolute_error(y_true, results.y_pred, axis=0, mask=mask)
+        rmse = root_mean_squared_error(y_true, results.y_pred, axis=0, mask=mask)
+
+        folds = int(common.sum())
+        return {
+            method: {
+                "folds": folds,
+                "mae": float(mae[j]) if folds else None,
+                "rmse": float(rmse[j]) if folds else None,
+            }
+            for j, method in enumerate(results.methods)
+        }
+
+    def user_metrics(self, quantiles: Sequence[float] = ()) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Every metric per user and method in one grouped pass.
+
+        Returns:
+            {method: {metric: (users,) array aligned with user_ids}}, over
+            each user's folds where every method has a forecast.
+        """
+        common = ~np.isnan(self.y_pred).any(axis=1)
+        return {
+            method: grouped_metrics(
+                self.y_true,
+                self.y_pred[:, j],
+                self.user,
+                n_groups=len(self.user_ids),
+                mask=common,
+                quantiles=quantiles,
+            )
+            for j, method in enumerate(self.methods)
+        }
+
+    def to_rows(self) -> List[Dict[str, object]]:
+        """
+        One plain dict per fold, e.g. for JSON output.
+        """
+        rows = []
+        for i in range(len(self)):
+            predictions = {
+                method: None if np.isnan(value) else value
+                for method, value in zip(self.methods, self.y_pred[i].tolist())
+            }
+            rows.append({
+                "user_id": self.user_ids[self.user[i]],
+                "cutoff": date.fromordinal(int(self.cutoff[i])).isoformat(),
+                "y_true": float(self.y_true[i]),
+                "predictions": predictions,
+            })
+        return rows
+
+
+# -----------------------------
+# Engine
+# -----------------------------
+
+def backtest_series(
+    day_totals: np.ndarray,
+    day_category_minutes: np.ndarray,
+    cutoffs: Optional[np.ndarray] = None,
+    season_weeks: int = BACKTEST_SEASON_WEEKS,
+    average_weeks: int = BACKTEST_MOVING_AVERAGE_WEEKS,
+    stride: int = WEEKLY_TRAINING_STRIDE_DAYS,
+    lookback_days: Optional[int] = WEEKLY_TRAINING_LOOKBACK_DAYS,
+    present: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Forecast every fold of one user's day series.
+
+    Args:
+        day_totals: (days,) total minutes per day, in date order (see
+            ml.train.daily_series).
+        day_category_minutes: (days, categories) minutes per day.
+        cutoffs: Day indices to evaluate; defaults to every valid one.
+        stride, lookback_days: Training windows of the linear model, as
+            in build_sliding_weekly_training_data.
+        present: Optional (days,) mask of the days with data, for the
+            "insufficient" gap policy: cutoffs whose forecast week misses
+            a day are dropped, and forecasts (or training windows) that
+            would read such a week are NaN (or left out).
+
+    Returns:
+        (cutoffs, y_true, y_pred) with y_pred columns following
+        BACKTEST_METHODS.
+    """
+    if season_weeks <= 0 or average_weeks <= 0:
+        raise ValueError("season_weeks and average_weeks must be positive integers.")
+    if stride <= 0:
+        raise ValueError("stride must be a positive integer.")
+
+    week = DAYS_PER_WEEK
+    day_totals = np.asarray(day_totals, dtype=float)
+    n = len(day_totals)
+
+    valid = np.arange(week, n - week + 1)
+    if cutoffs is None:
+        cutoffs = valid
+    cutoffs = np.asarray(cutoffs, dtype=np.int64)
+    if len(cutoffs) and (cutoffs.min() < week or cutoffs.max() > n - week):
+        raise ValueError("cutoffs must leave one week before and after them.")
+
+    sums = np.concatenate(([0.0], np.cumsum(day_totals)))
+    complete = _complete_weeks(present, n)
+    if complete is not None:
+        cutoffs = cutoffs[complete[cutoffs]]
+
+    def window(end: np.ndarray, days: int) -> np.ndarray:
+        # Total of the ``days`` days before ``end``; NaN where they do not
+        # exist or, under "insufficient", one of them has no data
+        start = end - days
+        out = np.full(len(end), np.nan)
+        ok = start >= 0
+        if complete is not None:
+            ok[ok] = np.all(
+                [complete[start[ok] + k] for k in range(0, days, week)], axis=0
+            )
+        out[ok] = sums[end[ok]] - sums[start[ok]]
+        return out
+
+    y_true = sums[cutoffs + week] - sums[cutoffs]
+    y_pred = np.full((len(cutoffs), len(BACKTEST_METHODS)), np.nan)
+    y_pred[:, 0] = window(cutoffs, week)
+    y_pred[:, 1] = window(cutoffs - (season_weeks - 1) * week, week)
+    y_pred[:, 2] = window(cutoffs, average_weeks * week) / average_weeks
+    y_pred[:, 3] = _linear_model_forecasts(
+        day_totals, day_category_minutes, cutoffs, stride, lookback_days, complete
+    )
+
+    return cutoffs, y_true, y_pred
+
+
+def _complete_weeks(present: Optional[np.ndarray], n: int) -> Optional[np.ndarray]:
+    """
+    (n + 1,) mask: True at s where days [s, s + 7) all have data. None
+    when every day counts.
+    """
+    if present is None:
+        return None
+    week = DAYS_PER_WEEK
+    missing = np.concatenate(([0], np.cumsum(~np.asarray(present, dtype=bool))))
+    complete = np.zeros(n + 1, dtype=bool)
+    if n >= week:
+        complete[:n - week + 1] = missing[week:] == missing[:-week]
+    return complete
+
+
+def _linear_model_forecasts(
+    day_totals: np.ndarray,
+    day_category_minutes: np.ndarray,
+    cutoffs: np.ndarray,
+    stride: int,
+    lookback_days: Optional[int],
+    complete: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    week = DAYS_PER_WEEK
+    forecasts = np.full(len(cutoffs), np.nan)
+
+    # Row s: features of days [s, s + 7), target the total of [s + 7, s + 14)
+    X_all, y_all = sliding_weekly_features(day_totals, day_category_minutes)
+    if len(X_all) == 0:
+        return forecasts
+
+    for i, cutoff in enumerate(cutoffs.tolist()):
+        last = cutoff - 2 * week  # newest window whose target precedes the cutoff
+        if last < 0:
+            continue
+        first = 0 if lookback_days is None else max(0, cutoff - lookback_days)
+        # Windows step back from the newest one, as in sliding_weekly_features
+        rows = np.arange(last, first - 1, -stride)[::-1]
+        if complete is not None:
+            if not complete[cutoff - week]:
+                continue
+            rows = rows[complete[rows] & complete[rows + week]]
+
+        try:
+            model, _ = train_weekly_model(None, training_data=(X_all[rows], y_all[rows]))
+        except ValueError:
+            continue
+        forecasts[i] = model.predict(X_all[cutoff - week:cutoff - week + 1])[0]
+
+    return forecasts
+
+
+def user_series(
+    aggregates: ActivityAggregates,
+    gaps: str = WEEKLY_GAP_POLICY,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (ordinals, day_totals, day_category_minutes, present) of the user's
+    days under the ``gaps`` policy, as the weekly pipeline windows them
+    (see ml.train.daily_series).
+    """
+    return daily_series(aggregates, gaps)
+
+
+def backtest_user(
+    user,
+    aggregates: Optional[ActivityAggregates] = None,
+    split: int = 0,
+    n_splits: int = 1,
+    gaps: str = WEEKLY_GAP_POLICY,
+    **options,
+) -> BacktestResults:
+    """
+    Backtest every method over one user's cutoffs.
+
+    ``split`` / ``n_splits`` select every n-th cutoff so one long history
+    can be spread over several workers; the splits interleave, which
+    balances the growing cost of later linear-model refits. ``gaps`` is
+    the week policy of the weekly pipeline.
+    """
+    if not 0 <= split < n_splits:
+        raise ValueError("split must be in [0, n_splits).")
+
+    if aggregates is None:
+        if user is None:
+            return BacktestResults.empty()
+        aggregates = aggregate_user(user)
+
+    user_id = user.get_user_id() if user is not None else ""
+    ordinals, day_totals, category_minutes, present = user_series(aggregates, gaps)
+
+    week = DAYS_PER_WEEK
+    cutoffs = np.arange(week, len(ordinals) - week + 1)[split::n_splits]
+    cutoffs, y_true, y_pred = backtest_series(
+        day_totals,
+        category_minutes,
+        cutoffs,
+        present=present if gaps == GAP_INSUFFICIENT else None,
+        **options,
+    )
+
+    return BacktestResults(
+        [user_id],
+        np.zeros(len(cutoffs), dtype=np.int64),
+        ordinals[cutoffs],
+        y_true,
+        y_pred,
+    )
@@ -0,0 +1,278 @@
+"""
+Responsibility:
+Fits one linear regression per user for many users at once.
+
+Per-user design matrices are padded into a users x samples x features
+stack with a mask of real rows, and every least-squares problem is solved
+by the same stacked np.linalg call. Results come back as a single
+CoefficientTable rather than one model object per user; each row matches
+what LinearRegressionModel would fit for that user.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import REGRESSION_RIDGE_ALPHA
+
+
+BATCH_SOLVERS = ("lstsq", "cholesky")
+
+
+# -----------------------------
+# Coefficient table
+# -----------------------------
+
+class CoefficientTable:
+    """
+    Intercepts and coefficients of many per-user linear models.
+
+    Attributes:
+        user_ids: One id per row.
+        feature_names: Column order of ``weights``.
+        intercepts: (users,) intercepts, NaN for users without samples.
+        weights: (users, features) coefficients, NaN for users without samples.
+        n_samples: (users,) training samples per user.
+    """
+
+    def __init__(
+        self,
+        user_ids: List[str],
+        feature_names: List[str],
+        intercepts: np.ndarray,
+        weights: np.ndarray,
+        n_samples: np.ndarray,
+    ):
+        if weights.shape != (len(user_ids), len(feature_names)):
+            raise ValueError("weights must have shape (users, features).")
+
+        self.user_ids = list(user_ids)
+        self.feature_names = list(feature_names)
+        self.intercepts = intercepts
+        self.weights = weights
+        self.n_samples = n_samples
+        self._rows = {user_id: i for i, user_id in enumerate(self.user_ids)}
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._rows
+
+    def row(self, user_id: str) -> int:
+        try:
+            return self._rows[user_id]
+        except KeyError:
+            raise KeyError(f"No coefficients for user {user_id!r}.") from None
+
+    def coefficients(self, user_id: str) -> Dict[str, float]:
+        """
+        Coefficients of one user mapped to feature names.
+        """
+        return dict(zip(self.feature_names, self.weights[self.row(user_id)].tolist()))
+
+    def intercept(self, user_id: str) -> float:
+        return float(self.intercepts[self.row(user_id)])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict for every user at once.
+
+        Args:
+            X: (users, features) one row per user, or
+               (users, samples, features).
+
+        Returns:
+            (users,) or (users, samples) predictions.
+        """
+        X = np.asarray(X, dtype=float)
+        if X.shape[0] != len(self) or X.shape[-1] != len(self.feature_names):
+            raise ValueError("X must have one leading row per user and one column per feature.")
+
+        if X.ndim == 2:
+            return self.intercepts + np.einsum("up,up->u", X, self.weights)
+        return self.intercepts[:, None] + np.einsum("unp,up->un", X, self.weights)
+
+    def to_rows(self) -> List[Dict[str, object]]:
+        """
+        One plain dict per user, e.g. for JSON output.
+        """
+        return [
+            {
+                "user_id": user_id,
+                "intercept": float(self.intercepts[i]),
+                "coefficients": dict(zip(self.feature_names, self.weights[i].tolist())),
+                "n_samples": int(self.n_samples[i]),
+            }
+            for i, user_id in enumerate(self.user_ids)
+        ]
+
+
+# -----------------------------
+# Stacking
+# -----------------------------
+
+def stack_training_data(
+    datasets: Sequence[Tuple[np.ndarray, np.ndarray]],
+    max_samples: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pad per-user (X, y) pairs into one stack.
+
+    Users with more than ``max_samples`` rows keep their most recent ones.
+
+    Returns:
+        (X, y, mask) shaped (users, samples, features), (users, samples)
+        and (users, samples); padded rows are zero and masked out.
+    """
+    if not datasets:
+        raise ValueError("At least one dataset is required.")
+
+    arrays = [
+        (np.asarray(X, dtype=float), np.asarray(y, dtype=float)) for X, y in datasets
+    ]
+    n_features = arrays[0][0].shape[-1]
+    longest = max(len(y) for _, y in arrays)
+    width = longest if max_samples is None else min(longest, max_samples)
+
+    X_stack = np.zeros((len(arrays), width, n_features))
+    y_stack = np.zeros((len(arrays), width))
+    mask = np.zeros((len(arrays), width), dtype=bool)
+
+    for i, (X, y) in enumerate(arrays):
+        if X.ndim != 2 or X.shape[1] != n_features or len(X) != len(y):
+            raise ValueError(f"Dataset {i} does not match the shape of the others.")
+
+        start = max(0, len(y) - width)
+        count = len(y) - start
+        X_stack[i, :count] = X[start:]
+        y_stack[i, :count] = y[start:]
+        mask[i, :count] = True
+
+    return X_stack, y_stack, mask
+
+
+# -----------------------------
+# Fitting
+# -----------------------------
+
+def _solve_svd(A: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # Minimum-norm solution; zero (padded) rows do not change it
+    return (np.linalg.pinv(A) @ b[..., None])[..., 0]
+
+
+def _solve_lstsq(A: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if A.shape[1] < A.shape[2]:
+        return _solve_svd(A, b)
+
+    Q, R = np.linalg.qr(A)
+    diag = np.abs(np.diagonal(R, axis1=1, axis2=2))
+    # Rank-deficient users have no unique triangular solution
+    full_rank = diag.min(axis=1) > np.finfo(float).eps * A.shape[1] * diag.max(axis=1)
+
+    weights = np.empty(A.shape[::2])
+    if full_rank.any():
+        rhs = np.swapaxes(Q[full_rank], 1, 2) @ b[full_rank][..., None]
+        weights[full_rank] = np.linalg.solve(R[full_rank], rhs)[..., 0]
+    if not full_rank.all():
+        weights[~full_rank] = _solve_svd(A[~full_rank], b[~full_rank])
+    return weights
+
+
+def _solve_cholesky(A: np.ndarray, b: np.ndarray) -> np.ndarray:
+    At = np.swapaxes(A, 1, 2)
+    gram = At @ A
+    rhs = At @ b[..., None]
+
+    definite = np.ones(len(A), dtype=bool)
+    try:
+        # Factorizing is only a definiteness check; one stacked solve is faster
+        # than two stacked triangular ones without scipy
+        np.linalg.cholesky(gram)
+    except np.linalg.LinAlgError:
+        # One singular user fails the whole stack; find them and use SVD
+        eigenvalues = np.linalg.eigvalsh(gram)
+        tolerance = np.finfo(float).eps * gram.shape[-1] * eigenvalues[:, -1]
+        definite = eigenvalues[:, 0] > tolerance
+
+    weights = np.empty(A.shape[::2])
+    weights[definite] = np.linalg.solve(gram[definite], rhs[definite])[..., 0]
+    if not definite.all():
+        weights[~definite] = _solve_svd(A[~definite], b[~definite])
+    return weights
+
+
+def fit_batched_least_squares(
+    X: np.ndarray,
+    y: np.ndarray,
+    mask: Optional[np.ndarray] = None,
+    user_ids: Optional[List[str]] = None,
+    feature_names: Optional[List[str]] = None,
+    solver: str = "lstsq",
+    alpha: float = REGRESSION_RIDGE_ALPHA,
+) -> CoefficientTable:
+    """
+    Fit an independent linear regression (with intercept) for every user.
+
+    Args:
+        X: (users, samples, features) stacked design matrices.
+        y: (users, samples) targets.
+        mask: Optional (users, samples) boolean array of real rows.
+        solver: "lstsq" (stacked QR of the design matrices) or
+            "cholesky" (stacked normal equations, faster). Users whose
+            system is singular are solved by SVD for the minimum-norm
+            solution either way.
+        alpha: Ridge penalty on the coefficients, never the intercept.
+
+    Returns:
+        CoefficientTable with one row per user.
+    """
+    if solver not in BATCH_SOLVERS:
+        raise ValueError(f"solver must be one of {BATCH_SOLVERS}.")
+    if alpha < 0:
+        raise ValueError("alpha must be non-negative.")
+
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if X.ndim != 3 or y.shape != X.shape[:2]:
+        raise ValueError("X must be (users, samples, features) and y (users, samples).")
+
+    weights_mask = (
+        np.ones(y.shape) if mask is None else np.asarray(mask, dtype=float)
+    )
+    if weights_mask.shape != y.shape:
+        raise ValueError("mask must have shape (users, samples).")
+
+    n_users, _, n_features = X.shape
+    if user_ids is None:
+        user_ids = [str(i) for i in range(n_users)]
+    if feature_names is None:
+        feature_names = [f"x{j}" for j in range(n_features)]
+    if len(user_ids) != n_users or len(feature_names) != n_features:
+        raise ValueError("user_ids and feature_names must match the shape of X.")
+
+    # Masked design matrices with a bias column: padded rows become zero
+    A = np.empty(X.shape[:2] + (n_features + 1,))
+    A[..., 0] = weights_mask
+    A[..., 1:] = X * weights_mask[..., None]
+    b = y * weights_mask
+
+    if alpha > 0:
+        ridge = np.zeros((n_features, n_features + 1))
+        ridge[:, 1:] = np.sqrt(alpha) * np.eye(n_features)
+        A = np.concatenate([A, np.broadcast_to(ridge, (n_users,) + ridge.shape)], axis=1)
+        b = np.concatenate([b, np.zeros((n_users, n_features))], axis=1)
+
+    solve = _solve_lstsq if solver == "lstsq" else _solve_cholesky
+    solution = solve(A, b) if n_users else np.empty((0, n_features + 1))
+
+    n_samples = weights_mask.sum(axis=1).astype(np.int64)
+    solution[n_samples == 0] = np.nan
+
+    return CoefficientTable(
+        user_ids,
+        feature_names,
+        solution[:, 0],
+        solution[:, 1:],
+        n_samples,
+    )
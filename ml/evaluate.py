@@ -1,28 +1,15 @@
 """
 Responsibility:
 Evaluates trained models using appropriate metrics.
-"""
-
-from typing import List
-import math
-
-
-def mean_absolute_error(y_true: List[float], y_pred: List[float]) -> float:
-    """
-    Compute Mean Absolute Error (MAE).
-    """
-    if len(y_true) != len(y_pred):
-        raise ValueError("y_true and y_pred must have the same length.")
 
-    return sum(abs(t - p) for t, p in zip(y_true, y_pred)) / len(y_true)
-
-
-def root_mean_squared_error(y_true: List[float], y_pred: List[float]) -> float:
-    """
-    Compute Root Mean Squared Error (RMSE).
-    """
-    if len(y_true) != len(y_pred):
-        raise ValueError("y_true and y_pred must have the same length.")
+The metrics themselves live in ml.metrics; they are re-exported here for
+existing callers.
+"""
 
-    mse = sum((t - p) ** 2 for t, p in zip(y_true, y_pred)) / len(y_true)
-    return math.sqrt(mse)
+from ml.metrics import (  # noqa: F401
+    mean_absolute_error,
+    mean_absolute_percentage_error,
+    quantile_loss,
+    root_mean_squared_error,
+    symmetric_mean_absolute_percentage_error,
+)
@@ -1,53 +1,131 @@
-from datetime import datetime
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
+import numpy as np
 
-def evaluate_weekly_baseline(user) -> Tuple[List[float], List[float]]:
+from analytics.aggregations import ActivityAggregates, aggregate_user
+from analytics.calendar_index import CalendarIndex
+from analytics.windows import GAP_SKIP
+from config.settings import (
+    DAYS_PER_WEEK,
+    TRAIN_SPLIT_RATIO,
+    WEEKLY_GAP_POLICY,
+    WEEKLY_TRAINING_STRIDE_DAYS,
+)
+from ml.train_weekly_model import train_weekly_model
+from ml.weekly_features import WEEKLY_FEATURE_NAMES
+
+
+def evaluate_weekly_baseline(
+    user,
+    aggregates: Optional[ActivityAggregates] = None,
+    calendar: Optional[CalendarIndex] = None,
+    gaps: str = WEEKLY_GAP_POLICY,
+) -> Tuple[List[float], List[float]]:
     """
     Returns:
         y_true: list of actual weekly totals
         y_pred: list of baseline predictions (previous week totals)
+
+    Weeks are consecutive blocks of 7 days from the first active day,
+    following the ``gaps`` policy of analytics.windows: 7 active days
+    ("skip"), or 7 calendar days with missing days counting 0
+    ("zero_fill") or leaving out every pair with an incomplete week
+    ("insufficient"). ``aggregates`` and the CalendarIndex of its daily
+    totals may be passed to reuse an existing pass over the user.
     """
 
     if user is None:
         return [], []
 
     # ---- Build daily totals ----
-    daily_totals = {
-        log.get_date().isoformat(): log.total_duration()
-        for log in user.get_all_logs()
-    }
+    if aggregates is None:
+        aggregates = aggregate_user(user)
+
+    daily_totals = aggregates.daily_totals
 
-    if len(daily_totals) < 14:
+    if not daily_totals or (gaps == GAP_SKIP and len(daily_totals) < 14):
         return [], []
 
-    # ---- Sort dates ----
-    sorted_dates = sorted(
-        datetime.strptime(d, "%Y-%m-%d").date()
-        for d in daily_totals.keys()
-    )
+    if calendar is None:
+        calendar = CalendarIndex.from_daily_totals(daily_totals)
 
     # ---- Build weekly totals (non-overlapping, full weeks only) ----
-    weekly_totals: List[float] = []
-
-    while len(sorted_dates) >= 7:
-        week_dates = sorted_dates[:7]
-        week_total = sum(
-            daily_totals[d.strftime("%Y-%m-%d")]
-            for d in week_dates
-        )
-        weekly_totals.append(float(week_total))
-        sorted_dates = sorted_dates[7:]
+    weekly_totals, usable = calendar.block_totals(DAYS_PER_WEEK, gaps)
 
     if len(weekly_totals) < 2:
         return [], []
 
-    # ---- Baseline prediction ----
-    y_true: List[float] = []
-    y_pred: List[float] = []
+    # ---- Baseline prediction: each week predicts the next ----
+    pairs = usable[1:] & usable[:-1]
+    return weekly_totals[1:][pairs].tolist(), weekly_totals[:-1][pairs].tolist()
+
+
+def _holdout_start(n_samples: int, train_ratio: float) -> int:
+    """
+    Index of the first hold-out sample.
+    """
+    if not 0.0 < train_ratio < 1.0:
+        raise ValueError("train_ratio must be between 0 and 1.")
+    return int(n_samples * train_ratio)
+
+
+def evaluate_weekly_model(
+    X: np.ndarray,
+    y: np.ndarray,
+    stride: int = WEEKLY_TRAINING_STRIDE_DAYS,
+    train_ratio: float = TRAIN_SPLIT_RATIO,
+) -> Tuple[List[float], List[float]]:
+    """
+    Hold-out evaluation of the weekly model on sliding-window samples.
+
+    The model is fit on the oldest ``train_ratio`` of the samples and
+    scored on the rest. Training samples whose target week overlaps the
+    first test target are dropped so no test target leaks into training.
+
+    Returns:
+        y_true: actual next-week totals of the test samples
+        y_pred: model predictions for them
+
+    Raises:
+        ValueError: if too few samples remain to train on.
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    split = _holdout_start(len(X), train_ratio)
+    if split >= len(X):
+        return [], []
+
+    # Targets of the last ceil(7 / stride) - 1 training windows overlap the test period
+    train_end = max(0, split - (-(-DAYS_PER_WEEK // stride) - 1))
+    model, _ = train_weekly_model(
+        None, training_data=(X[:train_end], y[:train_end])
+    )
+
+    y_pred = model.predict(X[split:])
+    return y[split:].tolist(), y_pred
 
-    for i in range(len(weekly_totals) - 1):
-        y_pred.append(weekly_totals[i])
-        y_true.append(weekly_totals[i + 1])
 
-    return y_true, y_pred
+def evaluate_weekly_holdout_baseline(
+    X: np.ndarray,
+    y: np.ndarray,
+    train_ratio: float = TRAIN_SPLIT_RATIO,
+) -> Tuple[List[float], List[float]]:
+    """
+    The previous-week baseline on the hold-out samples of
+    evaluate_weekly_model: each test window's own total predicts the week
+    that follows it, so its error and the model's cover the same targets.
+
+    Returns:
+        y_true: actual next-week totals of the test samples
+        y_pred: their current-week totals
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    split = _holdout_start(len(X), train_ratio)
+    if split >= len(X):
+        return [], []
+
+    total = WEEKLY_FEATURE_NAMES.index("total_minutes")
+    return y[split:].tolist(), X[split:, total].tolist()
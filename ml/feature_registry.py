@@ -0,0 +1,167 @@
+"""
+Responsibility:
+Registers features together with the inputs they are computed from.
+
+A FeatureRegistry holds named nodes: the raw inputs of a window (e.g. a
+week's daily totals), shared intermediates (e.g. the week total) and the
+features themselves, each declaring the nodes it is computed from.
+window() wraps one window's inputs in a read-only LazyFeatures mapping
+that computes a feature, and only the nodes it depends on, the first time
+it is read and caches every result, so a consumer that needs three
+features never pays for the rest.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+
+class FeatureRegistry:
+    """
+    Features and intermediates computed from a fixed set of window inputs.
+
+    Nodes can only depend on inputs or previously registered nodes, so the
+    dependency graph cannot contain cycles. Features keep their
+    registration order, which is the key order of every LazyFeatures.
+    """
+
+    def __init__(self, inputs: Sequence[str]):
+        self._inputs: Tuple[str, ...] = tuple(inputs)
+        self._nodes: Dict[str, Tuple[Tuple[str, ...], Callable[..., Any]]] = {}
+        self._features: List[str] = []
+
+    def register(
+        self,
+        name: str,
+        inputs: Sequence[str],
+        compute: Callable[..., Any],
+        public: bool = True,
+    ) -> None:
+        """
+        Add a node; ``compute`` receives the values of ``inputs`` in order.
+        Non-public nodes are intermediates and are not listed as features.
+        """
+        if name in self._inputs or name in self._nodes:
+            raise ValueError(f"Feature '{name}' is already registered.")
+        for dependency in inputs:
+            if dependency not in self._inputs and dependency not in self._nodes:
+                raise ValueError(f"Feature '{name}' depends on unknown '{dependency}'.")
+
+        self._nodes[name] = (tuple(inputs), compute)
+        if public:
+            self._features.append(name)
+
+    def feature(self, name: str, *inputs: str) -> Callable[[Callable], Callable]:
+        """
+        Decorator form of register() for a feature.
+        """
+        def decorator(compute: Callable) -> Callable:
+            self.register(name, inputs, compute)
+            return compute
+        return decorator
+
+    def intermediate(self, name: str, *inputs: str) -> Callable[[Callable], Callable]:
+        """
+        Decorator form of register() for a shared intermediate.
+        """
+        def decorator(compute: Callable) -> Callable:
+            self.register(name, inputs, compute, public=False)
+            return compute
+        return decorator
+
+    def names(self) -> Tuple[str, ...]:
+        return tuple(self._features)
+
+    def inputs(self) -> Tuple[str, ...]:
+        return self._inputs
+
+    def requirements(self, names: Iterable[str]) -> List[str]:
+        """
+        Every node needed for ``names``, in an order where each node comes
+        after its dependencies.
+        """
+        ordered: List[str] = []
+        seen = set(self._inputs)
+
+        def visit(name: str) -> None:
+            if name in seen:
+                return
+            if name not in self._nodes:
+                raise KeyError(name)
+            seen.add(name)
+            for dependency in self._nodes[name][0]:
+                visit(dependency)
+            ordered.append(name)
+
+        for name in names:
+            visit(name)
+        return ordered
+
+    def window(self, **inputs: Any) -> "LazyFeatures":
+        """
+        Lazily evaluated features of one window.
+        """
+        missing = [name for name in self._inputs if name not in inputs]
+        if missing:
+            raise ValueError(f"Missing feature inputs: {', '.join(missing)}.")
+        unknown = [name for name in inputs if name not in self._inputs]
+        if unknown:
+            raise ValueError(f"Unknown feature inputs: {', '.join(unknown)}.")
+        return LazyFeatures(self, inputs)
+
+    def compute(self, names: Iterable[str], **inputs: Any) -> Dict[str, Any]:
+        """
+        Only the features ``names`` of one window, as a plain dict.
+        """
+        features = self.window(**inputs)
+        return {name: features[name] for name in names}
+
+
+class LazyFeatures(Mapping):
+    """
+    Read-only mapping of feature name to value for one window.
+
+    Values are computed on first access and cached together with every
+    intermediate they needed; membership tests never compute anything.
+    """
+
+    def __init__(self, registry: FeatureRegistry, inputs: Dict[str, Any]):
+        self._registry = registry
+        self._values: Dict[str, Any] = dict(inputs)
+        self._computed: List[str] = []
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._registry._features:
+            raise KeyError(name)
+        return self._evaluate(name)
+
+    def _evaluate(self, name: str) -> Any:
+        if name in self._values:
+            return self._values[name]
+
+        for node in self._registry.requirements([name]):
+            if node in self._values:
+                continue
+            dependencies, compute = self._registry._nodes[node]
+            self._values[node] = compute(*(self._values[d] for d in dependencies))
+            self._computed.append(node)
+
+        return self._values[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._registry._features
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._registry._features)
+
+    def __len__(self) -> int:
+        return len(self._registry._features)
+
+    def computed(self) -> Tuple[str, ...]:
+        """
+        Nodes (features and intermediates) evaluated so far, in order.
+        """
+        return tuple(self._computed)
+
+    def __repr__(self) -> str:
+        cached = {name: self._values[name] for name in self if name in self._values}
+        return f"LazyFeatures({cached!r}, pending={len(self) - len(cached)})"
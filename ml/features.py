@@ -1,11 +1,56 @@
 """
 Responsibility:
 Transforms structured activity data into machine learning features.
+
+build_feature_matrix returns one feature dict per day; daily_feature_array
+computes the same features for a whole history as one NumPy matrix whose
+columns follow DAILY_FEATURE_NAMES, with lag windows from prefix sums.
 """
 
 from typing import Dict, List, Tuple
 from datetime import datetime
 
+import numpy as np
+
+from analytics.aggregations import LogsOrAggregates, as_aggregates
+from analytics.correlations import daily_category_matrix
+from config.constants import CATEGORY_ORDER
+
+
+# Column order of daily_feature_array (the key order of the feature dicts)
+DAILY_FEATURE_NAMES: Tuple[str, ...] = (
+    "total_minutes",
+    "activity_count",
+    *(f"{category.lower()}_minutes" for category in CATEGORY_ORDER),
+    "day_of_week",
+    "prev_day_total_minutes",
+    "avg_last_3_days_minutes",
+    "avg_last_7_days_minutes",
+)
+
+
+def _daily_features(
+    date_str: str,
+    total_minutes: int,
+    activity_count: int,
+    category_totals: Dict[str, int],
+) -> Dict[str, float]:
+    features: Dict[str, float] = {}
+
+    # Core features
+    features["total_minutes"] = total_minutes
+    features["activity_count"] = activity_count
+
+    # Category-specific features (safe even if missing)
+    for category in CATEGORY_ORDER:
+        features[f"{category.lower()}_minutes"] = category_totals.get(category, 0)
+
+    # Temporal feature
+    date_obj = datetime.fromisoformat(date_str)
+    features["day_of_week"] = float(date_obj.weekday())
+
+    return features
+
 
 def extract_daily_features(log: dict) -> Dict[str, float]:
     """
@@ -19,8 +64,6 @@ def extract_daily_features(log: dict) -> Dict[str, float]:
     """
     activities = log.get("activities", [])
 
-    features: Dict[str, float] = {}
-
     total_minutes = 0
     activity_count = len(activities)
 
@@ -34,29 +77,18 @@ def extract_daily_features(log: dict) -> Dict[str, float]:
         total_minutes += duration
         category_totals[category] = category_totals.get(category, 0) + duration
 
-    # Core features
-    features["total_minutes"] = total_minutes
-    features["activity_count"] = activity_count
-
-    # Category-specific features (safe even if missing)
-    for category in ["Work", "Study", "Health", "Leisure"]:
-        features[f"{category.lower()}_minutes"] = category_totals.get(category, 0)
-
-    # Temporal feature
-    date_obj = datetime.fromisoformat(log["date"])
-    features["day_of_week"] = float(date_obj.weekday())
-
-    return features
+    return _daily_features(log["date"], total_minutes, activity_count, category_totals)
 
 
 def build_feature_matrix(
-    logs: List[dict],
+    logs: LogsOrAggregates,
 ) -> Tuple[List[Dict[str, float]], List[float]]:
     """
     Build feature matrix X and target vector y for ML.
 
     Args:
-        logs: List of day log dictionaries sorted by date ascending.
+        logs: List of day log dictionaries sorted by date ascending,
+            or the ActivityAggregates built from them.
 
     Returns:
         X: List of feature dictionaries
@@ -65,14 +97,20 @@ def build_feature_matrix(
     X: List[Dict[str, float]] = []
     y: List[float] = []
 
-    # Precompute total minutes per day
-    daily_totals = [
-        sum(a["duration_minutes"] for a in log.get("activities", []))
-        for log in logs
-    ]
+    aggregates = as_aggregates(logs)
+    dates = aggregates.get_dates()
 
-    for i in range(len(logs) - 1):
-        features = extract_daily_features(logs[i])
+    # Precompute total minutes per day
+    daily_totals = [aggregates.daily_totals[d] for d in dates]
+
+    for i in range(len(dates) - 1):
+        date_str = dates[i]
+        features = _daily_features(
+            date_str,
+            daily_totals[i],
+            aggregates.daily_counts[date_str],
+            aggregates.daily_category_minutes[date_str],
+        )
 
         # --- Lag features ---
         features["prev_day_total_minutes"] = (
@@ -97,3 +135,63 @@ def build_feature_matrix(
 
     return X, y
 
+
+def _trailing_average(sums: np.ndarray, window: int) -> np.ndarray:
+    """
+    sum(totals[max(0, i - window):i]) / max(1, i) for every day i, as in
+    build_feature_matrix; ``sums`` are the prefix sums of the totals.
+    """
+    i = np.arange(len(sums) - 1)
+    window_sums = sums[i] - sums[np.maximum(0, i - window)]
+    return window_sums.astype(float) / np.maximum(1, i)
+
+
+def daily_feature_array(
+    logs: LogsOrAggregates,
+) -> Tuple[np.ndarray, np.ndarray, Tuple[str, ...]]:
+    """
+    Vectorized build_feature_matrix.
+
+    Args:
+        logs: List of day log dictionaries, or the ActivityAggregates
+            built from them.
+
+    Returns:
+        X: (days - 1, len(DAILY_FEATURE_NAMES)) float matrix, one row per
+            day except the last, equal to the dicts of build_feature_matrix
+        y: (days - 1,) next day's total minutes
+        names: DAILY_FEATURE_NAMES
+    """
+    aggregates = as_aggregates(logs)
+    dates = aggregates.get_dates()
+    n = len(dates)
+
+    if n < 2:
+        return np.empty((0, len(DAILY_FEATURE_NAMES))), np.empty(0), DAILY_FEATURE_NAMES
+
+    # Integer prefix sums keep the window sums exact
+    totals = np.array([aggregates.daily_totals[d] for d in dates], dtype=np.int64)
+    sums = np.concatenate(([0], np.cumsum(totals)))
+    counts = np.array([aggregates.daily_counts[d] for d in dates], dtype=float)
+    _, _, category_minutes = daily_category_matrix(
+        aggregates.daily_category_minutes, dates, list(CATEGORY_ORDER)
+    )
+
+    # ISO dates parse in one call; 1970-01-01 (day 0) was a Thursday
+    weekdays = (np.array(dates, dtype="datetime64[D]").astype(np.int64) + 3) % 7
+
+    rows = n - 1
+    X = np.empty((rows, len(DAILY_FEATURE_NAMES)))
+    X[:, 0] = totals[:rows]
+    X[:, 1] = counts[:rows]
+    X[:, 2:2 + len(CATEGORY_ORDER)] = category_minutes[:rows]
+
+    lags = 2 + len(CATEGORY_ORDER)
+    X[:, lags] = weekdays[:rows]
+    X[0, lags + 1] = 0.0
+    X[1:, lags + 1] = totals[:rows - 1]
+    X[:, lags + 2] = _trailing_average(sums[:n], 3)
+    X[:, lags + 3] = _trailing_average(sums[:n], 7)
+
+    y = totals[1:].astype(float)
+    return X, y, DAILY_FEATURE_NAMES
@@ -1,8 +1,315 @@
-from typing import List
+"""
+Responsibility:
+Computes regression metrics for predictions.
 
+Every metric accepts lists or NumPy arrays. Without ``axis`` a metric
+reduces everything to one float (0.0 for empty input); with ``axis`` it
+reduces along that axis of a stacked array, e.g. (users, folds) -> (users,),
+and ``mask`` excludes padded or undefined entries (rows without any valid
+entry give NaN). grouped_metrics evaluates many groups of a flat array at
+once and MetricAccumulator evaluates data that arrives in chunks.
+"""
 
-def mean_absolute_error(y_true: List[float], y_pred: List[float]) -> float:
-    if not y_true:
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+
+def _pair(y_true: ArrayLike, y_pred: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+    y_true = np.asarray(y_true, dtype=float)
+    y_pred = np.asarray(y_pred, dtype=float)
+    if y_true.shape != y_pred.shape:
+        raise ValueError("y_true and y_pred must have the same length.")
+    return y_true, y_pred
+
+
+def _mean(
+    values: np.ndarray,
+    valid: Optional[np.ndarray],
+    axis: Optional[int],
+) -> Union[float, np.ndarray]:
+    """
+    Mean over the valid entries; ``values`` may be overwritten.
+    """
+    if valid is None:
+        if axis is None:
+            return float(values.mean()) if values.size else 0.0
+        count = np.asarray(float(values.shape[axis]))
+    else:
+        # Masked entries may hold NaN or inf; zero them explicitly
+        values[~valid] = 0.0
+        count = valid.sum(axis=axis, dtype=float)
+
+    total = values.sum(axis=axis)
+    out = np.full(np.shape(total), np.nan)
+    np.divide(total, count, out=out, where=count > 0)
+    return float(out) if out.ndim == 0 else out
+
+
+def _valid(mask: Optional[ArrayLike], shape: Tuple[int, ...]) -> Optional[np.ndarray]:
+    if mask is None:
+        return None
+    mask = np.asarray(mask, dtype=bool)
+    if mask.shape != shape:
+        raise ValueError("mask must have the same shape as y_true.")
+    return mask
+
+
+# -----------------------------
+# Metrics
+# -----------------------------
+
+def mean_absolute_error(
+    y_true: ArrayLike,
+    y_pred: ArrayLike,
+    axis: Optional[int] = None,
+    mask: Optional[ArrayLike] = None,
+) -> Union[float, np.ndarray]:
+    """
+    Compute Mean Absolute Error (MAE).
+    """
+    y_true, y_pred = _pair(y_true, y_pred)
+    errors = np.subtract(y_true, y_pred)
+    np.abs(errors, out=errors)
+    return _mean(errors, _valid(mask, y_true.shape), axis)
+
+
+def root_mean_squared_error(
+    y_true: ArrayLike,
+    y_pred: ArrayLike,
+    axis: Optional[int] = None,
+    mask: Optional[ArrayLike] = None,
+) -> Union[float, np.ndarray]:
+    """
+    Compute Root Mean Squared Error (RMSE).
+    """
+    y_true, y_pred = _pair(y_true, y_pred)
+    errors = np.subtract(y_true, y_pred)
+    np.square(errors, out=errors)
+    return np.sqrt(_mean(errors, _valid(mask, y_true.shape), axis))
+
+
+def mean_absolute_percentage_error(
+    y_true: ArrayLike,
+    y_pred: ArrayLike,
+    axis: Optional[int] = None,
+    mask: Optional[ArrayLike] = None,
+) -> Union[float, np.ndarray]:
+    """
+    Mean of |error| / |actual|, as a fraction. Zero actuals (weeks with no
+    activity) have no percentage error and are skipped; NaN if all are zero.
+    """
+    y_true, y_pred = _pair(y_true, y_pred)
+    valid = _valid(mask, y_true.shape)
+    nonzero = y_true != 0
+    valid = nonzero if valid is None else valid & nonzero
+
+    errors = np.subtract(y_true, y_pred)
+    np.abs(errors, out=errors)
+    np.divide(errors, np.abs(y_true), out=errors, where=nonzero)
+
+    if axis is None and not y_true.size:
         return 0.0
+    return _mean(errors, valid, axis)
+
+
+def symmetric_mean_absolute_percentage_error(
+    y_true: ArrayLike,
+    y_pred: ArrayLike,
+    axis: Optional[int] = None,
+    mask: Optional[ArrayLike] = None,
+) -> Union[float, np.ndarray]:
+    """
+    Mean of 2 |error| / (|actual| + |prediction|), in [0, 2]. Entries
+    where both are zero are exact and count as 0.
+    """
+    y_true, y_pred = _pair(y_true, y_pred)
+    scale = np.abs(y_true) + np.abs(y_pred)
+
+    errors = np.subtract(y_true, y_pred)
+    np.abs(errors, out=errors)
+    np.multiply(errors, 2.0, out=errors)
+    np.divide(errors, scale, out=errors, where=scale > 0)
+    return _mean(errors, _valid(mask, y_true.shape), axis)
+
+
+def quantile_loss(
+    y_true: ArrayLike,
+    y_pred: ArrayLike,
+    quantile: float = 0.5,
+    axis: Optional[int] = None,
+    mask: Optional[ArrayLike] = None,
+) -> Union[float, np.ndarray]:
+    """
+    Mean pinball loss of a ``quantile`` forecast (0.5 gives MAE / 2).
+    """
+    if not 0 < quantile < 1:
+        raise ValueError("quantile must be in (0, 1).")
+
+    y_true, y_pred = _pair(y_true, y_pred)
+    errors = np.subtract(y_true, y_pred)
+    # max(q * e, (q - 1) * e) == q * e - min(e, 0)
+    under = np.minimum(errors, 0.0)
+    np.multiply(errors, quantile, out=errors)
+    np.subtract(errors, under, out=errors)
+    return _mean(errors, _valid(mask, y_true.shape), axis)
+
+
+# -----------------------------
+# Grouped and streaming evaluation
+# -----------------------------
+
+def _error_sums(
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    groups: np.ndarray,
+    n_groups: int,
+    valid: Optional[np.ndarray],
+    quantiles: Sequence[float],
+) -> Dict[str, np.ndarray]:
+    """
+    Per-group sums every metric is finalized from, via one bincount each.
+    """
+    if valid is not None:
+        y_true, y_pred, groups = y_true[valid], y_pred[valid], groups[valid]
+
+    errors = y_true - y_pred
+    abs_errors = np.abs(errors)
+    nonzero = y_true != 0
+    scale = np.abs(y_true) + np.abs(y_pred)
+
+    def total(weights: Optional[np.ndarray] = None) -> np.ndarray:
+        return np.bincount(groups, weights=weights, minlength=n_groups).astype(float)
+
+    sums = {
+        "count": total(),
+        "abs": total(abs_errors),
+        "squared": total(errors * errors),
+        "ape": total(np.divide(abs_errors, np.abs(y_true), out=np.zeros_like(errors), where=nonzero)),
+        "ape_count": total(nonzero.astype(float)),
+        "sape": total(np.divide(2 * abs_errors, scale, out=np.zeros_like(errors), where=scale > 0)),
+    }
+    for q in quantiles:
+        sums[f"quantile_{q:g}"] = total(q * errors - np.minimum(errors, 0.0))
+    return sums
+
+
+def _finalize(sums: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    def ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+        out = np.full(np.shape(num), np.nan)
+        np.divide(num, den, out=out, where=den > 0)
+        return out
+
+    count = sums["count"]
+    metrics = {
+        "count": count.astype(np.int64),
+        "mae": ratio(sums["abs"], count),
+        "rmse": np.sqrt(ratio(sums["squared"], count)),
+        "mape": ratio(sums["ape"], sums["ape_count"]),
+        "smape": ratio(sums["sape"], count),
+    }
+    for name, value in sums.items():
+        if name.startswith("quantile_"):
+            metrics[name] = ratio(value, count)
+    return metrics
+
+
+def _check_quantiles(quantiles: Sequence[float]) -> Tuple[float, ...]:
+    quantiles = tuple(float(q) for q in quantiles)
+    if any(not 0 < q < 1 for q in quantiles):
+        raise ValueError("quantiles must be in (0, 1).")
+    return quantiles
+
+
+def grouped_metrics(
+    y_true: ArrayLike,
+    y_pred: ArrayLike,
+    groups: ArrayLike,
+    n_groups: Optional[int] = None,
+    mask: Optional[ArrayLike] = None,
+    quantiles: Sequence[float] = (),
+) -> Dict[str, np.ndarray]:
+    """
+    Every metric per group of a flat array, e.g. per user of a fold table.
+
+    Args:
+        groups: Integer group code (0 .. n_groups - 1) per entry.
+        mask: Optional boolean array of entries to include.
+        quantiles: Quantile levels to add a "quantile_<q>" loss for.
+
+    Returns:
+        {"count", "mae", "rmse", "mape", "smape", "quantile_<q>"...} each
+        of shape (n_groups,); NaN for groups without valid entries.
+    """
+    y_true, y_pred = _pair(y_true, y_pred)
+    groups = np.asarray(groups, dtype=np.int64)
+    if y_true.ndim != 1 or groups.shape != y_true.shape:
+        raise ValueError("y_true, y_pred and groups must be one-dimensional and of equal length.")
+
+    if n_groups is None:
+        n_groups = int(groups.max()) + 1 if len(groups) else 0
+
+    return _finalize(
+        _error_sums(
+            y_true, y_pred, groups, n_groups,
+            _valid(mask, y_true.shape), _check_quantiles(quantiles),
+        )
+    )
+
+
+class MetricAccumulator:
+    """
+    Streaming metrics: feed chunks with update(), read them with result().
+
+    Only running sums are kept, so arbitrarily large evaluations run in
+    constant memory; accumulators from different workers combine with
+    merge().
+    """
+
+    def __init__(self, quantiles: Sequence[float] = ()):
+        self.quantiles = _check_quantiles(quantiles)
+        self._sums = {
+            name: np.zeros(1)
+            for name in _error_sums(
+                np.empty(0), np.empty(0), np.empty(0, dtype=np.int64), 1, None, self.quantiles
+            )
+        }
+
+    def __len__(self) -> int:
+        return int(self._sums["count"][0])
+
+    def update(
+        self,
+        y_true: ArrayLike,
+        y_pred: ArrayLike,
+        mask: Optional[ArrayLike] = None,
+    ) -> None:
+        y_true, y_pred = _pair(y_true, y_pred)
+        valid = _valid(mask, y_true.shape)
+        y_true, y_pred = y_true.ravel(), y_pred.ravel()
+        valid = None if valid is None else valid.ravel()
+
+        chunk = _error_sums(
+            y_true, y_pred, np.zeros(len(y_true), dtype=np.int64), 1, valid, self.quantiles
+        )
+        for name, value in chunk.items():
+            self._sums[name] += value
+
+    def merge(self, other: "MetricAccumulator") -> None:
+        if other.quantiles != self.quantiles:
+            raise ValueError("Cannot merge accumulators with different quantiles.")
+        for name, value in other._sums.items():
+            self._sums[name] += value
 
-    return sum(abs(t - p) for t, p in zip(y_true, y_pred)) / len(y_true)
+    def result(self) -> Dict[str, float]:
+        """
+        Current metrics; NaN while no entries have been added.
+        """
+        return {name: value[0].item() for name, value in _finalize(self._sums).items()}
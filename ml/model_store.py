@@ -0,0 +1,298 @@
+"""
+Responsibility:
+Persists trained models as versioned artifacts under MODELS_DIR.
+
+Each artifact is a compressed .npz of the model arrays plus a JSON
+manifest (model class, constructor params including the feature order,
+training-data fingerprint, metrics). Artifacts are keyed by the
+fingerprint of the training data and configuration, so a model is reused
+for as long as the data it was trained on is unchanged and retrained as
+soon as it changes. Old artifacts are evicted by age and by count per user.
+The store is a cache: when artifacts cannot be written, get_or_train
+logs the error and returns the freshly trained model unstored.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.paths import MODELS_DIR
+from config.settings import MODEL_STORE_MAX_AGE_DAYS, MODEL_STORE_MAX_PER_USER
+from ml.models import LinearRegressionModel, OnlineLinearRegressionModel
+
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the artifact layout changes; older artifacts then miss
+ARTIFACT_FORMAT_VERSION = 1
+
+_MODEL_CLASSES = {
+    cls.__name__: cls for cls in (LinearRegressionModel, OnlineLinearRegressionModel)
+}
+
+
+# -----------------------------
+# Fingerprints
+# -----------------------------
+
+def training_fingerprint(
+    X: np.ndarray,
+    y: np.ndarray,
+    config: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Hash of the training data and a JSON-serializable training config.
+    """
+    digest = hashlib.sha256()
+    digest.update(
+        json.dumps(
+            {"format": ARTIFACT_FORMAT_VERSION, "config": config or {}},
+            sort_keys=True,
+        ).encode("utf-8")
+    )
+
+    for array in (X, y):
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        digest.update(repr(array.shape).encode("ascii"))
+        digest.update(array.tobytes())
+
+    return digest.hexdigest()[:32]
+
+
+# -----------------------------
+# Store
+# -----------------------------
+
+def _write_atomic(path: Path, write: Callable[[Any], None], mode: str) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    try:
+        with tmp_path.open(mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+class ModelStore:
+    """
+    Model artifacts stored as ``<models_dir>/<user_id>/<fingerprint>.npz``
+    with a ``.json`` manifest next to it.
+
+    The manifest is written last and removed first, so a manifest always
+    points at a complete array file. Loading an artifact refreshes its
+    modification time, which is what age and count eviction look at.
+    """
+
+    def __init__(
+        self,
+        models_dir: Path = MODELS_DIR,
+        max_per_user: Optional[int] = MODEL_STORE_MAX_PER_USER,
+        max_age_days: Optional[float] = MODEL_STORE_MAX_AGE_DAYS,
+    ):
+        if max_per_user is not None and max_per_user <= 0:
+            raise ValueError("max_per_user must be a positive integer.")
+        if max_age_days is not None and max_age_days <= 0:
+            raise ValueError("max_age_days must be positive.")
+
+        self.models_dir = Path(models_dir)
+        self.max_per_user = max_per_user
+        self.max_age_days = max_age_days
+
+    def _paths(self, user_id: str, fingerprint: str) -> Tuple[Path, Path]:
+        user_dir = self.models_dir / user_id
+        return user_dir / f"{fingerprint}.json", user_dir / f"{fingerprint}.npz"
+
+    # -----------------------------
+    # Read / write
+    # -----------------------------
+
+    def load(self, user_id: str, fingerprint: str) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        """
+        Return (model, manifest), or None if no usable artifact exists.
+        """
+        manifest_path, arrays_path = self._paths(user_id, fingerprint)
+
+        try:
+            with manifest_path.open("r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            with np.load(arrays_path, allow_pickle=False) as npz:
+                arrays = {name: npz[name] for name in npz.files}
+        except (OSError, ValueError):
+            # Missing, half-evicted or corrupt artifacts are a cache miss
+            return None
+
+        cls = _MODEL_CLASSES.get(manifest.get("model_class"))
+        if cls is None or manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+            return None
+
+        try:
+            model = cls.from_state(manifest["params"], arrays)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        try:
+            os.utime(manifest_path)
+        except OSError:
+            pass
+
+        return model, manifest
+
+    def save(
+        self,
+        user_id: str,
+        fingerprint: str,
+        model: Any,
+        metrics: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Store a fitted model; returns its manifest.
+
+        Raises:
+            OSError: if the artifact cannot be written.
+        """
+        manifest = self._manifest(user_id, fingerprint, model, metrics)
+        arrays = model.get_arrays()
+
+        manifest_path, arrays_path = self._paths(user_id, fingerprint)
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+
+        _write_atomic(arrays_path, lambda f: np.savez_compressed(f, **arrays), "wb")
+        _write_atomic(
+            manifest_path,
+            lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8")),
+            "wb",
+        )
+
+        self.evict(user_id, keep=fingerprint)
+        return manifest
+
+    @staticmethod
+    def _manifest(
+        user_id: str,
+        fingerprint: str,
+        model: Any,
+        metrics: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        model_class = type(model).__name__
+        if model_class not in _MODEL_CLASSES:
+            raise TypeError(f"Cannot store models of type {model_class}.")
+
+        return {
+            "format_version": ARTIFACT_FORMAT_VERSION,
+            "user_id": user_id,
+            "fingerprint": fingerprint,
+            "model_class": model_class,
+            "params": model.get_params(),
+            "metrics": metrics or {},
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def get_or_train(
+        self,
+        user_id: str,
+        fingerprint: str,
+        train: Callable[[], Tuple[Any, Dict[str, Any]]],
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Load the artifact for ``fingerprint``, or call ``train`` (returning
+        (model, metrics)) and store its result. Errors from ``train``
+        propagate and nothing is stored; a failed write is logged and the
+        model returned with an unsaved manifest.
+        """
+        cached = self.load(user_id, fingerprint)
+        if cached is not None:
+            return cached
+
+        model, metrics = train()
+        try:
+            return model, self.save(user_id, fingerprint, model, metrics)
+        except OSError as exc:
+            logger.warning(
+                "Could not store model %s for user %s in %s: %s",
+                fingerprint, user_id, self.models_dir, exc,
+            )
+            return model, self._manifest(user_id, fingerprint, model, metrics)
+
+    # -----------------------------
+    # Eviction
+    # -----------------------------
+
+    def list_artifacts(self, user_id: str) -> List[Tuple[str, float]]:
+        """
+        (fingerprint, last used timestamp) of a user's artifacts, newest first.
+        """
+        user_dir = self.models_dir / user_id
+        if not user_dir.is_dir():
+            return []
+
+        artifacts = []
+        for path in user_dir.glob("*.json"):
+            try:
+                artifacts.append((path.stem, path.stat().st_mtime))
+            except OSError:
+                continue
+
+        artifacts.sort(key=lambda item: item[1], reverse=True)
+        return artifacts
+
+    def evict(
+        self,
+        user_id: Optional[str] = None,
+        keep: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> int:
+        """
+        Remove artifacts past the age limit or beyond the per-user count,
+        least recently used first. Covers every user when ``user_id`` is
+        None; the ``keep`` fingerprint is never removed.
+
+        Returns the number of artifacts removed.
+        """
+        if user_id is None:
+            if not self.models_dir.is_dir():
+                return 0
+            return sum(
+                self.evict(path.name, keep, now)
+                for path in self.models_dir.iterdir()
+                if path.is_dir()
+            )
+
+        now = time.time() if now is None else now
+        oldest = None if self.max_age_days is None else now - self.max_age_days * 86400
+
+        removed = 0
+        for rank, (fingerprint, used_at) in enumerate(self.list_artifacts(user_id)):
+            if fingerprint == keep:
+                continue
+            too_many = self.max_per_user is not None and rank >= self.max_per_user
+            too_old = oldest is not None and used_at < oldest
+            if too_many or too_old:
+                self._remove(user_id, fingerprint)
+                removed += 1
+
+        return removed
+
+    def _remove(self, user_id: str, fingerprint: str) -> None:
+        for path in self._paths(user_id, fingerprint):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+# Process-wide store used by the weekly pipeline
+MODEL_STORE = ModelStore()
@@ -3,64 +3,74 @@ Responsibility:
 Defines machine learning models used for prediction tasks.
 """
 
-from typing import List, Dict
+from operator import itemgetter
+from typing import Any, Dict, List, Sequence, Union
+
 import numpy as np
 
+from config.settings import (
+    ONLINE_FORGETTING_FACTOR,
+    ONLINE_INITIAL_RIDGE,
+    REGRESSION_RIDGE_ALPHA,
+    REGRESSION_SOLVER,
+)
+
+
+# Features as a list of dicts or a (samples, features) array in
+# feature_names order
+FeatureInput = Union[Sequence[Dict[str, float]], np.ndarray]
+
+SOLVERS = ("lstsq", "qr", "cholesky", "pinv")
 
-class LinearRegressionModel:
+
+class _LinearModel:
     """
-    Simple linear regression model using ordinary least squares.
+    Feature handling and inference shared by the linear models.
     """
 
-    def __init__(self, feature_names: List[str]):
+    def __init__(self, feature_names: List[str], dtype: type = np.float64):
+        if np.dtype(dtype) not in (np.dtype(np.float32), np.dtype(np.float64)):
+            raise ValueError("dtype must be float32 or float64.")
+
         self._weights: np.ndarray | None = None
-        self._feature_names = feature_names
+        self._feature_names = list(feature_names)
+        self._getter = itemgetter(*self._feature_names) if self._feature_names else None
+        self.dtype = np.dtype(dtype)
 
-    def _vectorize(self, X: List[Dict[str, float]]) -> np.ndarray:
+    def _vectorize(self, X: FeatureInput) -> np.ndarray:
         """
         Convert list of feature dictionaries into a numeric matrix
-        using a fixed feature ordering.
+        using a fixed feature ordering. Arrays are taken as-is.
         """
-        return np.array(
-            [[x[name] for name in self._feature_names] for x in X],
-            dtype=float,
-        )
+        n_features = len(self._feature_names)
 
-    def fit(self, X: List[Dict[str, float]], y: List[float]) -> None:
-        """
-        Fit the model to training data.
-        """
-        if not X or not y:
-            raise ValueError("Training data cannot be empty.")
+        if isinstance(X, np.ndarray):
+            X_mat = X.astype(self.dtype, copy=False)
+        elif self._getter is None:
+            X_mat = np.empty((len(X), 0), dtype=self.dtype)
+        else:
+            X_mat = np.array(list(map(self._getter, X)), dtype=self.dtype)
 
-        if len(X) != len(y):
-            raise ValueError("X and y must have the same number of samples.")
+        X_mat = X_mat.reshape(len(X_mat), -1) if X_mat.ndim == 1 else X_mat
+        if X_mat.ndim != 2 or X_mat.shape[1] != n_features:
+            raise ValueError(f"X must have {n_features} feature columns.")
+        return X_mat
 
+    def _design(self, X: FeatureInput) -> np.ndarray:
         X_mat = self._vectorize(X)
-        y_vec = np.array(y, dtype=float)
-
-        # Add bias term
-        ones = np.ones((X_mat.shape[0], 1))
-        X_design = np.hstack([ones, X_mat])
-
-        # Closed-form OLS
-        XtX = X_design.T @ X_design
-        XtX_inv = np.linalg.pinv(XtX)
+        X_design = np.empty((X_mat.shape[0], X_mat.shape[1] + 1), dtype=self.dtype)
+        X_design[:, 0] = 1.0
+        X_design[:, 1:] = X_mat
+        return X_design
 
-        self._weights = XtX_inv @ X_design.T @ y_vec
-
-    def predict(self, X: List[Dict[str, float]]) -> List[float]:
+    def predict(self, X: FeatureInput) -> List[float]:
         """
-        Predict target values for given feature dictionaries.
+        Predict target values for given feature dictionaries or rows.
         """
         if self._weights is None:
             raise RuntimeError("Model must be fitted before prediction.")
 
-        X_mat = self._vectorize(X)
-        ones = np.ones((X_mat.shape[0], 1))
-        X_design = np.hstack([ones, X_mat])
-
-        return (X_design @ self._weights).tolist()
+        return (self._design(X) @ self._weights).tolist()
 
     def coefficients(self) -> Dict[str, float]:
         """
@@ -76,3 +86,249 @@ class LinearRegressionModel:
         if self._weights is None:
             raise RuntimeError("Model has not been fitted yet.")
         return float(self._weights[0])
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+
+    def get_params(self) -> Dict[str, Any]:
+        """
+        JSON-serializable constructor arguments.
+        """
+        return {"feature_names": list(self._feature_names), "dtype": self.dtype.name}
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Fitted state as NumPy arrays.
+        """
+        if self._weights is None:
+            raise RuntimeError("Model has not been fitted yet.")
+        return {"weights": self._weights}
+
+    @classmethod
+    def from_state(
+        cls,
+        params: Dict[str, Any],
+        arrays: Dict[str, np.ndarray],
+    ):
+        """
+        Rebuild a fitted model from get_params() and get_arrays().
+        """
+        model = cls(**params)
+        model._set_arrays(arrays)
+        return model
+
+    def _set_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        weights = np.asarray(arrays["weights"], dtype=self.dtype)
+        if weights.shape != (len(self._feature_names) + 1,):
+            raise ValueError("weights do not match feature_names.")
+        self._weights = weights
+
+
+class LinearRegressionModel(_LinearModel):
+    """
+    Simple linear regression model using ordinary least squares.
+
+    Solvers:
+        lstsq: SVD-based least squares on the design matrix (default).
+        qr: QR factorization of the design matrix.
+        cholesky: Cholesky factorization of the normal equations; fastest
+            for many samples and few features, falls back to lstsq if the
+            system is singular.
+        pinv: Pseudo-inverse of the normal equations (previous behavior).
+
+    ``alpha`` adds a ridge penalty on the coefficients (never the
+    intercept) and is honored by every solver.
+    """
+
+    def __init__(
+        self,
+        feature_names: List[str],
+        solver: str = REGRESSION_SOLVER,
+        alpha: float = REGRESSION_RIDGE_ALPHA,
+        dtype: type = np.float64,
+    ):
+        if solver not in SOLVERS:
+            raise ValueError(f"solver must be one of {SOLVERS}.")
+        if alpha < 0:
+            raise ValueError("alpha must be non-negative.")
+
+        super().__init__(feature_names, dtype)
+        self.solver = solver
+        self.alpha = float(alpha)
+
+    def get_params(self) -> Dict[str, Any]:
+        return {**super().get_params(), "solver": self.solver, "alpha": self.alpha}
+
+    def fit(self, X: FeatureInput, y: Union[Sequence[float], np.ndarray]) -> None:
+        """
+        Fit the model to training data.
+        """
+        if len(X) == 0 or len(y) == 0:
+            raise ValueError("Training data cannot be empty.")
+
+        if len(X) != len(y):
+            raise ValueError("X and y must have the same number of samples.")
+
+        X_design = self._design(X)
+        y_vec = np.asarray(y, dtype=self.dtype)
+
+        solve = getattr(self, f"_solve_{self.solver}")
+        self._weights = solve(X_design, y_vec)
+
+    # -----------------------------
+    # Solvers
+    # -----------------------------
+
+    def _penalty(self, size: int) -> np.ndarray:
+        penalty = np.full(size, self.alpha, dtype=self.dtype)
+        penalty[0] = 0.0  # bias term
+        return penalty
+
+    def _augment(self, X_design: np.ndarray, y_vec: np.ndarray):
+        # Ridge as ordinary least squares on extra rows sqrt(alpha) * I
+        if self.alpha == 0:
+            return X_design, y_vec
+        p = X_design.shape[1]
+        ridge = np.diag(np.sqrt(self._penalty(p)))[1:]
+        return (
+            np.vstack([X_design, ridge]),
+            np.concatenate([y_vec, np.zeros(p - 1, dtype=self.dtype)]),
+        )
+
+    def _solve_lstsq(self, X_design: np.ndarray, y_vec: np.ndarray) -> np.ndarray:
+        A, b = self._augment(X_design, y_vec)
+        return np.linalg.lstsq(A, b, rcond=None)[0]
+
+    def _solve_qr(self, X_design: np.ndarray, y_vec: np.ndarray) -> np.ndarray:
+        A, b = self._augment(X_design, y_vec)
+        if A.shape[0] < A.shape[1]:
+            return self._solve_lstsq(X_design, y_vec)
+
+        Q, R = np.linalg.qr(A)
+        diag = np.abs(np.diag(R))
+        # Rank-deficient designs have no unique triangular solution
+        if diag.min() <= np.finfo(self.dtype).eps * A.shape[0] * diag.max():
+            return self._solve_lstsq(X_design, y_vec)
+        return np.linalg.solve(R, Q.T @ b)
+
+    def _solve_cholesky(self, X_design: np.ndarray, y_vec: np.ndarray) -> np.ndarray:
+        XtX = X_design.T @ X_design
+        XtX[np.diag_indices_from(XtX)] += self._penalty(XtX.shape[0])
+        Xty = X_design.T @ y_vec
+
+        try:
+            L = np.linalg.cholesky(XtX)
+        except np.linalg.LinAlgError:
+            return self._solve_lstsq(X_design, y_vec)
+        return np.linalg.solve(L.T, np.linalg.solve(L, Xty))
+
+    def _solve_pinv(self, X_design: np.ndarray, y_vec: np.ndarray) -> np.ndarray:
+        # Closed-form OLS
+        XtX = X_design.T @ X_design
+        XtX[np.diag_indices_from(XtX)] += self._penalty(XtX.shape[0])
+        XtX_inv = np.linalg.pinv(XtX)
+
+        return XtX_inv @ X_design.T @ y_vec
+
+
+class OnlineLinearRegressionModel(_LinearModel):
+    """
+    Linear regression updated one sample at a time (recursive least squares).
+
+    Keeps the weights and the inverse of the (exponentially weighted)
+    normal-equation matrix, so each sample costs O(features^2) and the
+    history never has to be revisited. With ``forgetting_factor`` 1 the
+    weights match ordinary least squares with a ridge of
+    ``initial_ridge`` on every weight; below 1, a sample seen k updates ago
+    is weighted by ``forgetting_factor ** k``.
+    """
+
+    def __init__(
+        self,
+        feature_names: List[str],
+        forgetting_factor: float = ONLINE_FORGETTING_FACTOR,
+        initial_ridge: float = ONLINE_INITIAL_RIDGE,
+        dtype: type = np.float64,
+    ):
+        if not 0 < forgetting_factor <= 1:
+            raise ValueError("forgetting_factor must be in (0, 1].")
+        if initial_ridge <= 0:
+            raise ValueError("initial_ridge must be positive.")
+
+        super().__init__(feature_names, dtype)
+        self.forgetting_factor = float(forgetting_factor)
+        self.initial_ridge = float(initial_ridge)
+        self.reset()
+
+    def get_params(self) -> Dict[str, Any]:
+        return {
+            **super().get_params(),
+            "forgetting_factor": self.forgetting_factor,
+            "initial_ridge": self.initial_ridge,
+        }
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            **super().get_arrays(),
+            "inverse": self._inverse,
+            "n_samples": np.array(self.n_samples),
+        }
+
+    def _set_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        super()._set_arrays(arrays)
+        self._inverse = np.asarray(arrays["inverse"], dtype=self.dtype)
+        self.n_samples = int(arrays["n_samples"])
+
+    def reset(self) -> None:
+        """
+        Forget every sample seen so far.
+        """
+        size = len(self._feature_names) + 1
+        self._weights = None
+        self._inverse = np.eye(size, dtype=self.dtype) / self.initial_ridge
+        self.n_samples = 0
+
+    def partial_fit(
+        self,
+        X: FeatureInput,
+        y: Union[Sequence[float], np.ndarray],
+    ) -> None:
+        """
+        Update the model with new samples, oldest first.
+        """
+        if len(X) != len(y):
+            raise ValueError("X and y must have the same number of samples.")
+
+        X_design = self._design(X)
+        y_vec = np.asarray(y, dtype=self.dtype)
+        lam = self.forgetting_factor
+
+        weights = (
+            np.zeros(X_design.shape[1], dtype=self.dtype)
+            if self._weights is None else self._weights
+        )
+        inverse = self._inverse
+
+        for x, target in zip(X_design, y_vec):
+            Px = inverse @ x
+            gain = Px / (lam + x @ Px)
+            weights = weights + gain * (target - x @ weights)
+            inverse = (inverse - np.outer(gain, Px)) / lam
+            # Keep the matrix symmetric against rounding drift
+            inverse = (inverse + inverse.T) / 2
+
+        if len(y_vec):
+            self._weights = weights
+            self._inverse = inverse
+            self.n_samples += len(y_vec)
+
+    def fit(self, X: FeatureInput, y: Union[Sequence[float], np.ndarray]) -> None:
+        """
+        Fit from scratch on the given samples.
+        """
+        if len(X) == 0 or len(y) == 0:
+            raise ValueError("Training data cannot be empty.")
+
+        self.reset()
+        self.partial_fit(X, y)
@@ -3,20 +3,59 @@ Responsibility:
 Coordinates model training workflows.
 """
 
-from typing import List, Dict, Tuple
-
-from analytics.statistics import (
-    activity_variability,
-    category_balance,
-    dominance_ratio,
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+from analytics.aggregations import ActivityAggregates, aggregate_user
+from analytics.calendar_index import CalendarIndex
+from analytics.windows import GAP_INSUFFICIENT, GAP_SKIP, check_gap_policy
+from analytics.correlations import daily_category_matrix
+from config.settings import (
+    WEEKLY_GAP_POLICY,
+    WEEKLY_TRAINING_LOOKBACK_DAYS,
+    WEEKLY_TRAINING_STRIDE_DAYS,
 )
+from ml.feature_registry import LazyFeatures
+from ml.weekly_features import WEEKLY_FEATURES, sliding_weekly_features
 from pipelines.week_utils import split_into_weeks
 
 
-def build_weekly_training_data(user) -> Tuple[List[Dict[str, float]], List[float]]:
+def weekly_feature_window(
+    week: Dict[str, int],
+    aggregates: ActivityAggregates,
+) -> LazyFeatures:
+    """
+    Lazily computed WEEKLY_FEATURES of one week.
+
+    Args:
+        week: {date: total minutes} of the week's days; days without
+            data (zero-filled weeks) have no category minutes.
+        aggregates: The user's ActivityAggregates, for category minutes.
+    """
+    category_totals: Dict[str, int] = {}
+
+    for date_str in sorted(week):
+        for cat, minutes in aggregates.daily_category_minutes.get(date_str, {}).items():
+            category_totals[cat] = category_totals.get(cat, 0) + minutes
+
+    return WEEKLY_FEATURES.window(day_minutes=week, category_minutes=category_totals)
+
+
+def build_weekly_training_data(
+    user,
+    aggregates: Optional[ActivityAggregates] = None,
+    calendar: Optional[CalendarIndex] = None,
+    gaps: str = WEEKLY_GAP_POLICY,
+) -> Tuple[List[Dict[str, float]], List[float]]:
     """
     Build illustrative weekly feature-target pair.
 
+    Pass the user's ActivityAggregates (e.g. from analyze_user) and the
+    CalendarIndex of its daily totals to avoid walking the activities or
+    parsing the dates again. ``gaps`` is the week policy of
+    split_into_weeks.
+
     NOTE:
     This function currently returns a single (X, y) pair and is
     intended for explainability and directional reasoning only.
@@ -27,58 +66,103 @@ def build_weekly_training_data(user) -> Tuple[List[Dict[str, float]], List[float
         return [], []
 
     # ---- Build daily totals ----
-    daily_totals: Dict[str, int] = {
-        log.get_date().isoformat(): log.total_duration()
-        for log in user.get_all_logs()
-    }
+    if aggregates is None:
+        aggregates = aggregate_user(user)
 
-    if len(daily_totals) < 14:
+    daily_totals: Dict[str, int] = aggregates.daily_totals
+
+    # Calendar weeks may hold fewer active days; split_into_weeks checks them
+    if gaps == GAP_SKIP and len(daily_totals) < 14:
         return [], []
 
     # ---- Split weeks ----
-    current_week, previous_week = split_into_weeks(daily_totals)
+    current_week, previous_week = split_into_weeks(daily_totals, calendar, gaps)
 
     if not current_week or not previous_week:
         return [], []
 
-    # ---- Category totals for current week ----
-    weekly_category_totals: Dict[str, int] = {}
-
-    for log in user.get_all_logs():
-        date_str = log.get_date().isoformat()
-        if date_str in current_week:
-            for activity in log.get_activities():
-                cat = activity.get_category()
-                weekly_category_totals[cat] = (
-                    weekly_category_totals.get(cat, 0)
-                    + activity.get_duration_minutes()
-                )
-
-    values = list(current_week.values())
-
-    features = {
-    "total_minutes": float(sum(values)),
-    "avg_daily_minutes": float(sum(values) / 7),
-    "active_days": float(sum(1 for v in values if v > 0)),
-    "max_day_minutes": float(max(values)),
-    "min_day_minutes": float(min(values)),
-    "daily_variability": float(activity_variability(current_week)),
-
-    # ✅ FIXED SEMANTICS
-    "category_balance": (
-        1.0
-        if len(weekly_category_totals) == 1
-        else float(category_balance(weekly_category_totals))
-    ),
-
-    "dominance_ratio": float(dominance_ratio(current_week)),
-    "category_dominance_ratio": float(
-        dominance_ratio(weekly_category_totals)
-    ),
-}
-
-
+    features = dict(weekly_feature_window(current_week, aggregates))
 
     target = float(sum(previous_week.values()))
 
     return [features], [target]
+
+
+def daily_series(
+    aggregates: ActivityAggregates,
+    gaps: str = WEEKLY_GAP_POLICY,
+    calendar: Optional[CalendarIndex] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The days weekly windows are built from, under a gap policy of
+    analytics.windows: the active days ("skip"), or every calendar day
+    from the first to the last active one, zero on days without data.
+
+    Returns:
+        ordinals: (days,) date ordinals
+        day_totals: (days,) total minutes per day
+        day_category_minutes: (days, categories) minutes per day
+        present: (days,) True on days with data
+    """
+    check_gap_policy(gaps)
+    if calendar is None:
+        calendar = CalendarIndex.from_daily_totals(aggregates.daily_totals)
+
+    _, _, category_minutes = daily_category_matrix(
+        aggregates.daily_category_minutes, calendar.dates
+    )
+
+    if gaps == GAP_SKIP:
+        return (
+            calendar.ordinals,
+            calendar.values,
+            category_minutes,
+            np.ones(len(calendar), dtype=bool),
+        )
+
+    dense_categories = np.zeros((calendar.span_days(), category_minutes.shape[1]))
+    dense_categories[calendar.positions] = category_minutes
+    return (
+        calendar.start + np.arange(calendar.span_days(), dtype=np.int64),
+        calendar.dense,
+        dense_categories,
+        calendar.present,
+    )
+
+
+def build_sliding_weekly_training_data(
+    user,
+    aggregates: Optional[ActivityAggregates] = None,
+    stride: int = WEEKLY_TRAINING_STRIDE_DAYS,
+    lookback_days: Optional[int] = WEEKLY_TRAINING_LOOKBACK_DAYS,
+    gaps: str = WEEKLY_GAP_POLICY,
+    calendar: Optional[CalendarIndex] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build one training sample per sliding weekly window of the history.
+
+    Each sample maps the features of a week to the total of the following
+    week, with weeks defined by the ``gaps`` policy as in split_into_weeks
+    (see daily_series), so the model trains on the windows it predicts
+    from. Under "insufficient", pairs of weeks missing a day are left out;
+    ``lookback_days`` counts days of the series (calendar days unless
+    "skip"). Columns follow WEEKLY_FEATURE_NAMES.
+
+    Returns:
+        X: (samples, features) matrix, oldest window first
+        y: (samples,) next-week totals
+    """
+    if aggregates is None:
+        if user is None:
+            return sliding_weekly_features(np.empty(0), np.empty((0, 0)))
+        aggregates = aggregate_user(user)
+
+    _, day_totals, category_minutes, present = daily_series(aggregates, gaps, calendar)
+
+    return sliding_weekly_features(
+        day_totals,
+        category_minutes,
+        stride=stride,
+        lookback_days=lookback_days,
+        present=present if gaps == GAP_INSUFFICIENT else None,
+    )
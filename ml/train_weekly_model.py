@@ -3,41 +3,145 @@ Responsibility:
 Trains an interpretable weekly activity prediction model.
 """
 
-from typing import Dict, Tuple
+from typing import Dict, Iterable, Optional, Tuple
 
-from ml.models import LinearRegressionModel
-from ml.train import build_weekly_training_data
+import numpy as np
 
+from analytics.aggregations import ActivityAggregates
+from config.settings import MIN_SAMPLES_FOR_TRAINING
+from ml.batch_regression import CoefficientTable, fit_batched_least_squares, stack_training_data
+from ml.models import LinearRegressionModel, OnlineLinearRegressionModel
+from ml.train import build_sliding_weekly_training_data
+from ml.weekly_features import WEEKLY_FEATURE_NAMES
 
-def train_weekly_model(user) -> Tuple[LinearRegressionModel, Dict[str, float]]:
+
+def train_weekly_model(
+    user,
+    aggregates: Optional[ActivityAggregates] = None,
+    training_data: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> Tuple[LinearRegressionModel, Dict[str, float]]:
     """
     Train a linear regression model to predict next week's activity.
 
+    The model is fit on every sliding weekly window of the user's history
+    (see build_sliding_weekly_training_data). ``training_data`` takes a
+    precomputed (X, y) from that builder, in which case ``user`` is not
+    read.
+
     Returns:
         model: trained LinearRegressionModel
         coefficients: { feature_name: coefficient }
     """
 
     # 1. Build training data
-    X_dicts, y = build_weekly_training_data(user)
-    if len(X_dicts) < 2:
-        raise ValueError(
-        "Weekly ML requires multiple samples to be evaluative. "
-        "Current usage is illustrative only."
-    )
-
+    if training_data is None:
+        training_data = build_sliding_weekly_training_data(user, aggregates)
+    X, y = training_data
 
-    if not X_dicts:
-        raise ValueError("Not enough data to train weekly model.")
+    if len(X) < MIN_SAMPLES_FOR_TRAINING:
+        raise ValueError(
+            f"Weekly ML requires at least {MIN_SAMPLES_FOR_TRAINING} weekly "
+            f"samples; only {len(X)} available."
+        )
 
-    # 2. Extract feature ordering ONCE
-    feature_names = list(X_dicts[0].keys())
+    # 2. Columns already follow WEEKLY_FEATURE_NAMES, so rows go in as-is
+    feature_names = list(WEEKLY_FEATURE_NAMES)
 
     # 3. Train model
     model = LinearRegressionModel(feature_names)
-    model.fit(X_dicts, y)
+    model.fit(np.asarray(X, dtype=float), np.asarray(y, dtype=float))
 
     # 4. Coefficients are already mapped correctly
     coefficients = model.coefficients()
 
     return model, coefficients
+
+
+def update_weekly_model(
+    user,
+    model: Optional[OnlineLinearRegressionModel] = None,
+    aggregates: Optional[ActivityAggregates] = None,
+    training_data: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> Tuple[OnlineLinearRegressionModel, Dict[str, float]]:
+    """
+    Bring an online weekly model up to date with the user's history.
+
+    Only the weekly windows the model has not seen yet are fed to
+    ``partial_fit``, so a refresh after a new week costs O(features^2) per
+    new window instead of a full retrain. Windows are taken with stride 1
+    over the whole history, which keeps their order stable as days are
+    appended; older weeks are down-weighted by the model's forgetting
+    factor rather than cut off by a lookback. ``training_data`` takes a
+    precomputed (X, y) built the same way.
+
+    ``model`` is updated in place; ValueError is raised (after the update)
+    while it has seen fewer than MIN_SAMPLES_FOR_TRAINING samples.
+
+    Returns:
+        model: the updated (or new) OnlineLinearRegressionModel
+        coefficients: { feature_name: coefficient }
+    """
+    if training_data is None:
+        training_data = build_sliding_weekly_training_data(
+            user, aggregates, stride=1, lookback_days=None
+        )
+    X, y = training_data
+
+    if model is None:
+        model = OnlineLinearRegressionModel(list(WEEKLY_FEATURE_NAMES))
+    if len(X) < model.n_samples:
+        raise ValueError(
+            f"Model has seen {model.n_samples} weekly samples but only "
+            f"{len(X)} are available; the history was not extended."
+        )
+
+    model.partial_fit(
+        np.asarray(X, dtype=float)[model.n_samples:],
+        np.asarray(y, dtype=float)[model.n_samples:],
+    )
+
+    if model.n_samples < MIN_SAMPLES_FOR_TRAINING:
+        raise ValueError(
+            f"Weekly ML requires at least {MIN_SAMPLES_FOR_TRAINING} weekly "
+            f"samples; only {model.n_samples} available."
+        )
+
+    return model, model.coefficients()
+
+
+def train_weekly_models(
+    users: Iterable,
+    solver: str = "cholesky",
+) -> CoefficientTable:
+    """
+    Train the weekly model for many users in one batched solve.
+
+    Each user's sliding weekly windows are stacked and every per-user
+    regression is solved together. Users with fewer than
+    MIN_SAMPLES_FOR_TRAINING samples keep a row of NaN coefficients, as
+    train_weekly_model would refuse to train them.
+
+    Returns:
+        CoefficientTable with one row per user, columns WEEKLY_FEATURE_NAMES.
+    """
+    user_ids = []
+    datasets = []
+    for user in users:
+        user_ids.append(user.get_user_id())
+        datasets.append(build_sliding_weekly_training_data(user))
+
+    if not datasets:
+        raise ValueError("At least one user is required.")
+
+    X, y, mask = stack_training_data(datasets)
+    too_few = mask.sum(axis=1) < MIN_SAMPLES_FOR_TRAINING
+    mask[too_few] = False
+
+    return fit_batched_least_squares(
+        X,
+        y,
+        mask,
+        user_ids=user_ids,
+        feature_names=list(WEEKLY_FEATURE_NAMES),
+        solver=solver,
+    )
@@ -0,0 +1,521 @@
+"""
+Responsibility:
+Builds weekly features as NumPy matrices.
+
+Produces the same features as ml.train.build_weekly_training_data, in the
+column order of WEEKLY_FEATURE_NAMES, for many weeks at once: every
+sliding weekly window of one user's history, or of every user in a cohort
+(the activity columns of all users laid out as one series per user), from
+shared prefix sums. Every feature is one vectorized expression.
+
+WEEKLY_FEATURES registers the same features for a single week, each with
+the inputs it needs, for consumers that read only a few of them.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from analytics.statistics import category_balance, dominance_ratio, standard_deviation
+from analytics.windows import GAP_INSUFFICIENT, GAP_SKIP, check_gap_policy
+from config.constants import CATEGORY_ORDER
+from config.settings import (
+    DAYS_PER_WEEK,
+    WEEKLY_GAP_POLICY,
+    WEEKLY_TRAINING_LOOKBACK_DAYS,
+    WEEKLY_TRAINING_STRIDE_DAYS,
+)
+from core.columnar import ActivityTable, ColumnarUser
+from core.user import User
+from ml.feature_registry import FeatureRegistry
+
+
+# Column order of every weekly feature matrix
+WEEKLY_FEATURE_NAMES: Tuple[str, ...] = (
+    "total_minutes",
+    "avg_daily_minutes",
+    "active_days",
+    "max_day_minutes",
+    "min_day_minutes",
+    "daily_variability",
+    "category_balance",
+    "dominance_ratio",
+    "category_dominance_ratio",
+)
+
+
+# -----------------------------
+# Feature kernel
+# -----------------------------
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    out = np.zeros(np.broadcast(num, den).shape)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def weekly_feature_matrix(
+    day_minutes: np.ndarray,
+    category_minutes: np.ndarray,
+) -> np.ndarray:
+    """
+    Weekly features for many weeks at once.
+
+    Args:
+        day_minutes: (weeks, DAYS_PER_WEEK) total minutes per day.
+        category_minutes: (weeks, categories) total minutes per category.
+
+    Returns:
+        (weeks, len(WEEKLY_FEATURE_NAMES)) float matrix.
+    """
+    day_minutes = np.asarray(day_minutes, dtype=float)
+    category_minutes = np.asarray(category_minutes, dtype=float)
+
+    if day_minutes.ndim != 2 or category_minutes.ndim != 2:
+        raise ValueError("day_minutes and category_minutes must be two-dimensional.")
+    if len(day_minutes) != len(category_minutes):
+        raise ValueError("day_minutes and category_minutes must have the same number of rows.")
+
+    return _assemble_features(
+        total=day_minutes.sum(axis=1),
+        active_days=(day_minutes > 0).sum(axis=1),
+        max_day=day_minutes.max(axis=1),
+        min_day=day_minutes.min(axis=1),
+        std_day=day_minutes.std(axis=1),
+        category_minutes=category_minutes,
+    )
+
+
+def _assemble_features(
+    total: np.ndarray,
+    active_days: np.ndarray,
+    max_day: np.ndarray,
+    min_day: np.ndarray,
+    std_day: np.ndarray,
+    category_minutes: np.ndarray,
+) -> np.ndarray:
+    category_total = category_minutes.sum(axis=1)
+
+    shares = _ratio(category_minutes, category_total[:, None])
+    log_shares = np.log(shares, out=np.zeros_like(shares), where=shares > 0)
+    entropy = -(shares * log_shares).sum(axis=1)
+
+    present = (category_minutes > 0).sum(axis=1)
+    balance = _ratio(entropy, np.log(np.maximum(present, 1)))
+    # A single category counts as balanced, as in build_weekly_training_data
+    balance[present == 1] = 1.0
+
+    X = np.empty((len(total), len(WEEKLY_FEATURE_NAMES)))
+    X[:, 0] = total
+    X[:, 1] = total / DAYS_PER_WEEK
+    X[:, 2] = active_days
+    X[:, 3] = max_day
+    X[:, 4] = min_day
+    X[:, 5] = std_day
+    X[:, 6] = balance
+    X[:, 7] = _ratio(max_day, total)
+    X[:, 8] = _ratio(category_minutes.max(axis=1, initial=0.0), category_total)
+
+    return X
+
+
+def _empty_features() -> Tuple[np.ndarray, np.ndarray]:
+    return np.empty((0, len(WEEKLY_FEATURE_NAMES))), np.empty(0)
+
+
+# -----------------------------
+# Sliding windows
+# -----------------------------
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    return np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+
+
+def _window_starts(
+    seg_start: np.ndarray,
+    seg_stop: np.ndarray,
+    stride: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (starts, segment) of every pair of weeks inside each day segment
+    [seg_start, seg_stop): stepping back ``stride`` days from the most
+    recent pair, oldest first within a segment.
+    """
+    pair = 2 * DAYS_PER_WEEK
+    counts = np.where(
+        seg_stop - seg_start >= pair, (seg_stop - seg_start - pair) // stride + 1, 0
+    )
+    segment = np.repeat(np.arange(len(counts)), counts)
+    # k-th window of its segment, oldest first
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    starts = seg_stop[segment] - pair - stride * (counts[segment] - 1 - k)
+    return starts.astype(np.int64), segment
+
+
+def _window_features(
+    day_totals: np.ndarray,
+    day_category_minutes: np.ndarray,
+    starts: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Features of days [s, s + 7) and the total of [s + 7, s + 14) for every
+    start s. Totals, squared totals, active-day counts and category
+    minutes come from shared prefix sums, so every window costs O(1)
+    apart from the 7-day max / min.
+    """
+    week = DAYS_PER_WEEK
+    if len(starts) == 0:
+        return _empty_features()
+    ends = starts + week
+
+    sums = _prefix(day_totals)
+    squares = _prefix(day_totals * day_totals)
+    active = _prefix((day_totals > 0).astype(float))
+    categories = _prefix(day_category_minutes)
+
+    total = sums[ends] - sums[starts]
+    # Integer minutes keep these sums exact in float64
+    variance = (week * (squares[ends] - squares[starts]) - total * total) / week ** 2
+
+    windows = np.lib.stride_tricks.sliding_window_view(day_totals, week)[starts]
+
+    X = _assemble_features(
+        total=total,
+        active_days=active[ends] - active[starts],
+        max_day=windows.max(axis=1),
+        min_day=windows.min(axis=1),
+        std_day=np.sqrt(np.clip(variance, 0.0, None)),
+        category_minutes=categories[ends] - categories[starts],
+    )
+    y = sums[ends + week] - sums[ends]
+
+    return X, y
+
+
+def _complete_starts(starts: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """
+    The starts whose two weeks have data on every day.
+    """
+    missing = _prefix(~np.asarray(present, dtype=bool))
+    return missing[starts + 2 * DAYS_PER_WEEK] == missing[starts]
+
+
+def _check_window_options(stride: int, lookback_days: Optional[int]) -> None:
+    if stride <= 0:
+        raise ValueError("stride must be a positive integer.")
+    if lookback_days is not None and lookback_days <= 0:
+        raise ValueError("lookback_days must be a positive integer.")
+
+
+def sliding_weekly_features(
+    day_totals: np.ndarray,
+    day_category_minutes: np.ndarray,
+    stride: int = 1,
+    lookback_days: Optional[int] = None,
+    present: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Every sliding weekly window over a user's day series.
+
+    Sample i has the features of days [s, s + 7) and, as target, the
+    total of days [s + 7, s + 14). Windows step back ``stride`` days from
+    the most recent complete pair and are returned oldest first. Every
+    window costs O(1) apart from the 7-day max / min.
+
+    Args:
+        day_totals: (days,) total minutes per day, in date order: the
+            active days, or every calendar day (see ml.train.daily_series).
+        day_category_minutes: (days, categories) minutes per day.
+        stride: Days between consecutive windows.
+        lookback_days: Use only the most recent this many days.
+        present: Optional (days,) mask of the days with data; samples
+            whose two weeks hold a day without data are left out (the
+            "insufficient" gap policy).
+
+    Returns:
+        (X, y) with X columns following WEEKLY_FEATURE_NAMES.
+    """
+    _check_window_options(stride, lookback_days)
+
+    day_totals = np.asarray(day_totals, dtype=float)
+    day_category_minutes = np.asarray(day_category_minutes, dtype=float)
+
+    if day_totals.ndim != 1 or day_category_minutes.ndim != 2:
+        raise ValueError("day_totals must be 1-D and day_category_minutes 2-D.")
+    if len(day_totals) != len(day_category_minutes):
+        raise ValueError("day_totals and day_category_minutes must cover the same days.")
+    if present is not None and np.shape(present) != day_totals.shape:
+        raise ValueError("present must have one entry per day.")
+
+    n = len(day_totals)
+    first = 0 if lookback_days is None else max(0, n - lookback_days)
+    starts, _ = _window_starts(np.array([first]), np.array([n]), stride)
+    if present is not None:
+        starts = starts[_complete_starts(starts, present)]
+
+    return _window_features(day_totals, day_category_minutes, starts)
+
+
+# -----------------------------
+# Cohort reduction
+# -----------------------------
+
+def cohort_weekly_features(
+    user: np.ndarray,
+    day: np.ndarray,
+    category: np.ndarray,
+    duration: np.ndarray,
+    n_users: Optional[int] = None,
+    n_categories: Optional[int] = None,
+    stride: int = 1,
+    lookback_days: Optional[int] = None,
+    gaps: str = WEEKLY_GAP_POLICY,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Every sliding weekly window of every user, from the activity columns
+    of a whole cohort.
+
+    Each user's days become one series under the ``gaps`` policy (active
+    days, or every calendar day of their span; see ml.train.daily_series)
+    and all series are laid end to end, so the windows of every user come
+    from one set of prefix sums, as sliding_weekly_features computes them
+    for one user: the samples of a user equal
+    build_sliding_weekly_training_data with the same options.
+
+    Args:
+        user: Per-activity user index (0 .. n_users - 1).
+        day: Per-activity date ordinal; a logged day without activities
+            needs a zero-duration entry to count as a day.
+        category: Per-activity category code (0 .. n_categories - 1).
+        duration: Per-activity minutes.
+        stride, lookback_days: As in sliding_weekly_features, per user.
+
+    Returns:
+        (sample_user, X, y): the user index of every sample, ordered by
+        user and then oldest window first, with the
+        (samples, len(WEEKLY_FEATURE_NAMES)) feature matrix and targets.
+    """
+    check_gap_policy(gaps)
+    _check_window_options(stride, lookback_days)
+
+    user = np.asarray(user, dtype=np.int64)
+    day = np.asarray(day, dtype=np.int64)
+    category = np.asarray(category, dtype=np.int64)
+    duration = np.asarray(duration, dtype=float)
+
+    if n_users is None:
+        n_users = int(user.max()) + 1 if len(user) else 0
+    if n_categories is None:
+        n_categories = int(category.max()) + 1 if len(category) else 0
+
+    if len(user) == 0:
+        return (np.empty(0, dtype=np.int64),) + _empty_features()
+
+    # Distinct (user, day) pairs in user-then-day order
+    order = np.lexsort((day, user))
+    pair_user = user[order]
+    pair_day = day[order]
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = (pair_user[1:] != pair_user[:-1]) | (pair_day[1:] != pair_day[:-1])
+    pair_index = np.empty(len(order), dtype=np.int64)
+    pair_index[order] = np.cumsum(starts) - 1
+    pair_owner = pair_user[starts]
+    pair_ordinal = pair_day[starts]
+
+    # Series position of each pair: one slot per active day, or per
+    # calendar day from the user's first to last day
+    days_per_user = np.bincount(pair_owner, minlength=n_users)
+    if gaps == GAP_SKIP:
+        lengths = days_per_user
+        first_pair = np.cumsum(days_per_user) - days_per_user
+        position = np.arange(len(pair_owner)) - first_pair[pair_owner]
+    else:
+        first_day = np.full(n_users, np.iinfo(np.int64).max)
+        last_day = np.full(n_users, np.iinfo(np.int64).min)
+        np.minimum.at(first_day, pair_owner, pair_ordinal)
+        np.maximum.at(last_day, pair_owner, pair_ordinal)
+        lengths = np.where(days_per_user > 0, last_day - first_day + 1, 0)
+        position = pair_ordinal - first_day[pair_owner]
+
+    seg_start = np.cumsum(lengths) - lengths
+    slot = seg_start[pair_owner] + position
+    n_slots = int(lengths.sum())
+
+    day_totals = np.bincount(slot[pair_index], weights=duration, minlength=n_slots)
+    day_category_minutes = np.bincount(
+        slot[pair_index] * n_categories + category,
+        weights=duration,
+        minlength=n_slots * n_categories,
+    ).reshape(n_slots, n_categories)
+
+    seg_stop = seg_start + lengths
+    if lookback_days is not None:
+        seg_start = np.maximum(seg_start, seg_stop - lookback_days)
+    window_starts, sample_user = _window_starts(seg_start, seg_stop, stride)
+
+    if gaps == GAP_INSUFFICIENT:
+        present = np.zeros(n_slots, dtype=bool)
+        present[slot] = True
+        complete = _complete_starts(window_starts, present)
+        window_starts, sample_user = window_starts[complete], sample_user[complete]
+
+    X, y = _window_features(day_totals, day_category_minutes, window_starts)
+    return sample_user.astype(np.int64), X, y
+
+
+def cohort_columns(
+    users: Iterable[User],
+) -> Tuple[List[str], List[str], Dict[str, np.ndarray]]:
+    """
+    Concatenate the activity columns of many users into one cohort table.
+
+    Columnar users contribute their tables directly; other users are
+    converted once. Category codes are unified across users, in
+    CATEGORY_ORDER first.
+
+    Returns:
+        (user_ids, categories, columns) where columns holds per-activity
+        "user", "day", "category" and "duration" arrays. Every logged day
+        also gets one zero-duration entry (category code 0), so days
+        without activities are counted as build_weekly_training_data
+        counts them.
+    """
+    user_ids: List[str] = []
+    categories: List[str] = list(CATEGORY_ORDER)
+    codes = {name: i for i, name in enumerate(categories)}
+    parts: Dict[str, List[np.ndarray]] = {
+        "user": [], "day": [], "category": [], "duration": []
+    }
+
+    for index, user in enumerate(users):
+        table = (
+            user.get_table() if isinstance(user, ColumnarUser)
+            else ActivityTable.from_user(user)
+        )
+        remap = np.array(
+            [codes.setdefault(name, len(codes)) for name in table.categories],
+            dtype=np.int64,
+        )
+        categories = list(codes)
+
+        n_days = len(table.days)
+
+        user_ids.append(user.get_user_id())
+        parts["user"].append(np.full(len(table) + n_days, index, dtype=np.int64))
+        parts["day"].append(np.concatenate([table.day, table.days]).astype(np.int64))
+        parts["category"].append(np.concatenate([
+            remap[table.category] if len(remap) else np.empty(0, dtype=np.int64),
+            np.zeros(n_days, dtype=np.int64),
+        ]))
+        parts["duration"].append(
+            np.concatenate([table.duration, np.zeros(n_days)]).astype(float)
+        )
+
+    columns = {
+        name: np.concatenate(arrays) if arrays else np.empty(0)
+        for name, arrays in parts.items()
+    }
+    return user_ids, categories, columns
+
+
+def build_cohort_weekly_training_data(
+    users: Iterable[User],
+    stride: int = WEEKLY_TRAINING_STRIDE_DAYS,
+    lookback_days: Optional[int] = WEEKLY_TRAINING_LOOKBACK_DAYS,
+    gaps: str = WEEKLY_GAP_POLICY,
+) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Weekly training samples of many users in one batch.
+
+    Every user contributes the samples build_sliding_weekly_training_data
+    builds for them with the same options.
+
+    Returns:
+        (user_ids, sample_user, X, y): the cohort's user ids, the index
+        into user_ids of every sample, and the stacked samples; X columns
+        follow WEEKLY_FEATURE_NAMES.
+    """
+    user_ids, categories, columns = cohort_columns(users)
+    sample_user, X, y = cohort_weekly_features(
+        columns["user"],
+        columns["day"],
+        columns["category"],
+        columns["duration"],
+        n_users=len(user_ids),
+        n_categories=len(categories),
+        stride=stride,
+        lookback_days=lookback_days,
+        gaps=gaps,
+    )
+    return user_ids, sample_user, X, y
+
+
+# -----------------------------
+# Single-week registry
+# -----------------------------
+
+# Inputs: the week's {date: total minutes} and {category: total minutes}
+WEEKLY_FEATURES = FeatureRegistry(inputs=("day_minutes", "category_minutes"))
+
+
+@WEEKLY_FEATURES.intermediate("day_values", "day_minutes")
+def _day_values(day_minutes: Dict[str, int]) -> List[int]:
+    return list(day_minutes.values())
+
+
+@WEEKLY_FEATURES.intermediate("day_sum", "day_values")
+def _day_sum(day_values: List[int]) -> int:
+    return sum(day_values)
+
+
+@WEEKLY_FEATURES.intermediate("category_sum", "category_minutes")
+def _category_sum(category_minutes: Dict[str, int]) -> int:
+    return sum(category_minutes.values())
+
+
+@WEEKLY_FEATURES.feature("total_minutes", "day_sum")
+def _total_minutes(day_sum: int) -> float:
+    return float(day_sum)
+
+
+@WEEKLY_FEATURES.feature("avg_daily_minutes", "day_sum")
+def _avg_daily_minutes(day_sum: int) -> float:
+    return float(day_sum / DAYS_PER_WEEK)
+
+
+@WEEKLY_FEATURES.feature("active_days", "day_values")
+def _active_days(day_values: List[int]) -> float:
+    return float(sum(1 for v in day_values if v > 0))
+
+
+@WEEKLY_FEATURES.feature("max_day_minutes", "day_values")
+def _max_day_minutes(day_values: List[int]) -> float:
+    return float(max(day_values))
+
+
+@WEEKLY_FEATURES.feature("min_day_minutes", "day_values")
+def _min_day_minutes(day_values: List[int]) -> float:
+    return float(min(day_values))
+
+
+@WEEKLY_FEATURES.feature("daily_variability", "day_values")
+def _daily_variability(day_values: List[int]) -> float:
+    return float(standard_deviation(day_values))
+
+
+@WEEKLY_FEATURES.feature("category_balance", "category_minutes", "category_sum")
+def _category_balance(category_minutes: Dict[str, int], category_sum: int) -> float:
+    # A single category counts as balanced
+    if len(category_minutes) == 1:
+        return 1.0
+    return float(category_balance(category_minutes, category_sum))
+
+
+@WEEKLY_FEATURES.feature("dominance_ratio", "day_minutes", "day_sum")
+def _dominance_ratio(day_minutes: Dict[str, int], day_sum: int) -> float:
+    return float(dominance_ratio(day_minutes, day_sum))
+
+
+@WEEKLY_FEATURES.feature("category_dominance_ratio", "category_minutes", "category_sum")
+def _category_dominance_ratio(category_minutes: Dict[str, int], category_sum: int) -> float:
+    return float(dominance_ratio(category_minutes, category_sum))
@@ -0,0 +1,191 @@
+"""
+Responsibility:
+Caches per-user analysis results between pipeline runs.
+
+Keys are tuples starting with (resolved data_dir, user_id) and should
+include the Store data version, so a changed history never hits a stale
+entry. Entries are evicted least-recently-used within an entry count and
+an approximate memory budget, and every entry for a user is dropped as
+soon as a Store in this process writes data for that user. Cached values
+are shared by every caller, so they should be stored frozen (freeze).
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+import numpy as np
+
+from config.settings import ANALYSIS_CACHE_MAX_BYTES, ANALYSIS_CACHE_MAX_ENTRIES
+from core.store import Store
+
+
+# -----------------------------
+# Size estimation
+# -----------------------------
+
+def estimate_size(obj: Any) -> int:
+    """
+    Approximate bytes retained by ``obj`` and everything it references.
+
+    Shared objects are counted once; NumPy arrays count their buffer.
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+
+        if hasattr(item, "nbytes") and hasattr(item, "dtype"):
+            total += int(item.nbytes)
+            continue
+
+        total += sys.getsizeof(item)
+
+        if isinstance(item, (dict, MappingProxyType)):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, "__dict__"):
+            stack.append(vars(item))
+        elif hasattr(type(item), "__slots__"):
+            stack.extend(
+                getattr(item, name)
+                for name in type(item).__slots__
+                if hasattr(item, name)
+            )
+
+    return total
+
+
+def freeze(value: Any) -> Any:
+    """
+    Read-only version of ``value`` for sharing through the cache.
+
+    Dicts become MappingProxyType, lists and plain tuples become tuples
+    and NumPy arrays read-only views, recursively; anything else is
+    returned as is.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if type(value) in (list, tuple):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, np.ndarray):
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    return value
+
+
+# -----------------------------
+# Cache
+# -----------------------------
+
+class AnalysisCache:
+    """
+    Thread-safe LRU cache with an entry limit and a memory budget.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = ANALYSIS_CACHE_MAX_BYTES,
+        max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES,
+    ):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be a positive integer.")
+        if max_entries <= 0:
+            raise ValueError("max_entries must be a positive integer.")
+
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Estimated bytes held by cached values.
+        """
+        return self._nbytes
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Cache ``value``; values larger than the whole budget are not kept.
+        """
+        size = estimate_size(value)
+
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return
+
+            self._entries[key] = (value, size)
+            self._nbytes += size
+
+            while (
+                len(self._entries) > self.max_entries
+                or self._nbytes > self.max_bytes
+            ):
+                self._discard(next(iter(self._entries)))
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for ``key``, computing and caching it on a miss.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.put(key, value)
+        return value
+
+    def invalidate(self, data_dir: Path, user_id: str) -> int:
+        """
+        Drop every entry for ``user_id`` in ``data_dir``. Returns the count.
+        """
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if isinstance(key, tuple) and key[:2] == (data_dir, user_id)
+            ]
+            for key in stale:
+                self._discard(key)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._nbytes -= entry[1]
+
+
+# Process-wide cache shared by pipeline stages
+ANALYSIS_CACHE = AnalysisCache()
+Store.add_write_listener(ANALYSIS_CACHE.invalidate)
@@ -3,10 +3,13 @@ Responsibility:
 Runs analytics over a User's activity data and returns structured results.
 """
 
-from typing import Dict, Any
+from typing import Any, Dict, Iterable
 
 from core.user import User
 from analytics.aggregations import (
+    ActivityAggregates,
+    aggregate_logs,
+    aggregate_user,
     total_duration_per_day,
     daily_category_minutes,
     total_duration_per_category,
@@ -25,33 +28,31 @@ def analyze_user(user: User) -> Dict[str, Any]:
         user: User domain object
 
     Returns:
-        Dictionary containing analytics outputs.
+        JSON-serializable dictionary containing analytics outputs.
     """
-    # Convert domain objects → log dictionaries
-    logs = []
-
-    for day_log in user.get_all_logs():
-        logs.append(
-            {
-                "date": day_log.get_date().isoformat(),
-                "activities": [
-                    {
-                        "category": a.get_category(),
-                        "duration_minutes": a.get_duration_minutes(),
-                    }
-                    for a in day_log.get_activities()
-                ],
-            }
-        )
-
-    daily_totals = total_duration_per_day(logs)
-    daily_categories = daily_category_minutes(logs)
-    category_totals = total_duration_per_category(logs)
+    return analyze_aggregates(aggregate_user(user))
+
+
+def analyze_logs(logs: Iterable[dict]) -> Dict[str, Any]:
+    """
+    Analyze a stream of day log dictionaries, e.g. Store.iter_day_logs.
+
+    Days are folded as they arrive; no domain objects are built.
+    """
+    return analyze_aggregates(aggregate_logs(logs))
+
+
+def analyze_aggregates(aggregates: ActivityAggregates) -> Dict[str, Any]:
+    """
+    Analytics outputs of an existing ActivityAggregates pass, for callers
+    that keep the aggregates to reuse in later stages.
+    """
+    daily_totals = total_duration_per_day(aggregates)
 
     return {
         "daily_totals": daily_totals,
-        "daily_categories": daily_categories,
-        "category_totals": category_totals,
+        "daily_categories": daily_category_minutes(aggregates),
+        "category_totals": total_duration_per_category(aggregates),
         "daily_average": daily_average(daily_totals),
         "variability": activity_variability(daily_totals),
     }
@@ -3,22 +3,66 @@ Responsibility:
 Handles ingestion of user activity data into core domain objects.
 """
 
-from typing import Optional
+from datetime import date, timedelta
+from typing import Iterator, Optional, Tuple
 
 from core.store import Store
 from core.user import User
 from config.paths import SYNTHETIC_DATA_DIR
 
 
-def ingest_user(user_id: str) -> Optional[User]:
+def ingest_user(
+    user_id: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Optional[User]:
     """
     Load a user's activity data from storage and return a User object.
 
     Args:
         user_id: Identifier of the user to ingest.
+        start: Optional first date (inclusive) to load.
+        end: Optional last date (inclusive) to load.
 
     Returns:
         User instance if data exists, otherwise None.
     """
     store = Store(SYNTHETIC_DATA_DIR)
-    return store.load_user(user_id)
+    return store.load_user(user_id, start=start, end=end)
+
+
+def iter_user_logs(
+    user_id: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Iterator[dict]:
+    """
+    Stream a user's day log dictionaries in ascending date order without
+    building domain objects (see Store.iter_day_logs).
+    """
+    return Store(SYNTHETIC_DATA_DIR).iter_day_logs(user_id, start=start, end=end)
+
+
+def ingest_recent_user(user_id: str, days: int) -> Optional[User]:
+    """
+    Load only the most recent ``days`` calendar days of a user's history,
+    counted back from their last logged date.
+    """
+    if days <= 0:
+        raise ValueError("days must be a positive integer.")
+
+    store = Store(SYNTHETIC_DATA_DIR)
+    bounds = store.date_bounds(user_id)
+
+    if bounds is None:
+        return None
+
+    _, last_date = bounds
+    return store.load_user(user_id, start=last_date - timedelta(days=days - 1))
+
+
+def user_data_version(user_id: str) -> Optional[Tuple]:
+    """
+    Version token of a user's stored data (see Store.data_version).
+    """
+    return Store(SYNTHETIC_DATA_DIR).data_version(user_id)
@@ -0,0 +1,113 @@
+"""
+Responsibility:
+Runs rolling-origin backtests for many users in parallel.
+
+Each user contributes ``cutoff_splits`` tasks that evaluate interleaved
+subsets of its cutoffs, so both users and the cutoffs of one long history
+are spread over a process pool. Only a bounded number of tasks is in
+flight at a time; their result tables are merged into one BacktestResults.
+A task whose worker process dies fails its user like any other error, and
+the remaining tasks continue on a fresh pool.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config.paths import SYNTHETIC_DATA_DIR
+from config.settings import BACKTEST_CUTOFF_SPLITS, BATCH_MAX_WORKERS
+from core.store import Store
+from ml.backtest import BacktestResults, backtest_user
+from pipelines.run_weekly_batch import RestartingProcessPool, iter_user_ids
+
+
+# -----------------------------
+# Worker task
+# -----------------------------
+
+def _backtest_task(
+    data_dir: Path,
+    user_id: str,
+    split: int,
+    n_splits: int,
+    backtest_fn: Callable[..., BacktestResults],
+) -> BacktestResults:
+    user = Store(data_dir).load_user(user_id)
+    if user is None:
+        return BacktestResults.empty([user_id])
+    return backtest_fn(user, split=split, n_splits=n_splits)
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+
+def run_backtest(
+    user_ids: Optional[Iterable[str]] = None,
+    data_dir: Path = SYNTHETIC_DATA_DIR,
+    max_workers: Optional[int] = BATCH_MAX_WORKERS,
+    cutoff_splits: int = BACKTEST_CUTOFF_SPLITS,
+    backtest_fn: Callable[..., BacktestResults] = backtest_user,
+) -> Tuple[BacktestResults, Dict[str, str]]:
+    """
+    Backtest every method for many users.
+
+    Args:
+        user_ids: Users to evaluate; defaults to every user in ``data_dir``.
+        max_workers: Worker processes (None uses every core).
+        cutoff_splits: Tasks each user's cutoffs are divided into.
+        backtest_fn: Picklable per-user backtest, called like backtest_user.
+
+    Returns:
+        (results, failures): the merged fold table and an error message
+        per user whose backtest failed.
+    """
+    if cutoff_splits <= 0:
+        raise ValueError("cutoff_splits must be a positive integer.")
+
+    if user_ids is None:
+        user_ids = iter_user_ids(data_dir)
+
+    workers = max_workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+
+    # (submission order, result) so the merged table does not depend on timing
+    parts: List[Tuple[int, BacktestResults]] = []
+    failures: Dict[str, str] = {}
+
+    def drain(pending: Dict[Future, Tuple[int, str]], block_all: bool) -> None:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                order, user_id = pending.pop(future)
+                try:
+                    parts.append((order, future.result()))
+                except Exception as exc:  # incl. BrokenProcessPool: a worker died
+                    failures[user_id] = f"{type(exc).__name__}: {exc}"
+            if not block_all:
+                return
+
+    with RestartingProcessPool(max_workers=workers) as executor:
+        pending: Dict[Future, Tuple[int, str]] = {}
+
+        submitted = 0
+        for user_id in user_ids:
+            for split in range(cutoff_splits):
+                if len(pending) >= max_in_flight:
+                    drain(pending, block_all=False)
+                future = executor.submit(
+                    _backtest_task, data_dir, user_id, split, cutoff_splits, backtest_fn
+                )
+                pending[future] = (submitted, user_id)
+                submitted += 1
+
+        drain(pending, block_all=True)
+
+    parts.sort(key=lambda item: item[0])
+    # A user with one failed split would be only partly evaluated
+    results = BacktestResults.concat([
+        part for _, part in parts
+        if not any(user_id in failures for user_id in part.user_ids)
+    ])
+    return results, failures
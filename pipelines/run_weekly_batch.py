@@ -0,0 +1,192 @@
+"""
+Responsibility:
+Runs the weekly intelligence pipeline for many users in parallel.
+
+User ids are consumed lazily, grouped into chunks and fanned out over a
+process pool. Only a bounded number of chunks is in flight at any time,
+and each result is written to a JSONL file as soon as its chunk finishes,
+so memory stays flat regardless of how many users are processed.
+
+A worker process that dies (segfault, OOM kill, ``os._exit``) breaks the
+whole pool; the chunks in flight at that moment are recorded as failures
+and the run continues on a fresh pool.
+"""
+
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional
+
+from config.paths import SYNTHETIC_DATA_DIR
+from config.settings import BATCH_CHUNK_SIZE, BATCH_MAX_WORKERS
+from core.store import Store
+from pipelines.run_weekly_intelligence import run_weekly_intelligence
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+
+def iter_user_ids(data_dir: Path = SYNTHETIC_DATA_DIR) -> Iterator[str]:
+    """
+    Yield every user id stored in ``data_dir``.
+    """
+    return Store(data_dir).iter_user_ids()
+
+
+def _chunked(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _failure(user_id: str, exc: BaseException) -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "error": {
+            "type": type(exc).__name__,
+            "message": str(exc),
+        },
+    }
+
+
+def _run_chunk(
+    report_fn: Callable[[str], dict],
+    user_ids: List[str],
+) -> List[Dict[str, Any]]:
+    """
+    Worker task: run the pipeline for each user, isolating failures.
+    """
+    results: List[Dict[str, Any]] = []
+
+    for user_id in user_ids:
+        try:
+            results.append({"user_id": user_id, "report": report_fn(user_id)})
+        except Exception as exc:  # one bad user must not abort the batch
+            results.append(_failure(user_id, exc))
+
+    return results
+
+
+def json_default(value: Any) -> Any:
+    """
+    json.dumps fallback for report values: NumPy scalars expose .item(),
+    anything else is stringified.
+    """
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+class RestartingProcessPool:
+    """
+    Process pool that replaces itself once a worker process has died.
+
+    A dead worker breaks a ProcessPoolExecutor: its in-flight futures fail
+    with BrokenProcessPool and every later submit raises it. ``submit``
+    starts a fresh pool instead, so only the tasks in flight are lost.
+    """
+
+    def __init__(self, max_workers: int):
+        self._max_workers = max_workers
+        self._executor = ProcessPoolExecutor(max_workers=max_workers)
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        try:
+            return self._executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # Futures of the broken pool still resolve (with the error)
+            self._executor.shutdown(wait=True)
+            self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+            return self._executor.submit(fn, *args)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "RestartingProcessPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown(wait=True)
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+
+def run_weekly_intelligence_batch(
+    output_path: Path,
+    user_ids: Optional[Iterable[str]] = None,
+    max_workers: Optional[int] = BATCH_MAX_WORKERS,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+    report_fn: Callable[[str], dict] = run_weekly_intelligence,
+) -> Dict[str, Any]:
+    """
+    Run weekly intelligence for many users and stream results to JSONL.
+
+    Args:
+        output_path: JSONL file receiving one line per user.
+        user_ids: Users to process; defaults to every user in
+            SYNTHETIC_DATA_DIR.
+        max_workers: Worker processes (None uses every core).
+        chunk_size: Users handed to a worker per task.
+        report_fn: Picklable per-user pipeline function.
+
+    Returns:
+        Summary counts: total users, failures, and report states.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer.")
+
+    if user_ids is None:
+        user_ids = iter_user_ids()
+
+    workers = max_workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+
+    summary: Dict[str, Any] = {"users": 0, "failed": 0, "states": {}}
+
+    def record(f: IO[str], results: List[Dict[str, Any]]) -> None:
+        for result in results:
+            f.write(json.dumps(result, default=json_default) + "\n")
+            summary["users"] += 1
+            if "error" in result:
+                summary["failed"] += 1
+            else:
+                state = result["report"].get("status", {}).get("state", "unknown")
+                summary["states"][state] = summary["states"].get(state, 0) + 1
+        f.flush()
+
+    def drain(f: IO[str], pending: Dict[Future, List[str]], block_all: bool) -> None:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = pending.pop(future)
+                try:
+                    results = future.result()
+                except Exception as exc:  # incl. BrokenProcessPool: a worker died
+                    results = [_failure(user_id, exc) for user_id in chunk]
+                record(f, results)
+            if not block_all:
+                return
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with RestartingProcessPool(max_workers=workers) as executor, \
+            output_path.open("w", encoding="utf-8") as f:
+        pending: Dict[Future, List[str]] = {}
+
+        for chunk in _chunked(user_ids, chunk_size):
+            if len(pending) >= max_in_flight:
+                drain(f, pending, block_all=False)
+            pending[executor.submit(_run_chunk, report_fn, chunk)] = chunk
+
+        drain(f, pending, block_all=True)
+
+    return summary
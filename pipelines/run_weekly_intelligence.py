@@ -3,31 +3,170 @@ Responsibility:
 Runs the full end-to-end weekly intelligence pipeline.
 """
 
-from pipelines.ingest import ingest_user
-from pipelines.analyze import analyze_user
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from analytics.aggregations import aggregate_user
+from analytics.calendar_index import CalendarIndex
+from config.paths import SYNTHETIC_DATA_DIR
+from config.settings import (
+    REGRESSION_RIDGE_ALPHA,
+    REGRESSION_SOLVER,
+    TRAIN_SPLIT_RATIO,
+    WEEKLY_GAP_POLICY,
+    WEEKLY_LOOKBACK_DAYS,
+)
+from core.user import User
+from pipelines.analysis_cache import ANALYSIS_CACHE, AnalysisCache, freeze
+from pipelines.ingest import ingest_user, ingest_recent_user, user_data_version
+from pipelines.analyze import analyze_aggregates
 from pipelines.week_utils import split_into_weeks
 
-from ml.train import build_weekly_training_data
+from ml.train import build_weekly_training_data, build_sliding_weekly_training_data
 from ml.train_weekly_model import train_weekly_model
-from ml.evaluate_weekly_model import evaluate_weekly_baseline
+from ml.evaluate_weekly_model import (
+    evaluate_weekly_baseline,
+    evaluate_weekly_holdout_baseline,
+    evaluate_weekly_model,
+)
 from ml.metrics import mean_absolute_error
+from ml.model_store import MODEL_STORE, ModelStore, training_fingerprint
+from ml.models import LinearRegressionModel
+from ml.weekly_features import WEEKLY_FEATURE_NAMES
 
 from insights.explainations import explain_weekly_prediction
 from insights.risk import classify_weekly_risk
 from insights.risk import detect_risk_transition
 
-def run_weekly_intelligence(user_id: str) -> dict:
+
+def _weekly_analysis(user: User) -> Dict[str, Any]:
+    """
+    Every stage input that depends only on the user's stored data.
+    """
+    aggregates = aggregate_user(user)
+    analysis = analyze_aggregates(aggregates)
+    # Dates are parsed once and shared by every week split below
+    calendar = CalendarIndex.from_daily_totals(analysis["daily_totals"])
+    current_week, previous_week = split_into_weeks(
+        analysis["daily_totals"], calendar, WEEKLY_GAP_POLICY
+    )
+
+    return {
+        "analysis": analysis,
+        "current_week": current_week,
+        "previous_week": previous_week,
+        "baseline": evaluate_weekly_baseline(user, aggregates, calendar, WEEKLY_GAP_POLICY),
+        "training_data": build_weekly_training_data(
+            user, aggregates, calendar, WEEKLY_GAP_POLICY
+        ),
+        # Training windows follow the same gap policy as the predicted week
+        "sliding_data": build_sliding_weekly_training_data(
+            user, aggregates, gaps=WEEKLY_GAP_POLICY, calendar=calendar
+        ),
+    }
+
+
+def _load_weekly_analysis(
+    user_id: str,
+    lookback_days: Optional[int],
+    cache: Optional[AnalysisCache],
+) -> Optional[Dict[str, Any]]:
+    def compute() -> Optional[Dict[str, Any]]:
+        if lookback_days is None:
+            user = ingest_user(user_id)
+        else:
+            user = ingest_recent_user(user_id, lookback_days)
+        return _weekly_analysis(user) if user else None
+
+    if cache is None:
+        return compute()
+
+    version = user_data_version(user_id)
+    if version is None:
+        return None
+
+    key = (SYNTHETIC_DATA_DIR.resolve(), user_id, "weekly", lookback_days, version)
+    # Every later run gets the same object; freezing it keeps one caller's
+    # mutation from leaking into the others
+    return cache.get_or_compute(key, lambda: freeze(compute()))
+
+
+def _train_and_evaluate(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+) -> Tuple[LinearRegressionModel, Dict[str, Any]]:
+    """
+    Fit the weekly model and score it on a hold-out tail.
+    """
+    model, _ = train_weekly_model(None, training_data=(X_train, y_train))
+
+    model_mae = None
+    try:
+        y_true_model, y_pred_model = evaluate_weekly_model(X_train, y_train)
+        if y_true_model:
+            model_mae = mean_absolute_error(y_true_model, y_pred_model)
+    except ValueError:
+        # Too few samples to hold any out; no hold-out error to report
+        model_mae = None
+
+    return model, {"model_mae": model_mae, "samples": len(X_train)}
+
+
+def _load_weekly_model(
+    user_id: str,
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    model_store: Optional[ModelStore],
+) -> Tuple[LinearRegressionModel, Dict[str, Any]]:
+    """
+    The trained weekly model and its metrics, reused from ``model_store``
+    while the training data is unchanged.
+    """
+    if model_store is None:
+        return _train_and_evaluate(X_train, y_train)
+
+    config = {
+        "model": LinearRegressionModel.__name__,
+        "solver": REGRESSION_SOLVER,
+        "alpha": REGRESSION_RIDGE_ALPHA,
+        "features": list(WEEKLY_FEATURE_NAMES),
+        "gaps": WEEKLY_GAP_POLICY,
+        "train_split_ratio": TRAIN_SPLIT_RATIO,
+    }
+    fingerprint = training_fingerprint(X_train, y_train, config)
+
+    model, manifest = model_store.get_or_train(
+        user_id, fingerprint, lambda: _train_and_evaluate(X_train, y_train)
+    )
+    return model, manifest["metrics"]
+
+
+def run_weekly_intelligence(
+    user_id: str,
+    lookback_days: Optional[int] = WEEKLY_LOOKBACK_DAYS,
+    cache: Optional[AnalysisCache] = ANALYSIS_CACHE,
+    model_store: Optional[ModelStore] = MODEL_STORE,
+) -> dict:
     """
     Run full weekly intelligence pipeline for a user.
 
+    Only the last ``lookback_days`` calendar days are read from storage
+    (the full history when None), so cost follows the window, not the
+    user's total history. Analytics, weekly splits, the baseline and the
+    weekly features are computed once per stored data version and shared
+    through ``cache`` (None disables caching). The trained model and its
+    hold-out error are stored in ``model_store`` and reused until the
+    training data changes (None retrains every run).
+
     Returns a structured, fully explainable weekly intelligence report.
     """
 
     # --------------------
-    # 1️⃣ Ingest
+    # 1️⃣ Ingest + 2️⃣ Analytics
     # --------------------
-    user = ingest_user(user_id)
-    if not user:
+    weekly = _load_weekly_analysis(user_id, lookback_days, cache)
+    if not weekly:
         return {
             "status": {
                 "state": "error",
@@ -35,13 +174,8 @@ def run_weekly_intelligence(user_id: str) -> dict:
             }
         }
 
-    # --------------------
-    # 2️⃣ Analytics
-    # --------------------
-    analysis = analyze_user(user)
-    daily_totals = analysis["daily_totals"]
-
-    current_week, previous_week = split_into_weeks(daily_totals)
+    current_week = weekly["current_week"]
+    previous_week = weekly["previous_week"]
 
     if not current_week or not previous_week:
         return {
@@ -57,8 +191,13 @@ def run_weekly_intelligence(user_id: str) -> dict:
     # --------------------
     # 3️⃣ Baseline Evaluation
     # --------------------
-    y_true_base, y_pred_base = evaluate_weekly_baseline(user)
-    baseline_mae = mean_absolute_error(y_true_base, y_pred_base)
+    # Scored on the model's hold-out samples so the two errors are comparable;
+    # the error over every week of the history is reported separately
+    X_train, y_train = weekly["sliding_data"]
+    baseline_mae = mean_absolute_error(*evaluate_weekly_holdout_baseline(X_train, y_train))
+
+    y_true_base, y_pred_base = weekly["baseline"]
+    history_baseline_mae = mean_absolute_error(y_true_base, y_pred_base)
 
     # --------------------
     # 4️⃣ Model Training (doctrine-aware)
@@ -69,11 +208,14 @@ def run_weekly_intelligence(user_id: str) -> dict:
     model_mae = None
     ml_used = False
 
+    # Current-week features; the model predicts the week that follows
+    X, _ = weekly["training_data"]
+
     try:
-        X, y_true_model = build_weekly_training_data(user)
-        model, coefficients = train_weekly_model(user)
+        model, metrics = _load_weekly_model(user_id, X_train, y_train, model_store)
+        coefficients = model.coefficients()
         prediction = model.predict(X)[0]
-        model_mae = mean_absolute_error(y_true_model, [prediction])
+        model_mae = metrics.get("model_mae")
         ml_used = True
 
     except ValueError:
@@ -120,12 +262,13 @@ def run_weekly_intelligence(user_id: str) -> dict:
 
         "evaluation": {
     "baseline_mae": baseline_mae,
+    "history_baseline_mae": history_baseline_mae,
     "model_mae": model_mae,
     "beats_baseline": (
         model_mae < baseline_mae if model_mae is not None else False
     ),
     "ml_used": ml_used,
-    "samples_used": len(X) if ml_used else 0,
+    "samples_used": len(X_train) if ml_used else 0,
 },
 
 
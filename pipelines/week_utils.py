@@ -1,34 +1,34 @@
-from datetime import datetime
 from typing import Dict, Tuple, Optional
 
+from analytics.calendar_index import CalendarIndex
+from config.settings import DAYS_PER_WEEK, WEEKLY_GAP_POLICY
+
 
 def split_into_weeks(
     daily_totals: Dict[str, int],
+    calendar: Optional[CalendarIndex] = None,
+    gaps: str = WEEKLY_GAP_POLICY,
 ) -> Tuple[Dict[str, int], Optional[Dict[str, int]]]:
     """
     Splits daily totals into current and previous week (rolling windows).
+
+    The weeks end at the latest active day and follow the ``gaps`` policy
+    of analytics.windows: "skip" takes the last 7 days that have data,
+    however far apart; "zero_fill" the last 7 calendar days, missing days
+    as 0; "insufficient" also uses calendar days but requires every day
+    to have data. A calendar week that starts before the first active day
+    (or misses a day under "insufficient") is dropped: current as {},
+    previous as None. Pass the CalendarIndex of ``daily_totals`` to reuse
+    it.
     """
     if not daily_totals:
         return {}, None
 
-    # Convert and sort dates
-    parsed_dates = sorted(
-        datetime.strptime(d, "%Y-%m-%d").date()
-        for d in daily_totals.keys()
-    )
-
-    # Take rolling windows from available data
-    current_week_dates = parsed_dates[-7:]
-    previous_week_dates = parsed_dates[-14:-7]
-
-    current_week = {
-        d.strftime("%Y-%m-%d"): daily_totals[d.strftime("%Y-%m-%d")]
-        for d in current_week_dates
-    }
+    if calendar is None:
+        calendar = CalendarIndex.from_daily_totals(daily_totals)
 
-    previous_week = {
-        d.strftime("%Y-%m-%d"): daily_totals[d.strftime("%Y-%m-%d")]
-        for d in previous_week_dates
-    }
+    current, previous = calendar.recent_windows(DAYS_PER_WEEK, count=2, gaps=gaps)
+    current_week = {d: daily_totals.get(d, 0) for d in current or ()}
+    previous_week = {d: daily_totals.get(d, 0) for d in previous or ()}
 
     return current_week, previous_week if previous_week else None
@@ -0,0 +1,283 @@
+"""
+Responsibility:
+Serves weekly intelligence reports on demand over asyncio.
+
+WeeklyReportService keys every report by (user_id, Store data version):
+    - a finished report is served from memory until the user's data
+      changes, which also changes the key;
+    - concurrent requests for a key that is being computed wait for that
+      one computation instead of starting their own;
+    - reports are computed in a process pool so the event loop only
+      parses requests and writes responses.
+serve_weekly_reports exposes the service as a small HTTP/1.1 JSON API
+(stdlib asyncio streams, keep-alive connections):
+    GET /reports/<user_id>  the weekly report
+    GET /health             service counters
+"""
+
+import asyncio
+import json
+import multiprocessing
+import re
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from config.settings import (
+    SERVICE_HOST,
+    SERVICE_MAX_WORKERS,
+    SERVICE_PORT,
+    SERVICE_REPORT_CACHE_ENTRIES,
+)
+from pipelines.ingest import user_data_version
+from pipelines.run_weekly_batch import json_default
+from pipelines.run_weekly_intelligence import run_weekly_intelligence
+
+
+# User ids become file names in the Store; refuse anything path-like
+_USER_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$")
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+# Upper bound on request line plus headers
+_MAX_HEADER_BYTES = 16 * 1024
+
+
+# -----------------------------
+# Service
+# -----------------------------
+
+class WeeklyReportService:
+    """
+    Coalescing, version-keyed cache in front of a report function.
+
+    Args:
+        executor: Pool the reports run in; a spawning ProcessPoolExecutor
+            with ``max_workers`` is created (and owned) when None.
+        report_fn: Picklable per-user pipeline function.
+        version_fn: Data version of a user (None when it has no data);
+            called in a thread since it touches the file system.
+        max_reports: Finished reports kept, least recently used evicted.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        max_workers: Optional[int] = SERVICE_MAX_WORKERS,
+        report_fn: Callable[[str], dict] = run_weekly_intelligence,
+        version_fn: Callable[[str], Optional[Hashable]] = user_data_version,
+        max_reports: int = SERVICE_REPORT_CACHE_ENTRIES,
+    ):
+        if max_reports <= 0:
+            raise ValueError("max_reports must be a positive integer.")
+
+        self._owns_executor = executor is None
+        if executor is None:
+            # Spawned, not forked: the event loop runs helper threads, and a
+            # forked worker can inherit a lock one of them holds
+            executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        self._executor = executor
+        self._report_fn = report_fn
+        self._version_fn = version_fn
+        self.max_reports = max_reports
+
+        # user_id -> (version, report); one entry per user, newest version only
+        self._reports: "OrderedDict[str, Tuple[Hashable, dict]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, Hashable], "asyncio.Future[dict]"] = {}
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "computed": 0}
+
+    async def get_report(self, user_id: str) -> dict:
+        """
+        The user's weekly report for its current data version.
+
+        Returned reports are shared between callers and must not be mutated.
+        """
+        self.stats["requests"] += 1
+        version = await asyncio.to_thread(self._version_fn, user_id)
+
+        cached = self._reports.get(user_id)
+        if cached is not None and cached[0] == version:
+            self._reports.move_to_end(user_id)
+            self.stats["cache_hits"] += 1
+            return cached[1]
+
+        key = (user_id, version)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+        else:
+            future = asyncio.ensure_future(self._compute(user_id, version))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # A cancelled caller must not cancel the computation others wait on
+        return await asyncio.shield(future)
+
+    async def _compute(self, user_id: str, version: Hashable) -> dict:
+        loop = asyncio.get_running_loop()
+        self.stats["computed"] += 1
+        report = await loop.run_in_executor(self._executor, self._report_fn, user_id)
+
+        current = self._reports.get(user_id)
+        # A slower computation for an older version must not replace a newer one
+        if current is None or current[0] != version:
+            self._reports[user_id] = (version, report)
+            self._reports.move_to_end(user_id)
+            while len(self._reports) > self.max_reports:
+                self._reports.popitem(last=False)
+
+        return report
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """
+        Forget the cached report of ``user_id`` (of every user when None).
+        """
+        if user_id is None:
+            self._reports.clear()
+        else:
+            self._reports.pop(user_id, None)
+
+    def close(self) -> None:
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+
+# -----------------------------
+# HTTP front end
+# -----------------------------
+
+def _response(status: int, payload: Any, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, default=json_default).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    return head.encode("ascii") + body
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str]]]:
+    """
+    (method, path, headers) of the next request; None at end of stream.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise ValueError("Request headers too large.")
+
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split()
+    if len(parts) != 3:
+        raise ValueError("Malformed request line.")
+
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    # Requests carry no body we use, but it must not be read as the next request
+    length = int(headers.get("content-length", "0") or 0)
+    if length:
+        await reader.readexactly(length)
+
+    return parts[0].upper(), parts[1], headers
+
+
+async def _route(service: WeeklyReportService, method: str, path: str) -> Tuple[int, Any]:
+    if method != "GET":
+        return 405, {"error": "Only GET is supported."}
+
+    path = path.split("?", 1)[0]
+    if path == "/health":
+        return 200, {"status": "ok", **service.stats}
+
+    if path.startswith("/reports/"):
+        user_id = path[len("/reports/"):]
+        if not _USER_ID.match(user_id):
+            return 400, {"error": "Invalid user id."}
+        try:
+            report = await service.get_report(user_id)
+        except Exception as exc:  # one failed report must not drop the connection
+            return 500, {"error": f"{type(exc).__name__}: {exc}"}
+        # The pipeline reports an unknown user as an "error" state
+        if report.get("status", {}).get("state") == "error":
+            return 404, report
+        return 200, report
+
+    return 404, {"error": "Not found."}
+
+
+async def _handle_connection(
+    service: WeeklyReportService,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except ValueError as exc:
+                writer.write(_response(400, {"error": str(exc)}, keep_alive=False))
+                break
+            if request is None:
+                break
+
+            method, path, headers = request
+            keep_alive = headers.get("connection", "").lower() != "close"
+            status, payload = await _route(service, method, path)
+
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_weekly_report_server(
+    service: WeeklyReportService,
+    host: str = SERVICE_HOST,
+    port: int = SERVICE_PORT,
+) -> asyncio.AbstractServer:
+    """
+    Start serving ``service`` over HTTP; port 0 picks a free port.
+    """
+    return await asyncio.start_server(
+        lambda reader, writer: _handle_connection(service, reader, writer),
+        host,
+        port,
+        limit=_MAX_HEADER_BYTES,
+    )
+
+
+async def serve_weekly_reports(
+    host: str = SERVICE_HOST,
+    port: int = SERVICE_PORT,
+    max_workers: Optional[int] = SERVICE_MAX_WORKERS,
+) -> None:
+    """
+    Run the report service until cancelled.
+    """
+    service = WeeklyReportService(max_workers=max_workers)
+    server = await start_weekly_report_server(service, host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
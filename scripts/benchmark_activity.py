@@ -0,0 +1,128 @@
+"""
+Responsibility:
+Micro-benchmarks Activity memory footprint and construction time.
+
+Compares the previous dict-backed Activity against the slotted, interned
+class, through both the validating constructor and the trusted Store path.
+Records are decoded from JSON first, as Store.load_user does, so every
+record starts with its own copy of the name and category strings.
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from core.activity import Activity
+from core.columnar import ActivityTable
+
+
+N_ACTIVITIES = 100_000
+REPEATS = 5
+
+
+class _DictActivity:
+    """
+    The Activity layout before slots and interning, kept for comparison.
+    """
+
+    def __init__(self, name, category, duration_minutes, timestamp, mood=None):
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError("Activity name must be a non-empty string.")
+        if not isinstance(category, str) or not category.strip():
+            raise ValueError("Activity category must be a non-empty string.")
+        if not isinstance(duration_minutes, int) or duration_minutes <= 0:
+            raise ValueError("Activity duration must be a positive integer.")
+        if not isinstance(timestamp, datetime):
+            raise TypeError("timestamp must be a datetime instance.")
+        if mood is not None:
+            if not isinstance(mood, int) or not (1 <= mood <= 5):
+                raise ValueError("Mood must be an integer between 1 and 5.")
+
+        self._name = name
+        self._category = category
+        self._duration_minutes = duration_minutes
+        self._timestamp = timestamp
+        self._mood = mood
+
+
+def _raw_records() -> str:
+    start = datetime(2026, 1, 1, 6, 0)
+    return json.dumps(
+        [
+            ["Coding", "Work", 30 + i % 90, (start + timedelta(minutes=i)).isoformat(), 3]
+            for i in range(N_ACTIVITIES)
+        ]
+    )
+
+
+def _decode(raw: str) -> list:
+    return [
+        (name, category, duration, datetime.fromisoformat(ts), mood)
+        for name, category, duration, ts, mood in json.loads(raw)
+    ]
+
+
+def _build(factory, records) -> list:
+    return [factory(*record) for record in records]
+
+
+def _bytes_per_activity(factory, raw: str) -> float:
+    """
+    Memory retained per activity after decoding and construction,
+    including the timestamp and any strings the activity keeps alive.
+    """
+    gc.collect()
+    tracemalloc.start()
+    records = _decode(raw)
+    activities = _build(factory, records)
+    del records
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del activities
+    return retained / N_ACTIVITIES
+
+
+def _seconds(factory, records) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        _build(factory, records)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark() -> None:
+    raw = _raw_records()
+    records = _decode(raw)
+    variants = [
+        ("dict Activity (before)", _DictActivity),
+        ("Activity(...)", Activity),
+        ("Activity.from_trusted", Activity.from_trusted),
+    ]
+
+    _build(_DictActivity, records)  # warm up allocator
+    baseline_bytes = _bytes_per_activity(_DictActivity, raw)
+    baseline_seconds = _seconds(_DictActivity, records)
+
+    print(f"{N_ACTIVITIES} activities, best of {REPEATS}\n")
+    print(f"{'variant':<24} {'bytes/act':>10} {'x less':>7} {'µs/act':>8} {'x faster':>9}")
+
+    for label, factory in variants:
+        size = _bytes_per_activity(factory, raw)
+        seconds = _seconds(factory, records)
+        print(
+            f"{label:<24} {size:>10.1f} {baseline_bytes / size:>7.2f} "
+            f"{seconds / N_ACTIVITIES * 1e6:>8.3f} {baseline_seconds / seconds:>9.2f}"
+        )
+
+    # Bulk histories are better held column-wise; shown for reference
+    table = ActivityTable.empty().extend(_build(Activity.from_trusted, records), [])
+    size = table.nbytes / N_ACTIVITIES
+    print(f"{'ActivityTable columns':<24} {size:>10.1f} {baseline_bytes / size:>7.2f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
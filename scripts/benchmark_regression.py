@@ -0,0 +1,74 @@
+"""
+Responsibility:
+Benchmarks LinearRegressionModel solvers.
+
+For several sample and feature counts, each solver fits the same
+ill-conditioned synthetic problem (correlated columns on different scales,
+like the weekly features) from a NumPy array, in float64 and float32.
+Reports the best fit time and the relative coefficient error against the
+true weights. The legacy dict input path is timed alongside for reference.
+"""
+
+import time
+
+import numpy as np
+
+from ml.models import SOLVERS, LinearRegressionModel
+
+
+SAMPLE_COUNTS = (100, 10_000, 200_000)
+FEATURE_COUNTS = (9, 50)
+DTYPES = (np.float64, np.float32)
+REPEATS = 5
+SEED = 7
+
+
+def _problem(n_samples: int, n_features: int, rng: np.random.Generator):
+    base = rng.normal(size=(n_samples, 1))
+    X = 0.9 * base + 0.1 * rng.normal(size=(n_samples, n_features))
+    X *= np.logspace(0, 3, n_features)
+    weights = rng.normal(size=n_features + 1)
+    y = weights[0] + X @ weights[1:] + 0.01 * rng.normal(size=n_samples)
+    return X, y, weights
+
+
+def _best_time(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark() -> None:
+    rng = np.random.default_rng(SEED)
+
+    print(f"{'samples':>8} {'features':>8} {'solver':>9} {'dtype':>8} {'fit ms':>9} {'coef err':>10}")
+
+    for n_samples in SAMPLE_COUNTS:
+        for n_features in FEATURE_COUNTS:
+            X, y, weights = _problem(n_samples, n_features, rng)
+            names = [f"f{i}" for i in range(n_features)]
+
+            for solver in SOLVERS:
+                for dtype in DTYPES:
+                    model = LinearRegressionModel(names, solver=solver, dtype=dtype)
+                    X_typed = X.astype(dtype)
+                    seconds = _best_time(lambda: model.fit(X_typed, y))
+                    fitted = np.array([model.intercept(), *model.coefficients().values()])
+                    error = np.linalg.norm(fitted - weights) / np.linalg.norm(weights)
+                    print(
+                        f"{n_samples:>8} {n_features:>8} {solver:>9} "
+                        f"{np.dtype(dtype).name:>8} {seconds * 1e3:>9.3f} {error:>10.2e}"
+                    )
+
+            if n_samples <= 10_000:
+                rows = [dict(zip(names, row)) for row in X.tolist()]
+                model = LinearRegressionModel(names, solver="pinv")
+                seconds = _best_time(lambda: model.fit(rows, y.tolist()))
+                print(f"{n_samples:>8} {n_features:>8} {'pinv':>9} {'dicts':>8} {seconds * 1e3:>9.3f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
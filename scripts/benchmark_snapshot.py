@@ -0,0 +1,91 @@
+"""
+Responsibility:
+Benchmarks user loading from JSON versus binary snapshots.
+
+For 1, 10 and 100 years of synthetic data, each format is loaded in a fresh
+subprocess so that load time and peak RSS are measured in isolation.
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from config.paths import PROJECT_ROOT
+from core.store import Store
+from scripts.generate_data import generate_user_with_activity
+
+
+YEARS = (1, 10, 100)
+DAYS_PER_YEAR = 365
+
+# ru_maxrss survives exec on Linux, so prefer the per-process high-water mark
+_CHILD = """
+import json, resource, sys, time
+from pathlib import Path
+from core.store import Store
+
+def peak_rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+data_dir, suffix, user_id = sys.argv[1], sys.argv[2], sys.argv[3]
+store = Store(Path(data_dir), suffix=suffix)
+
+rss_before = peak_rss_kb()
+start = time.perf_counter()
+user = store.load_user(user_id)
+elapsed = time.perf_counter() - start
+rss_after = peak_rss_kb()
+
+print(json.dumps({
+    "seconds": elapsed,
+    "rss_kb": rss_after,
+    "rss_delta_kb": rss_after - rss_before,
+}))
+"""
+
+
+def _measure(data_dir: Path, suffix: str, user_id: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD, str(data_dir), suffix, user_id],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def run_benchmark() -> None:
+    print(f"{'years':>5} {'format':>6} {'size MB':>9} {'load s':>9} {'RSS MB':>9} {'ΔRSS MB':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+
+        for years in YEARS:
+            user = generate_user_with_activity(days=years * DAYS_PER_YEAR)
+            user_id = user.get_user_id()
+
+            Store(data_dir).save_user(user)
+            Store.convert(data_dir / f"{user_id}.json", data_dir / f"{user_id}.snap")
+
+            for suffix in (".json", ".snap"):
+                stats = _measure(data_dir, suffix, user_id)
+                size_mb = (data_dir / f"{user_id}{suffix}").stat().st_size / 1e6
+                print(
+                    f"{years:>5} {suffix[1:]:>6} {size_mb:>9.2f} "
+                    f"{stats['seconds']:>9.4f} {stats['rss_kb'] / 1024:>9.1f} "
+                    f"{stats['rss_delta_kb'] / 1024:>9.1f}"
+                )
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,45 @@
+"""
+Responsibility:
+Backtests weekly forecasts for stored users and prints per-method errors.
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from config.settings import BACKTEST_CUTOFF_SPLITS, BATCH_MAX_WORKERS
+from pipelines.run_backtest import run_backtest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("user_ids", nargs="*", help="Users to evaluate (default: all).")
+    parser.add_argument("--output", type=Path, help="Optional JSONL file of every fold.")
+    parser.add_argument("--workers", type=int, default=BATCH_MAX_WORKERS)
+    parser.add_argument("--cutoff-splits", type=int, default=BACKTEST_CUTOFF_SPLITS)
+    args = parser.parse_args()
+
+    results, failures = run_backtest(
+        user_ids=args.user_ids or None,
+        max_workers=args.workers,
+        cutoff_splits=args.cutoff_splits,
+    )
+
+    print(f"Evaluated {len(results)} folds over {len(results.user_ids)} users ({len(failures)} failed).")
+    print(f"{'method':>15} {'folds':>7} {'MAE':>10} {'RMSE':>10}")
+    for method, stats in results.summary().items():
+        if stats["folds"]:
+            print(f"{method:>15} {stats['folds']:>7} {stats['mae']:>10.1f} {stats['rmse']:>10.1f}")
+    for user_id, message in sorted(failures.items()):
+        print(f"- {user_id}: {message}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with args.output.open("w", encoding="utf-8") as f:
+            for row in results.to_rows():
+                f.write(json.dumps(row) + "\n")
+        print(f"Folds written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,12 @@ Daily intelligence is descriptive and reflective only.
 No predictive ML is performed at daily resolution (v1 doctrine).
 """
 
-import json
-from pathlib import Path
+from datetime import date
 from typing import Dict
 
 from insights.summary import summarize_daily_activity
 from insights.recommender import recommend_from_daily_activity
+from pipelines.ingest import ingest_user
 
 
 def _minutes_to_hm(minutes: int) -> str:
@@ -21,7 +21,7 @@ def _minutes_to_hm(minutes: int) -> str:
     return f"{hours}h {mins}m"
 
 
-def run_daily_report(date_str: str) -> None:
+def run_daily_report(date_str: str, user_id: str = "synthetic_user") -> None:
     """
     Generate and print a daily activity report for a given date.
 
@@ -31,30 +31,27 @@ def run_daily_report(date_str: str) -> None:
     - behavioral recommendations
 
     It explicitly does NOT produce predictions.
+    Only the requested day is read from storage.
     """
 
-    data_path = Path("data/synthetic/synthetic_user.json")
+    report_date = date.fromisoformat(date_str)
+    user = ingest_user(user_id, start=report_date, end=report_date)
 
-    if not data_path.exists():
-        raise FileNotFoundError("Synthetic data file not found.")
+    if user is None:
+        raise FileNotFoundError(f"No data found for user '{user_id}'.")
 
-    with data_path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    logs = data["logs"]
-
-    day_log = next((log for log in logs if log["date"] == date_str), None)
+    day_log = user.get_day_log(report_date)
 
     if day_log is None:
         raise ValueError(f"No data found for date {date_str}.")
 
-    activities = day_log.get("activities", [])
-    total_minutes = sum(a["duration_minutes"] for a in activities)
+    activities = day_log.get_activities()
+    total_minutes = day_log.total_duration()
 
     category_totals: Dict[str, int] = {}
     for activity in activities:
-        category = activity["category"]
-        duration = activity["duration_minutes"]
+        category = activity.get_category()
+        duration = activity.get_duration_minutes()
         category_totals[category] = category_totals.get(category, 0) + duration
 
     # ---- Output ----
@@ -0,0 +1,40 @@
+"""
+Responsibility:
+Runs weekly intelligence for every stored user and writes a JSONL report.
+"""
+
+import argparse
+from pathlib import Path
+
+from config.paths import WEEKLY_REPORTS_DIR
+from config.settings import BATCH_CHUNK_SIZE, BATCH_MAX_WORKERS
+from pipelines.run_weekly_batch import run_weekly_intelligence_batch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("user_ids", nargs="*", help="Users to process (default: all).")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=WEEKLY_REPORTS_DIR / "weekly_intelligence.jsonl",
+    )
+    parser.add_argument("--workers", type=int, default=BATCH_MAX_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    summary = run_weekly_intelligence_batch(
+        output_path=args.output,
+        user_ids=args.user_ids or None,
+        max_workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+
+    print(f"Processed {summary['users']} users ({summary['failed']} failed).")
+    for state, count in sorted(summary["states"].items()):
+        print(f"- {state}: {count}")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Responsibility:
+Serves weekly intelligence reports over HTTP until interrupted.
+"""
+
+import argparse
+import asyncio
+
+from config.settings import SERVICE_HOST, SERVICE_MAX_WORKERS, SERVICE_PORT
+from pipelines.weekly_service import serve_weekly_reports
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_MAX_WORKERS)
+    args = parser.parse_args()
+
+    print(f"Serving weekly reports on http://{args.host}:{args.port}/reports/<user_id>")
+    try:
+        asyncio.run(serve_weekly_reports(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
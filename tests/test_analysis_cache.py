@@ -0,0 +1,133 @@
+"""
+Responsibility:
+Tests the per-user analysis cache and its use by the weekly pipeline.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import pipelines.ingest as ingest
+import pipelines.run_weekly_intelligence as weekly
+from core.activity import Activity
+from core.store import Store
+from core.user import User
+from pipelines.analysis_cache import AnalysisCache, estimate_size, freeze
+
+
+def _user(user_id: str = "cached_user", days: int = 21) -> User:
+    user = User(user_id)
+    start = datetime(2026, 1, 1, 9, 0)
+    for day in range(days):
+        user.log_activity(
+            Activity(
+                name="Coding",
+                category="Work",
+                duration_minutes=60 + day,
+                timestamp=start + timedelta(days=day),
+            )
+        )
+    return user
+
+
+def test_cache_evicts_least_recently_used_entry():
+    cache = AnalysisCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+
+
+def test_cache_respects_memory_budget():
+    value = list(range(1000))
+    cache = AnalysisCache(max_bytes=int(estimate_size(value) * 1.5))
+
+    cache.put("a", value)
+    cache.put("b", list(value))
+
+    assert len(cache) == 1
+    assert "b" in cache
+    assert cache.nbytes <= cache.max_bytes
+
+    cache.put("huge", list(range(100_000)))
+    assert "huge" not in cache
+
+
+def test_cache_rejects_invalid_limits():
+    with pytest.raises(ValueError):
+        AnalysisCache(max_bytes=0)
+    with pytest.raises(ValueError):
+        AnalysisCache(max_entries=0)
+
+
+def test_store_writes_invalidate_user_entries(tmp_path):
+    cache = AnalysisCache()
+    store = Store(tmp_path, compaction_threshold_bytes=None)
+    data_dir = tmp_path.resolve()
+    cache.put((data_dir, "u1", "weekly", 1), "stale")
+    cache.put((data_dir, "u2", "weekly", 1), "kept")
+
+    Store.add_write_listener(cache.invalidate)
+    try:
+        store.save_user(_user("u1"))
+    finally:
+        Store.remove_write_listener(cache.invalidate)
+
+    assert (data_dir, "u1", "weekly", 1) not in cache
+    assert (data_dir, "u2", "weekly", 1) in cache
+
+
+def test_weekly_pipeline_reuses_cached_analysis(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "SYNTHETIC_DATA_DIR", tmp_path)
+    monkeypatch.setattr(weekly, "SYNTHETIC_DATA_DIR", tmp_path)
+
+    store = Store(tmp_path, compaction_threshold_bytes=None)
+    store.save_user(_user())
+
+    computed = []
+    real = weekly._weekly_analysis
+    monkeypatch.setattr(
+        weekly, "_weekly_analysis", lambda user: computed.append(1) or real(user)
+    )
+
+    cache = AnalysisCache()
+    first = weekly.run_weekly_intelligence("cached_user", cache=cache, model_store=None)
+    second = weekly.run_weekly_intelligence("cached_user", cache=cache, model_store=None)
+
+    assert first == second
+    assert first["status"]["state"] == "ok"
+    assert len(computed) == 1
+
+    store.log_activity(
+        "cached_user",
+        Activity("Gym", "Health", 45, datetime(2026, 1, 22, 7, 0)),
+    )
+    third = weekly.run_weekly_intelligence("cached_user", cache=cache, model_store=None)
+
+    assert len(computed) == 2
+    assert third["prediction"]["previous_week_minutes"] != first["prediction"]["previous_week_minutes"]
+    assert weekly.run_weekly_intelligence("cached_user", cache=None, model_store=None) == third
+
+
+def test_cached_weekly_analysis_is_read_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "SYNTHETIC_DATA_DIR", tmp_path)
+    monkeypatch.setattr(weekly, "SYNTHETIC_DATA_DIR", tmp_path)
+    Store(tmp_path, compaction_threshold_bytes=None).save_user(_user())
+
+    cache = AnalysisCache()
+    cached = weekly._load_weekly_analysis("cached_user", None, cache)
+
+    with pytest.raises(TypeError):
+        cached["current_week"]["2026-01-21"] = 0
+    with pytest.raises(TypeError):
+        cached["analysis"]["daily_totals"]["2026-01-01"] = 0
+    with pytest.raises(ValueError):
+        cached["sliding_data"][0][0, 0] = 0.0
+    assert weekly._load_weekly_analysis("cached_user", None, cache) is cached
+
+    frozen = freeze({"a": [1, {"b": 2}], "x": np.zeros(3)})
+    assert frozen["a"] == (1, {"b": 2})
+    assert estimate_size(frozen) > estimate_size({})
@@ -2,12 +2,41 @@
 Responsibility:
 Tests analytics computations and aggregations.
 """
+import json
+import random
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
 from analytics.aggregations import (
+    aggregate_logs,
+    aggregate_user,
+    iter_day_summaries,
     total_duration_per_day,
     daily_category_minutes,
     total_duration_per_category,activity_count_per_category
 )
-from analytics.statistics import (daily_average, activity_variability, category_share, category_balance,dominance_ratio)
+from analytics.correlations import (
+    _pearson_correlation,
+    category_total_correlation,
+    cohort_category_total_correlation,
+    pearson_matrix,
+    rank_average,
+    rolling_correlation,
+    spearman_matrix,
+)
+from analytics.incremental import ActivityStatistics, CategoryMix, RollingWindow
+from analytics.statistics import (daily_average, activity_variability, category_share, category_balance,dominance_ratio, variance)
+from analytics.trends import split_weeks, weekly_category_totals, weekly_total_duration
+from analytics.windows import GAP_INSUFFICIENT, GAP_SKIP, GAP_ZERO_FILL
+from core.activity import Activity
+from core.columnar import ColumnarUser
+from core.store import Store
+from core.user import User
+from ml.features import build_feature_matrix
+from pipelines.analyze import analyze_logs, analyze_user
+from pipelines.week_utils import split_into_weeks
 def test_total_duration_per_day():
     logs = [
         {
@@ -182,3 +211,354 @@ def test_activity_count_per_category():
 
     counts = activity_count_per_category(logs)
     assert counts == {"Work": 2, "Study": 1}
+
+
+def _user_with_logs():
+    user = User("aggregate_user")
+    start = datetime(2024, 6, 1, 9, 0)
+    for i in range(3):
+        day = start + timedelta(days=i)
+        user.log_activity(Activity("Coding", "Work", 60 + i, day, mood=4))
+        user.log_activity(Activity("Walking", "Health", 30, day.replace(hour=18)))
+    return user
+
+
+def test_aggregate_logs_matches_per_metric_functions():
+    logs = [
+        {
+            "date": "2024-06-01",
+            "activities": [
+                {"category": "Work", "duration_minutes": 120, "mood": 3},
+                {"category": "Study", "duration_minutes": 60},
+                {"category": "Work", "duration_minutes": 30, "mood": 5},
+            ],
+        },
+        {
+            "date": "2024-06-02",
+            "activities": [
+                {"category": "Exercise", "duration_minutes": 30},
+            ],
+        },
+    ]
+
+    aggregates = aggregate_logs(logs)
+
+    assert total_duration_per_day(aggregates) == total_duration_per_day(logs)
+    assert daily_category_minutes(aggregates) == daily_category_minutes(logs)
+    assert total_duration_per_category(aggregates) == total_duration_per_category(logs)
+    assert activity_count_per_category(aggregates) == {"Work": 2, "Study": 1, "Exercise": 1}
+    assert aggregates.daily_counts == {"2024-06-01": 3, "2024-06-02": 1}
+    assert aggregates.daily_mood_sums == {"2024-06-01": 8, "2024-06-02": 0}
+    assert aggregates.daily_mood_counts == {"2024-06-01": 2, "2024-06-02": 0}
+
+
+def test_aggregate_user_matches_columnar_and_feeds_weekly_trends():
+    user = _user_with_logs()
+    columnar = ColumnarUser("aggregate_user")
+    for day_log in user.get_all_logs():
+        columnar.add_activity_log(day_log)
+
+    aggregates = aggregate_user(user)
+
+    assert aggregate_user(columnar) == aggregates
+    assert aggregates.daily_totals == {
+        "2024-06-01": 90,
+        "2024-06-02": 91,
+        "2024-06-03": 92,
+    }
+    assert aggregates.daily_mood_sums == {
+        "2024-06-01": 4,
+        "2024-06-02": 4,
+        "2024-06-03": 4,
+    }
+    assert weekly_total_duration(aggregates) == 273
+    assert weekly_category_totals(aggregates) == {"Work": 183, "Health": 90}
+
+
+def test_build_feature_matrix_accepts_aggregates():
+    logs = [
+        {
+            "date": f"2024-06-0{i}",
+            "activities": [
+                {"category": "Work", "duration_minutes": 60 * i},
+                {"category": "Leisure", "duration_minutes": 15},
+            ],
+        }
+        for i in range(1, 6)
+    ]
+
+    assert build_feature_matrix(aggregate_logs(logs)) == build_feature_matrix(logs)
+
+
+def test_rolling_window_tracks_sum_variance_and_max():
+    window = RollingWindow(3)
+    for value in [5, 1, 4, 2]:
+        window.push(value)
+    window.add_to_last(6)
+
+    assert window.values() == [1, 4, 8]
+    assert window.sum() == 13
+    assert window.max() == 8
+    assert window.variance() == pytest.approx(variance([1, 4, 8]))
+
+    assert window.push(0) == 1
+    assert window.max() == 8
+
+    with pytest.raises(ValueError):
+        window.add_to_last(-1)
+
+
+def test_category_mix_matches_batch_statistics():
+    mix = CategoryMix()
+    mix.add("Work", 280)
+    mix.add("Leisure", 20)
+    mix.add("Study", 50)
+    mix.remove("Study", 50)
+
+    assert mix.minutes() == {"Work": 280, "Leisure": 20}
+    assert mix.balance() == pytest.approx(category_balance({"Work": 280, "Leisure": 20}))
+    assert mix.dominance_ratio() == pytest.approx(0.9333, abs=1e-4)
+
+    mix.remove("Leisure", 20)
+    assert mix.balance() == 0.0
+
+
+def test_activity_statistics_match_batch_over_stream():
+    rng = random.Random(7)
+    stats = ActivityStatistics(gaps=GAP_SKIP)
+    daily: dict = {}
+    day = date(2024, 1, 1)
+
+    for _ in range(40):
+        day += timedelta(days=rng.choice([1, 1, 2]))
+        daily[day] = {}
+        for _ in range(rng.randint(1, 4)):
+            category = rng.choice(["Work", "Study", "Health", "Leisure"])
+            minutes = rng.randint(5, 120)
+            stats.add_activity(day, category, minutes)
+            daily[day][category] = daily[day].get(category, 0) + minutes
+
+        totals = {d.isoformat(): sum(c.values()) for d, c in daily.items()}
+        week = dict(list(totals.items())[-7:])
+        week_categories: dict = {}
+        for d in sorted(daily)[-7:]:
+            for category, minutes in daily[d].items():
+                week_categories[category] = week_categories.get(category, 0) + minutes
+
+        assert stats.daily_average() == pytest.approx(daily_average(totals))
+        assert stats.activity_variability() == pytest.approx(activity_variability(totals))
+        assert stats.daily_variability() == pytest.approx(activity_variability(week))
+        assert stats.dominance_ratio() == pytest.approx(dominance_ratio(week))
+        assert stats.category_balance() == pytest.approx(category_balance(week_categories))
+        assert stats.category_dominance_ratio() == pytest.approx(dominance_ratio(week_categories))
+
+    with pytest.raises(ValueError):
+        stats.add_activity(day - timedelta(days=1), "Work", 10)
+
+
+def test_activity_statistics_zero_fill_calendar_weeks():
+    rng = random.Random(3)
+    daily_categories: dict = {}
+    day = date(2024, 1, 1)
+    for _ in range(20):
+        day += timedelta(days=rng.choice([1, 1, 3, 9]))
+        daily_categories[day.isoformat()] = {"Work": rng.randint(5, 120), "Study": rng.randint(0, 30)}
+
+    totals = {d: sum(c.values()) for d, c in daily_categories.items()}
+    current_week, _ = split_into_weeks(totals, gaps=GAP_ZERO_FILL)
+    week_categories: dict = {}
+    for d in current_week:
+        for category, minutes in daily_categories.get(d, {}).items():
+            week_categories[category] = week_categories.get(category, 0) + minutes
+
+    for gaps in (GAP_ZERO_FILL, GAP_INSUFFICIENT):
+        stats = ActivityStatistics(gaps=gaps)
+        for d, categories in daily_categories.items():
+            stats.add_day(date.fromisoformat(d), categories)
+
+        assert stats.daily_average() == pytest.approx(daily_average(totals))
+        assert stats.week.sum() == sum(current_week.values())
+        assert stats.daily_variability() == pytest.approx(activity_variability(current_week))
+        assert stats.dominance_ratio() == pytest.approx(dominance_ratio(current_week))
+        assert stats.category_balance() == pytest.approx(category_balance(week_categories))
+        assert stats.week_is_sufficient() == (
+            gaps == GAP_ZERO_FILL or all(d in totals for d in current_week)
+        )
+
+
+def test_activity_statistics_from_aggregates():
+    aggregates = aggregate_user(_user_with_logs())
+    stats = ActivityStatistics.from_aggregates(aggregates)
+
+    assert stats.get_last_date() == date(2024, 6, 3)
+    assert stats.daily_variability() == pytest.approx(
+        activity_variability(aggregates.daily_totals)
+    )
+    assert stats.category_balance() == pytest.approx(
+        category_balance(aggregates.category_totals)
+    )
+
+
+def test_category_total_correlation_zero_fills_missing_days():
+    daily_categories = {
+        "2024-06-01": {"Work": 120, "Study": 30},
+        "2024-06-02": {"Work": 60},
+        "2024-06-03": {"Work": 90, "Study": 60},
+        "2024-06-04": {"Study": 10},
+    }
+    totals = {day: sum(c.values()) for day, c in daily_categories.items()}
+    days = sorted(daily_categories)
+
+    result = category_total_correlation(daily_categories, totals)
+
+    for category in ("Work", "Study"):
+        series = [daily_categories[d].get(category, 0) for d in days]
+        expected = _pearson_correlation(series, [totals[d] for d in days])
+        assert result[category] == pytest.approx(expected)
+
+    assert category_total_correlation(daily_categories, {"2024-06-01": 150}) == {}
+
+
+def test_constant_series_correlation_is_none():
+    daily_categories = {
+        "2024-06-01": {"Work": 60, "Study": 10},
+        "2024-06-02": {"Work": 60, "Study": 40},
+        "2024-06-03": {"Work": 60, "Study": 20},
+    }
+    totals = {day: sum(c.values()) for day, c in daily_categories.items()}
+
+    result = category_total_correlation(daily_categories, totals, method="spearman")
+
+    assert result["Work"] is None
+    assert result["Study"] == pytest.approx(1.0)
+
+
+def test_spearman_matrix_uses_average_ranks_for_ties():
+    matrix = np.array([[1, 10], [2, 20], [2, 20], [5, 15]], dtype=float)
+
+    assert rank_average(matrix[:, 0]).tolist() == [1.0, 2.5, 2.5, 4.0]
+
+    ranks = np.column_stack([rank_average(matrix[:, j]) for j in range(2)])
+    expected = np.corrcoef(ranks, rowvar=False)
+    assert np.allclose(spearman_matrix(matrix), expected)
+    assert np.allclose(pearson_matrix(matrix), np.corrcoef(matrix, rowvar=False))
+
+
+def test_rolling_correlation_matches_windowed_pearson():
+    rng = np.random.default_rng(3)
+    x = rng.random(40)
+    y = x + rng.random(40)
+
+    result = rolling_correlation(x, y, 7)
+
+    assert len(result) == 34
+    for i in (0, 10, 33):
+        assert result[i] == pytest.approx(np.corrcoef(x[i:i + 7], y[i:i + 7])[0, 1])
+    assert np.isnan(rolling_correlation([1, 1, 1, 2], [1, 2, 3, 4], 3)[0])
+
+
+def test_cohort_correlation_matches_per_user_results():
+    rng = np.random.default_rng(5)
+    minutes = rng.integers(0, 120, size=(6, 30, 4)).astype(float)
+    mask = rng.random((6, 30)) > 0.2
+    mask[0] = False
+
+    result = cohort_category_total_correlation(minutes, mask)
+
+    assert np.isnan(result[0]).all()
+    for user in range(1, 6):
+        days = minutes[user][mask[user]]
+        expected = np.corrcoef(days, rowvar=False, y=days.sum(axis=1))[-1, :-1]
+        assert np.allclose(result[user], expected)
+
+
+def test_streaming_consumers_accept_generators():
+    def stream():
+        for i in range(1, 21):
+            yield {
+                "date": f"2024-06-{i:02d}",
+                "activities": [
+                    {"category": "Work", "duration_minutes": 10 * i},
+                    {"category": "Health", "duration_minutes": 15},
+                ],
+            }
+
+    logs = list(stream())
+
+    assert total_duration_per_day(stream()) == total_duration_per_day(logs)
+    assert total_duration_per_category(stream()) == {"Work": 2100, "Health": 300}
+    assert activity_count_per_category(stream()) == {"Work": 20, "Health": 20}
+    assert weekly_total_duration(stream()) == 2400
+    assert [s.total for s in iter_day_summaries(logs[:2])] == [25, 35]
+
+    consumed = []
+    source = (consumed.append(log) or log for log in reversed(logs))
+    current, previous = split_weeks(source, gaps=GAP_SKIP)
+    assert [log["date"] for log in current] == [log["date"] for log in logs[-1:-8:-1]]
+    assert len(previous) == 7
+    # Up to the first log older than the two weeks
+    assert len(consumed) == 15
+
+
+def test_split_weeks_handles_gaps_duplicates_and_order():
+    def log(day):
+        return {"date": f"2024-06-{day:02d}", "activities": []}
+
+    logs = [log(d) for d in (1, 3, 3, 10, 12, 20)]
+
+    current, previous = split_weeks(list(reversed(logs)), gaps=GAP_SKIP)
+    assert [item["date"] for item in current] == [
+        "2024-06-20", "2024-06-12", "2024-06-10", "2024-06-03", "2024-06-03", "2024-06-01",
+    ]
+    assert previous == []
+
+    # Unsorted input is sorted first
+    assert split_weeks(logs, gaps=GAP_SKIP) == (current, previous)
+
+    current, previous = split_weeks(reversed(logs), gaps=GAP_ZERO_FILL)
+    assert [item["date"] for item in current] == ["2024-06-20"]
+    assert [item["date"] for item in previous] == ["2024-06-12", "2024-06-10"]
+
+    # The previous calendar week would start before the oldest date
+    current, previous = split_weeks(reversed(logs[3:]), gaps=GAP_ZERO_FILL)
+    assert [item["date"] for item in current] == ["2024-06-20"]
+    assert previous == []
+
+    current, previous = split_weeks(reversed(logs), gaps=GAP_INSUFFICIENT)
+    assert current == [] and previous == []
+
+
+def test_split_weeks_keeps_every_log_of_the_boundary_date():
+    def log(day, minutes):
+        return {"date": f"2024-06-{day:02d}", "activities": [{"category": "Work", "duration_minutes": minutes}]}
+
+    # Days 1..15, with the oldest day of the previous week (day 2) and an
+    # older day (day 1) logged twice
+    logs = [log(d, 10 * d) for d in range(1, 16)] + [log(2, 5), log(1, 7)]
+    newest_first = sorted(logs, key=lambda item: item["date"], reverse=True)
+
+    consumed = []
+    source = (consumed.append(item) or item for item in newest_first)
+    current, previous = split_weeks(source, gaps=GAP_SKIP)
+
+    assert [item["date"] for item in current] == [f"2024-06-{d:02d}" for d in range(15, 8, -1)]
+    assert [item["activities"][0]["duration_minutes"] for item in previous] == [
+        80, 70, 60, 50, 40, 30, 20, 5,
+    ]
+    assert split_weeks(newest_first, gaps=GAP_SKIP) == split_weeks(logs, gaps=GAP_SKIP)
+    # Reading stops at the first log of day 1
+    assert len(consumed) == 16
+
+    for gaps in (GAP_ZERO_FILL, GAP_INSUFFICIENT):
+        assert split_weeks(iter(newest_first), gaps=gaps) == split_weeks(logs, gaps=gaps)
+
+
+def test_analyze_logs_matches_analyze_user(tmp_path):
+    user = _user_with_logs()
+    store = Store(tmp_path)
+    store.save_user(user)
+
+    analysis = analyze_user(user)
+    assert analyze_logs(store.iter_day_logs(user.get_user_id())) == analysis
+    # Results stay plain data; reusable aggregates go through analyze_aggregates
+    assert json.loads(json.dumps(analysis)) == analysis
@@ -0,0 +1,202 @@
+"""
+Responsibility:
+Tests rolling-origin backtesting and the parallel backtest runner.
+"""
+import os
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from analytics.windows import GAP_INSUFFICIENT, GAP_ZERO_FILL
+from core.activity import Activity
+from core.store import Store
+from core.user import User
+from ml.backtest import BACKTEST_METHODS, BacktestResults, backtest_series, backtest_user
+from ml.train import build_sliding_weekly_training_data, build_weekly_training_data
+from ml.train_weekly_model import train_weekly_model
+from pipelines.run_backtest import run_backtest
+
+
+def _user(user_id: str = "backtest_user", days: int = 45) -> User:
+    user = User(user_id)
+    start = datetime(2026, 1, 1, 9, 0)
+    for day in range(days):
+        user.log_activity(
+            Activity(
+                name="Coding",
+                category=("Work", "Study", "Health")[day % 3],
+                duration_minutes=30 + (day * 53) % 97,
+                timestamp=start + timedelta(days=day),
+            )
+        )
+    return user
+
+
+def _first_days(user: User, n: int) -> User:
+    truncated = User(user.get_user_id())
+    for day_log in user.get_all_logs()[:n]:
+        truncated.add_activity_log(day_log)
+    return truncated
+
+
+def test_baselines_over_every_cutoff():
+    totals = np.arange(1, 41, dtype=float)
+    cutoffs, y_true, y_pred = backtest_series(
+        totals, totals[:, None], season_weeks=2, average_weeks=3
+    )
+
+    assert cutoffs.tolist() == list(range(7, 34))
+    for c, actual, (previous, seasonal, average, _) in zip(cutoffs, y_true, y_pred):
+        assert actual == totals[c:c + 7].sum()
+        assert previous == totals[c - 7:c].sum()
+        if c >= 14:
+            assert seasonal == totals[c - 14:c - 7].sum()
+        else:
+            assert np.isnan(seasonal)
+        if c >= 21:
+            assert average == pytest.approx(totals[c - 21:c].sum() / 3)
+        else:
+            assert np.isnan(average)
+
+    with pytest.raises(ValueError):
+        backtest_series(totals, totals[:, None], cutoffs=np.array([3]))
+
+
+def test_linear_model_matches_the_pipeline_at_each_cutoff():
+    user = _user()
+    results = backtest_user(user)
+    linear = results.y_pred[:, BACKTEST_METHODS.index("linear_model")]
+
+    for i, cutoff in enumerate(range(7, 45 - 6)):
+        history = _first_days(user, cutoff)
+        try:
+            model, _ = train_weekly_model(
+                None, training_data=build_sliding_weekly_training_data(history)
+            )
+        except ValueError:
+            assert np.isnan(linear[i])
+            continue
+        X, _ = build_weekly_training_data(history)
+        assert linear[i] == pytest.approx(model.predict(X)[0], rel=1e-9)
+
+    assert not np.isnan(linear[-1])
+
+
+def _gappy_user(days: int = 45, missing=(3, 10, 11, 25)) -> User:
+    user = User("gappy")
+    for day_log in _user(days=days).get_all_logs():
+        if (day_log.get_date() - date(2026, 1, 1)).days not in missing:
+            user.add_activity_log(day_log)
+    return user
+
+
+def test_backtest_follows_the_gap_policy():
+    user = _gappy_user()
+    day_totals = {log.get_date(): log.total_duration() for log in user.get_all_logs()}
+    start = date(2026, 1, 1)
+
+    def week_total(first: date) -> float:
+        return sum(day_totals.get(first + timedelta(days=k), 0) for k in range(7))
+
+    results = backtest_user(user, gaps=GAP_ZERO_FILL)
+    cutoffs = [date.fromordinal(c) for c in results.cutoff.tolist()]
+    linear = results.y_pred[:, BACKTEST_METHODS.index("linear_model")]
+
+    # Every calendar day with a week before and after it is a cutoff
+    assert cutoffs == [start + timedelta(days=d) for d in range(7, 45 - 6)]
+    assert results.y_true.tolist() == [week_total(c) for c in cutoffs]
+    assert results.y_pred[:, 0].tolist() == [week_total(c - timedelta(days=7)) for c in cutoffs]
+
+    # Where the day before the cutoff has data, the report would predict
+    # from the same calendar week with a model trained on the same windows
+    for i, cutoff in enumerate(cutoffs):
+        history = User("gappy")
+        for log in user.get_all_logs():
+            if log.get_date() < cutoff:
+                history.add_activity_log(log)
+        if cutoff - timedelta(days=1) not in day_totals:
+            continue
+        try:
+            model, _ = train_weekly_model(
+                None,
+                training_data=build_sliding_weekly_training_data(history, gaps=GAP_ZERO_FILL),
+            )
+        except ValueError:
+            assert np.isnan(linear[i])
+            continue
+        X, _ = build_weekly_training_data(history, gaps=GAP_ZERO_FILL)
+        assert linear[i] == pytest.approx(model.predict(X)[0], rel=1e-9)
+
+    # "insufficient" keeps the folds whose forecast week has no missing day
+    strict = backtest_user(user, gaps=GAP_INSUFFICIENT)
+    kept = [date.fromordinal(c) for c in strict.cutoff.tolist()]
+    assert kept == [
+        c for c in cutoffs
+        if all(c + timedelta(days=k) in day_totals for k in range(7))
+    ]
+    previous = strict.y_pred[:, 0]
+    for c, value in zip(kept, previous):
+        complete = all(c - timedelta(days=k) in day_totals for k in range(1, 8))
+        assert np.isnan(value) != complete
+
+
+def test_split_cutoffs_merge_into_the_full_backtest():
+    user = _user()
+    full = backtest_user(user)
+    merged = BacktestResults.concat([backtest_user(user, split=k, n_splits=3) for k in range(3)])
+
+    assert np.array_equal(merged.cutoff, full.cutoff)
+    assert np.array_equal(merged.y_pred, full.y_pred, equal_nan=True)
+
+    summary = full.summary()
+    assert set(summary) == set(BACKTEST_METHODS)
+    assert all(stats["folds"] == summary["linear_model"]["folds"] for stats in summary.values())
+    assert full.to_rows()[0]["cutoff"] == "2026-01-08"
+
+    per_user = full.user_metrics()
+    assert per_user["previous_week"]["mae"][0] == pytest.approx(summary["previous_week"]["mae"])
+
+
+def test_run_backtest_in_parallel(tmp_path):
+    store = Store(tmp_path, compaction_threshold_bytes=None)
+    for user_id, days in (("a", 45), ("b", 30)):
+        store.save_user(_user(user_id, days))
+
+    results, failures = run_backtest(
+        ["a", "b", "missing"], data_dir=tmp_path, max_workers=2, cutoff_splits=2
+    )
+
+    assert failures == {}
+    assert results.user_ids[:2] == ["a", "b"]
+    assert len(results.for_user("a")) == 45 - 13
+    assert len(results.for_user("missing")) == 0
+
+    serial = backtest_user(store.load_user("b"))
+    assert np.array_equal(results.for_user("b").y_pred, serial.y_pred, equal_nan=True)
+
+
+def _crashing_backtest(user: User, **options) -> BacktestResults:
+    if user.get_user_id() == "crash":
+        os._exit(1)  # the worker process dies, breaking the pool
+    return backtest_user(user, **options)
+
+
+def test_run_backtest_survives_a_dead_worker_process(tmp_path):
+    store = Store(tmp_path, compaction_threshold_bytes=None)
+    for user_id in ("crash", "a", "b", "c", "d"):
+        store.save_user(_user(user_id, 30))
+
+    results, failures = run_backtest(
+        ["crash", "a", "b", "c", "d"],
+        data_dir=tmp_path,
+        max_workers=1,
+        cutoff_splits=1,
+        backtest_fn=_crashing_backtest,
+    )
+
+    assert failures["crash"].startswith("BrokenProcessPool")
+    # Tasks in flight with the dead worker fail too (at most 2 * workers)
+    assert len(failures) <= 2
+    assert set(results.user_ids) == {"a", "b", "c", "d"} - set(failures)
+    assert len(results.for_user("d")) == 30 - 13
@@ -0,0 +1,84 @@
+"""
+Responsibility:
+Tests the multi-user weekly intelligence batch runner.
+"""
+import json
+import os
+import time
+from datetime import datetime
+
+from core.activity import Activity
+from core.store import Store
+from core.user import User
+from pipelines.run_weekly_batch import iter_user_ids, run_weekly_intelligence_batch
+
+
+def _fake_report(user_id: str) -> dict:
+    if user_id.startswith("bad"):
+        raise RuntimeError(f"cannot process {user_id}")
+    return {"status": {"state": "ok"}, "user": user_id}
+
+
+def test_batch_streams_results_and_isolates_failures(tmp_path):
+    output = tmp_path / "out.jsonl"
+    user_ids = (f"user_{i}" if i % 7 else f"bad_{i}" for i in range(50))
+
+    summary = run_weekly_intelligence_batch(
+        output_path=output,
+        user_ids=user_ids,
+        max_workers=2,
+        chunk_size=4,
+        report_fn=_fake_report,
+    )
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+
+    assert summary["users"] == 50
+    assert summary["failed"] == 8
+    assert summary["states"] == {"ok": 42}
+    assert sorted(r["user_id"] for r in lines) == sorted(
+        f"user_{i}" if i % 7 else f"bad_{i}" for i in range(50)
+    )
+    failed = [r for r in lines if "error" in r]
+    assert all(r["error"]["type"] == "RuntimeError" for r in failed)
+
+
+def _crashing_report(user_id: str) -> dict:
+    if user_id == "user_0":
+        os._exit(1)  # the worker process dies, breaking the pool
+    time.sleep(0.01)
+    return {"status": {"state": "ok"}, "user": user_id}
+
+
+def test_batch_survives_a_dead_worker_process(tmp_path):
+    output = tmp_path / "out.jsonl"
+
+    summary = run_weekly_intelligence_batch(
+        output_path=output,
+        user_ids=(f"user_{i}" for i in range(40)),
+        max_workers=2,
+        chunk_size=4,
+        report_fn=_crashing_report,
+    )
+
+    lines = {r["user_id"]: r for r in map(json.loads, output.read_text().splitlines())}
+
+    assert summary["users"] == 40
+    assert sorted(lines) == sorted(f"user_{i}" for i in range(40))
+    assert lines["user_0"]["error"]["type"] == "BrokenProcessPool"
+    # Only chunks in flight when the worker died are lost (at most 2 * workers)
+    assert 1 <= summary["failed"] <= 4 * 4
+    assert summary["states"] == {"ok": 40 - summary["failed"]}
+    assert lines["user_39"]["report"]["status"]["state"] == "ok"
+
+
+def test_iter_user_ids_finds_snapshots_and_journals(tmp_path):
+    store = Store(tmp_path, compaction_threshold_bytes=None)
+    activity = Activity("Coding", "Work", 30, datetime(2026, 1, 6, 9, 0))
+
+    user = User("saved")
+    user.log_activity(activity)
+    store.save_user(user)
+    store.log_activity("journaled", activity)
+
+    assert sorted(iter_user_ids(tmp_path)) == ["journaled", "saved"]
@@ -0,0 +1,75 @@
+"""
+Responsibility:
+Tests the per-user calendar index.
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from analytics.calendar_index import CalendarIndex, parse_ordinals
+
+
+def test_calendar_index_sorts_days_and_marks_gaps():
+    calendar = CalendarIndex.from_daily_totals(
+        {"2024-06-05": 50, "2024-06-01": 10, "2024-06-02": 20}
+    )
+
+    assert calendar.dates == ["2024-06-01", "2024-06-02", "2024-06-05"]
+    assert calendar.ordinals.tolist() == [
+        date(2024, 6, d).toordinal() for d in (1, 2, 5)
+    ]
+    assert calendar.dense.tolist() == [10.0, 20.0, 0.0, 0.0, 50.0]
+    assert calendar.present.tolist() == [True, True, False, False, True]
+    assert calendar.dense_dates(1, 4) == ["2024-06-02", "2024-06-03", "2024-06-04"]
+
+
+def test_calendar_windows_count_active_or_calendar_days():
+    calendar = CalendarIndex.from_daily_totals(
+        {f"2024-06-{d:02d}": d for d in (1, 2, 3, 8, 9, 10)}
+    )
+
+    current, previous = calendar.recent_windows(3, count=2)
+    assert current == ["2024-06-08", "2024-06-09", "2024-06-10"]
+    assert previous == ["2024-06-01", "2024-06-02", "2024-06-03"]
+
+    # Calendar windows: the second one would start before the first day
+    current, previous = calendar.recent_windows(7, count=2, gaps="zero_fill")
+    assert current == [f"2024-06-{d:02d}" for d in range(4, 11)]
+    assert previous is None
+    assert calendar.recent_windows(3, count=2, gaps="insufficient") == [
+        ["2024-06-08", "2024-06-09", "2024-06-10"], None,
+    ]
+
+    totals, usable = calendar.block_totals(3)
+    assert totals.tolist() == [6.0, 27.0] and usable.all()
+    totals, usable = calendar.block_totals(3, gaps="zero_fill")
+    assert totals.tolist() == [6.0, 0.0, 17.0] and usable.all()
+    totals, usable = calendar.block_totals(3, gaps="insufficient")
+    assert usable.tolist() == [True, False, False]
+
+    with pytest.raises(ValueError):
+        calendar.block_totals(3, gaps="fill")
+
+
+def test_iso_week_totals_follow_monday_boundaries():
+    # 2024-06-01 is a Saturday; 2024-06-03 and 2024-06-10 are Mondays
+    calendar = CalendarIndex.from_daily_totals(
+        {"2024-06-01": 10, "2024-06-02": 20, "2024-06-04": 30, "2024-06-11": 40}
+    )
+
+    starts, totals, days_with_data = calendar.iso_week_totals()
+
+    assert [date.fromordinal(s).isoformat() for s in starts.tolist()] == [
+        "2024-05-27", "2024-06-03", "2024-06-10",
+    ]
+    assert totals.tolist() == [30.0, 30.0, 40.0]
+    assert days_with_data.tolist() == [2, 1, 1]
+    assert all(date.fromordinal(s).weekday() == 0 for s in starts.tolist())
+
+
+def test_calendar_index_rejects_unsorted_dates():
+    with pytest.raises(ValueError):
+        CalendarIndex(["2024-06-02", "2024-06-01"], np.array([1.0, 2.0]))
+    assert parse_ordinals([]).shape == (0,)
@@ -0,0 +1,122 @@
+"""
+Responsibility:
+Tests the columnar activity store and its domain-object views.
+"""
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from core.activity import Activity
+from core.columnar import ActivityTable, ColumnarUser
+from core.day_log import DayLog
+from core.user import User
+from pipelines.analyze import analyze_user
+
+
+def _make_user(user_cls=User) -> User:
+    user = user_cls("columnar_user")
+    start = datetime(2026, 1, 5, 9, 0)
+
+    for i in range(10):
+        day = start + timedelta(days=i)
+        user.log_activity(
+            Activity(
+                name="Coding",
+                category="Work",
+                duration_minutes=60 + i,
+                timestamp=day.replace(hour=14),
+                mood=4,
+            )
+        )
+        user.log_activity(
+            Activity(
+                name="Walking",
+                category="Health",
+                duration_minutes=30,
+                timestamp=day,
+            )
+        )
+        if i % 3 == 0:
+            user.log_activity(
+                Activity(
+                    name="Chess",
+                    category="Hobby",
+                    duration_minutes=45,
+                    timestamp=day.replace(hour=20),
+                    mood=2,
+                )
+            )
+
+    user.add_activity_log(DayLog(date(2026, 1, 20)))
+    return user
+
+
+def _as_tuples(user: User):
+    return [
+        (
+            log.get_date(),
+            [
+                (
+                    a.get_name(),
+                    a.get_category(),
+                    a.get_duration_minutes(),
+                    a.get_timestamp(),
+                    a.get_mood(),
+                )
+                for a in log.get_activities()
+            ],
+        )
+        for log in sorted(user.get_all_logs(), key=lambda log: log.get_date())
+    ]
+
+
+def test_table_round_trips_domain_objects():
+    user = _make_user()
+    columnar = ColumnarUser(user.get_user_id(), ActivityTable.from_user(user))
+
+    assert _as_tuples(columnar) == _as_tuples(user)
+
+
+def test_columnar_user_accepts_incremental_logging():
+    assert _as_tuples(_make_user(ColumnarUser)) == _as_tuples(_make_user())
+
+
+def test_columnar_user_rejects_duplicate_daylog():
+    user = _make_user(ColumnarUser)
+
+    with pytest.raises(ValueError):
+        user.add_activity_log(DayLog(date(2026, 1, 5)))
+
+
+def test_aware_timestamps_are_preserved():
+    ts = datetime(2026, 1, 6, 23, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+    user = ColumnarUser("aware")
+    user.log_activity(Activity("Yoga", "Health", 20, ts))
+
+    restored = user.get_day_log(date(2026, 1, 6)).get_activities()[0]
+    assert restored.get_timestamp() == ts
+    assert restored.get_timestamp().utcoffset() == ts.utcoffset()
+
+
+def test_slice_days_is_a_view():
+    table = ActivityTable.from_user(_make_user())
+    window = table.slice_days(date(2026, 1, 7).toordinal(), date(2026, 1, 9).toordinal())
+
+    assert window.days.tolist() == [
+        date(2026, 1, d).toordinal() for d in (7, 8, 9)
+    ]
+    assert window.duration.base is not None
+
+
+def test_vectorized_analysis_matches_object_path():
+    user = _make_user()
+    columnar = ColumnarUser(user.get_user_id(), ActivityTable.from_user(user))
+
+    expected = analyze_user(user)
+    actual = analyze_user(columnar)
+
+    assert actual["daily_totals"] == expected["daily_totals"]
+    assert actual["daily_categories"] == expected["daily_categories"]
+    assert actual["category_totals"] == expected["category_totals"]
+    assert actual["daily_average"] == pytest.approx(expected["daily_average"])
+    assert actual["variability"] == pytest.approx(expected["variability"])
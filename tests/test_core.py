@@ -48,6 +48,46 @@ def test_activity_invalid_mood():
         )
 
 
+def test_activity_has_no_instance_dict():
+    activity = Activity("Coding", "Work", 30, datetime(2026, 1, 6, 10, 0))
+
+    assert not hasattr(activity, "__dict__")
+
+
+def test_activity_strings_are_interned():
+    name = "".join(["Cod", "ing"])
+    category = "".join(["Wo", "rk"])
+
+    first = Activity(name, category, 30, datetime(2026, 1, 6, 10, 0))
+    second = Activity.from_trusted(
+        "".join(["Cod", "ing"]), "Work", 45, datetime(2026, 1, 6, 11, 0)
+    )
+
+    assert first.get_name() is second.get_name()
+    assert first.get_category() is second.get_category()
+
+
+def test_trusted_activity_matches_validated_activity():
+    fields = ("Reading", "Study", 25, datetime(2026, 1, 6, 8, 0), 3)
+
+    validated = Activity(*fields)
+    trusted = Activity.from_trusted(*fields)
+
+    assert (
+        trusted.get_name(),
+        trusted.get_category(),
+        trusted.get_duration_minutes(),
+        trusted.get_timestamp(),
+        trusted.get_mood(),
+    ) == (
+        validated.get_name(),
+        validated.get_category(),
+        validated.get_duration_minutes(),
+        validated.get_timestamp(),
+        validated.get_mood(),
+    )
+
+
 # -------------------------
 # DayLog invariants
 # -------------------------
@@ -144,3 +184,61 @@ def test_user_routes_activity_to_correct_daylog():
 
     assert day_log is not None
     assert day_log.total_duration() == 40
+
+
+def _at(hour: int, minute: int = 0, name: str = "Coding") -> Activity:
+    return Activity(
+        name=name,
+        category="Work",
+        duration_minutes=10,
+        timestamp=datetime(2026, 1, 6, hour, minute),
+    )
+
+
+def test_daylog_keeps_activities_ordered_on_out_of_order_insert():
+    day_log = DayLog(date(2026, 1, 6))
+
+    for hour in (9, 7, 12, 8, 12):
+        day_log.add_activity(_at(hour))
+
+    hours = [a.get_timestamp().hour for a in day_log.get_activities()]
+    assert hours == [7, 8, 9, 12, 12]
+
+
+def test_daylog_ties_keep_insertion_order():
+    day_log = DayLog(date(2026, 1, 6))
+
+    day_log.add_activity(_at(10, name="Emails"))
+    day_log.add_activity(_at(9))
+    day_log.add_activity(_at(10, name="Meetings"))
+
+    names = [a.get_name() for a in day_log.get_activities()]
+    assert names == ["Coding", "Emails", "Meetings"]
+
+
+def test_daylog_extend_matches_sequential_adds():
+    activities = [_at(h, m) for h, m in [(9, 0), (7, 30), (9, 0), (6, 15)]]
+
+    sequential = DayLog(date(2026, 1, 6))
+    for activity in activities:
+        sequential.add_activity(activity)
+
+    bulk = DayLog(date(2026, 1, 6))
+    bulk.extend(activities)
+
+    assert bulk.get_activities() == sequential.get_activities()
+
+
+def test_daylog_extend_is_all_or_nothing():
+    day_log = DayLog(date(2026, 1, 6))
+    foreign = Activity(
+        name="Workout",
+        category="Health",
+        duration_minutes=30,
+        timestamp=datetime(2026, 1, 7, 7, 0),
+    )
+
+    with pytest.raises(ValueError):
+        day_log.extend([_at(8), foreign])
+
+    assert day_log.get_activities() == []
@@ -0,0 +1,112 @@
+"""
+Responsibility:
+Tests the vectorized, grouped and streaming regression metrics.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from ml import evaluate
+from ml.metrics import (
+    MetricAccumulator,
+    grouped_metrics,
+    mean_absolute_error,
+    mean_absolute_percentage_error,
+    quantile_loss,
+    root_mean_squared_error,
+    symmetric_mean_absolute_percentage_error,
+)
+
+
+Y_TRUE = [100.0, 0.0, 250.0, 40.0, 75.0]
+Y_PRED = [90.0, 10.0, 300.0, 40.0, 0.0]
+
+
+def test_metrics_match_reference_definitions():
+    pairs = list(zip(Y_TRUE, Y_PRED))
+
+    assert mean_absolute_error(Y_TRUE, Y_PRED) == pytest.approx(
+        sum(abs(t - p) for t, p in pairs) / 5
+    )
+    assert root_mean_squared_error(Y_TRUE, Y_PRED) == pytest.approx(
+        math.sqrt(sum((t - p) ** 2 for t, p in pairs) / 5)
+    )
+    assert mean_absolute_percentage_error(Y_TRUE, Y_PRED) == pytest.approx(
+        sum(abs(t - p) / t for t, p in pairs if t) / 4
+    )
+    assert symmetric_mean_absolute_percentage_error(Y_TRUE, Y_PRED) == pytest.approx(
+        sum(2 * abs(t - p) / (abs(t) + abs(p)) for t, p in pairs) / 5
+    )
+    assert quantile_loss(Y_TRUE, Y_PRED, 0.9) == pytest.approx(
+        sum(max(0.9 * (t - p), -0.1 * (t - p)) for t, p in pairs) / 5
+    )
+    assert quantile_loss(Y_TRUE, Y_PRED, 0.5) == pytest.approx(mean_absolute_error(Y_TRUE, Y_PRED) / 2)
+    assert evaluate.root_mean_squared_error is root_mean_squared_error
+
+
+def test_empty_and_mismatched_inputs():
+    assert mean_absolute_error([], []) == 0.0
+    assert root_mean_squared_error(np.empty(0), np.empty(0)) == 0.0
+    assert math.isnan(mean_absolute_percentage_error([0.0, 0.0], [1.0, 2.0]))
+
+    with pytest.raises(ValueError):
+        mean_absolute_error([1.0, 2.0], [1.0])
+    with pytest.raises(ValueError):
+        quantile_loss([1.0], [1.0], quantile=1.0)
+
+
+def test_batched_metrics_with_mask():
+    y_true = np.array([[1.0, 2.0, 3.0], [4.0, 5.0, np.nan], [0.0, 0.0, 0.0]])
+    y_pred = np.zeros((3, 3))
+    mask = np.array([[True, True, True], [True, True, False], [False, False, False]])
+
+    mae = mean_absolute_error(y_true, y_pred, axis=1, mask=mask)
+    assert mae[:2].tolist() == [2.0, 4.5]
+    assert math.isnan(mae[2])
+
+    rmse = root_mean_squared_error(y_true[:2, :2], y_pred[:2, :2], axis=0)
+    assert rmse == pytest.approx([math.sqrt(8.5), math.sqrt(14.5)])
+
+
+def test_grouped_metrics_match_per_group_calls():
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 500, size=200).astype(float)
+    y_pred = y_true + rng.normal(scale=50, size=200)
+    groups = rng.integers(0, 6, size=200)
+
+    grouped = grouped_metrics(y_true, y_pred, groups, n_groups=7, quantiles=(0.1,))
+
+    for g in range(6):
+        sel = groups == g
+        assert grouped["count"][g] == sel.sum()
+        assert grouped["mae"][g] == pytest.approx(mean_absolute_error(y_true[sel], y_pred[sel]))
+        assert grouped["rmse"][g] == pytest.approx(root_mean_squared_error(y_true[sel], y_pred[sel]))
+        assert grouped["mape"][g] == pytest.approx(mean_absolute_percentage_error(y_true[sel], y_pred[sel]))
+        assert grouped["smape"][g] == pytest.approx(
+            symmetric_mean_absolute_percentage_error(y_true[sel], y_pred[sel])
+        )
+        assert grouped["quantile_0.1"][g] == pytest.approx(quantile_loss(y_true[sel], y_pred[sel], 0.1))
+    assert grouped["count"][6] == 0 and math.isnan(grouped["mae"][6])
+
+
+def test_accumulator_matches_full_evaluation():
+    rng = np.random.default_rng(1)
+    y_true = rng.integers(1, 500, size=1000).astype(float)
+    y_pred = y_true + rng.normal(scale=30, size=1000)
+
+    first, second = MetricAccumulator(quantiles=(0.9,)), MetricAccumulator(quantiles=(0.9,))
+    assert math.isnan(first.result()["mae"])
+    for start in range(0, 600, 128):
+        first.update(y_true[start:min(start + 128, 600)], y_pred[start:min(start + 128, 600)])
+    second.update(y_true[600:], y_pred[600:])
+    first.merge(second)
+
+    result = first.result()
+    assert len(first) == 1000
+    assert result["mae"] == pytest.approx(mean_absolute_error(y_true, y_pred))
+    assert result["rmse"] == pytest.approx(root_mean_squared_error(y_true, y_pred))
+    assert result["quantile_0.9"] == pytest.approx(quantile_loss(y_true, y_pred, 0.9))
+
+    with pytest.raises(ValueError):
+        first.merge(MetricAccumulator())
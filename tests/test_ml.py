@@ -2,3 +2,275 @@
 Responsibility:
 Tests machine learning feature extraction and models.
 """
+
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from analytics.aggregations import aggregate_logs
+from ml.batch_regression import BATCH_SOLVERS, fit_batched_least_squares, stack_training_data
+from ml.feature_registry import FeatureRegistry
+from ml.features import DAILY_FEATURE_NAMES, build_feature_matrix, daily_feature_array
+from ml.models import SOLVERS, LinearRegressionModel, OnlineLinearRegressionModel
+from ml.weekly_features import WEEKLY_FEATURE_NAMES, WEEKLY_FEATURES, weekly_feature_matrix
+
+
+def _regression_problem(n_samples=200, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_samples, 3)) * [1.0, 10.0, 100.0]
+    y = 5.0 + X @ np.array([2.0, -0.5, 0.03]) + 0.01 * rng.normal(size=n_samples)
+    return X, y
+
+
+@pytest.mark.parametrize("solver", SOLVERS)
+def test_solvers_agree_on_well_conditioned_data(solver):
+    X, y = _regression_problem()
+    reference = LinearRegressionModel(["a", "b", "c"], solver="lstsq")
+    reference.fit(X, y)
+
+    model = LinearRegressionModel(["a", "b", "c"], solver=solver)
+    model.fit(X, y)
+
+    assert model.intercept() == pytest.approx(reference.intercept(), rel=1e-8)
+    for name, value in reference.coefficients().items():
+        assert model.coefficients()[name] == pytest.approx(value, rel=1e-8)
+
+
+def test_dict_and_array_inputs_are_equivalent():
+    X, y = _regression_problem(50)
+    rows = [dict(zip(["a", "b", "c"], row)) for row in X.tolist()]
+
+    from_dicts = LinearRegressionModel(["a", "b", "c"])
+    from_dicts.fit(rows, y.tolist())
+    from_array = LinearRegressionModel(["a", "b", "c"])
+    from_array.fit(X, y)
+
+    assert from_dicts.coefficients() == from_array.coefficients()
+    assert from_dicts.predict(rows[:5]) == from_array.predict(X[:5])
+
+    with pytest.raises(ValueError):
+        from_array.predict(X[:, :2])
+
+
+@pytest.mark.parametrize("solver", SOLVERS)
+def test_rank_deficient_design_is_solved_by_every_solver(solver):
+    X, y = _regression_problem(30)
+    X = np.column_stack([X, X[:, 0]])  # duplicated column
+
+    model = LinearRegressionModel(["a", "b", "c", "d"], solver=solver)
+    model.fit(X, y)
+
+    assert np.allclose(model.predict(X), y, atol=0.1)
+
+
+def test_qr_solver_does_not_fall_back_on_full_rank_design(monkeypatch):
+    X, y = _regression_problem()
+
+    def no_fallback(self, X_design, y_vec):
+        raise AssertionError("qr fell back to lstsq")
+
+    monkeypatch.setattr(LinearRegressionModel, "_solve_lstsq", no_fallback)
+    model = LinearRegressionModel(["a", "b", "c"], solver="qr")
+    model.fit(X, y)
+
+    assert model.intercept() == pytest.approx(5.0, abs=0.01)
+
+
+@pytest.mark.parametrize("solver", SOLVERS)
+def test_ridge_shrinks_coefficients_but_not_intercept(solver):
+    X, y = _regression_problem()
+    y = y + 1000.0
+
+    plain = LinearRegressionModel(["a", "b", "c"], solver=solver)
+    plain.fit(X, y)
+    ridge = LinearRegressionModel(["a", "b", "c"], solver=solver, alpha=1e4)
+    ridge.fit(X, y)
+
+    assert abs(ridge.coefficients()["a"]) < abs(plain.coefficients()["a"])
+    assert ridge.intercept() == pytest.approx(np.mean(y), rel=0.05)
+
+
+def test_float32_fit_and_option_validation():
+    X, y = _regression_problem()
+    model = LinearRegressionModel(["a", "b", "c"], solver="cholesky", dtype=np.float32)
+    model.fit(X, y)
+    assert model.coefficients()["a"] == pytest.approx(2.0, rel=1e-3)
+
+    with pytest.raises(ValueError):
+        LinearRegressionModel(["a"], solver="svd")
+    with pytest.raises(ValueError):
+        LinearRegressionModel(["a"], alpha=-1.0)
+    with pytest.raises(ValueError):
+        LinearRegressionModel(["a"], dtype=np.int64)
+    with pytest.raises(ValueError):
+        model.fit(np.empty((0, 3)), np.empty(0))
+
+
+def test_online_model_matches_batch_least_squares():
+    X, y = _regression_problem()
+    batch = LinearRegressionModel(["a", "b", "c"])
+    batch.fit(X, y)
+
+    online = OnlineLinearRegressionModel(["a", "b", "c"])
+    for i in range(0, len(X), 7):
+        online.partial_fit(X[i:i + 7], y[i:i + 7])
+
+    assert online.n_samples == len(X)
+    assert online.intercept() == pytest.approx(batch.intercept(), rel=1e-6)
+    for name, value in batch.coefficients().items():
+        assert online.coefficients()[name] == pytest.approx(value, rel=1e-6)
+
+    refit = OnlineLinearRegressionModel(["a", "b", "c"])
+    refit.fit(X, y)
+    assert refit.predict(X[:3]) == pytest.approx(online.predict(X[:3]))
+
+
+def test_online_forgetting_tracks_a_changed_relationship():
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=(400, 1))
+    y = np.where(np.arange(400) < 200, 3.0, -1.0) * x[:, 0]
+
+    steady = OnlineLinearRegressionModel(["x"])
+    forgetful = OnlineLinearRegressionModel(["x"], forgetting_factor=0.9)
+    steady.partial_fit(x, y)
+    forgetful.partial_fit(x, y)
+
+    assert forgetful.coefficients()["x"] == pytest.approx(-1.0, abs=1e-3)
+    assert steady.coefficients()["x"] == pytest.approx(1.0, abs=0.5)
+
+    with pytest.raises(RuntimeError):
+        OnlineLinearRegressionModel(["x"]).predict(x)
+    with pytest.raises(ValueError):
+        OnlineLinearRegressionModel(["x"], forgetting_factor=0.0)
+
+
+@pytest.mark.parametrize("solver", BATCH_SOLVERS)
+@pytest.mark.parametrize("alpha", [0.0, 10.0])
+def test_batched_fit_matches_per_user_models(solver, alpha):
+    datasets = [_regression_problem(n, seed=n) for n in (40, 12, 3, 0, 25)]
+    # Duplicated column: rank deficient
+    X_dup = datasets[1][0]
+    datasets[1] = (np.column_stack([X_dup[:, :2], X_dup[:, 0]]), datasets[1][1])
+
+    X, y, mask = stack_training_data(datasets)
+    table = fit_batched_least_squares(
+        X, y, mask, user_ids=list("abcde"), feature_names=["a", "b", "c"],
+        solver=solver, alpha=alpha,
+    )
+
+    assert table.n_samples.tolist() == [40, 12, 3, 0, 25]
+    assert np.isnan(table.intercept("d"))
+    for user_id, (X_user, y_user) in zip("abcde", datasets):
+        if len(y_user) == 0:
+            continue
+        model = LinearRegressionModel(["a", "b", "c"], alpha=alpha)
+        model.fit(X_user, y_user)
+        assert table.intercept(user_id) == pytest.approx(model.intercept(), abs=1e-6)
+        assert table.coefficients(user_id) == pytest.approx(model.coefficients(), abs=1e-6)
+
+
+def test_coefficient_table_lookup_and_stacking_limits():
+    datasets = [_regression_problem(30, seed=0), _regression_problem(10, seed=1)]
+    X, y, mask = stack_training_data(datasets, max_samples=20)
+
+    assert X.shape == (2, 20, 3)
+    assert np.array_equal(X[0], datasets[0][0][-20:])
+    assert mask.sum(axis=1).tolist() == [20, 10]
+
+    table = fit_batched_least_squares(X, y, mask, user_ids=["u1", "u2"])
+    assert "u1" in table and "u3" not in table
+    assert table.predict(X[:, 0]).shape == (2,)
+    assert [row["n_samples"] for row in table.to_rows()] == [20, 10]
+
+    with pytest.raises(KeyError):
+        table.coefficients("u3")
+    with pytest.raises(ValueError):
+        stack_training_data([datasets[0], (np.zeros((5, 2)), np.zeros(5))])
+    with pytest.raises(ValueError):
+        fit_batched_least_squares(X, y, solver="pinv")
+
+
+def _random_logs(n_days, seed=0):
+    rng = random.Random(seed)
+    start = date(2015, 1, 1)
+    logs = []
+    for offset in range(n_days):
+        if rng.random() < 0.2:
+            continue  # gaps in the history
+        activities = [
+            {
+                "category": rng.choice(["Work", "Study", "Health", "Leisure", "Other"]),
+                "duration_minutes": rng.randint(5, 240),
+            }
+            for _ in range(rng.randint(0, 5))
+        ]
+        logs.append({"date": (start + timedelta(days=offset)).isoformat(), "activities": activities})
+    return logs
+
+
+@pytest.mark.parametrize("n_days", [0, 1, 2, 5, 400])
+def test_daily_feature_array_matches_feature_dicts(n_days):
+    logs = _random_logs(n_days)
+    rows, targets = build_feature_matrix(logs)
+
+    X, y, names = daily_feature_array(aggregate_logs(logs))
+
+    assert names == DAILY_FEATURE_NAMES
+    assert X.shape == (len(rows), len(names))
+    assert X.tolist() == [[row[name] for name in names] for row in rows]
+    assert y.tolist() == targets
+    if rows:
+        assert list(rows[0]) == list(names)
+
+
+def test_feature_registry_computes_each_dependency_once():
+    calls = []
+    registry = FeatureRegistry(inputs=("values",))
+
+    @registry.intermediate("total", "values")
+    def _total(values):
+        calls.append("total")
+        return sum(values)
+
+    @registry.feature("double", "total")
+    def _double(total):
+        calls.append("double")
+        return 2 * total
+
+    @registry.feature("mean", "values", "total")
+    def _mean(values, total):
+        calls.append("mean")
+        return total / len(values)
+
+    features = registry.window(values=[1, 2, 3])
+    assert list(features) == ["double", "mean"]
+    assert "total" not in features
+    assert features["mean"] == 2.0
+    assert features["mean"] == 2.0
+    assert features["double"] == 12
+    assert calls == ["total", "mean", "double"]
+    assert features.computed() == ("total", "mean", "double")
+    assert registry.requirements(["double"]) == ["total", "double"]
+
+    with pytest.raises(KeyError):
+        features["total"]
+    with pytest.raises(ValueError):
+        registry.register("broken", ("missing",), lambda x: x)
+    with pytest.raises(ValueError):
+        registry.window()
+
+
+def test_weekly_registry_matches_feature_matrix():
+    day_minutes = {f"2024-06-0{i}": minutes for i, minutes in enumerate([0, 30, 90, 45, 0, 120, 60], 1)}
+    category_minutes = {"Work": 200, "Health": 100, "Leisure": 45}
+
+    features = WEEKLY_FEATURES.window(day_minutes=day_minutes, category_minutes=category_minutes)
+    expected = weekly_feature_matrix(
+        np.array([list(day_minutes.values())]),
+        np.array([list(category_minutes.values())]),
+    )[0]
+
+    assert WEEKLY_FEATURES.names() == WEEKLY_FEATURE_NAMES
+    assert [features[name] for name in WEEKLY_FEATURE_NAMES] == pytest.approx(expected.tolist())
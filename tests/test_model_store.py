@@ -0,0 +1,180 @@
+"""
+Responsibility:
+Tests model artifact persistence and its use by the weekly pipeline.
+"""
+import os
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import pipelines.ingest as ingest
+import pipelines.run_weekly_intelligence as weekly
+from core.activity import Activity
+from core.store import Store
+from core.user import User
+from ml.model_store import ModelStore, training_fingerprint
+from ml.models import LinearRegressionModel, OnlineLinearRegressionModel
+
+
+def _fitted(cls=LinearRegressionModel, seed=0, **params):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(30, 2))
+    y = 1.0 + X @ [2.0, -3.0]
+    model = cls(["a", "b"], **params)
+    model.fit(X, y)
+    return model, X, y
+
+
+def _user(user_id: str = "model_user", days: int = 28) -> User:
+    user = User(user_id)
+    start = datetime(2026, 1, 1, 9, 0)
+    for day in range(days):
+        user.log_activity(
+            Activity(
+                name="Coding",
+                category="Work" if day % 3 else "Study",
+                duration_minutes=60 + (day * 37) % 50,
+                timestamp=start + timedelta(days=day),
+            )
+        )
+    return user
+
+
+def test_fingerprint_tracks_data_and_config():
+    _, X, y = _fitted()
+
+    base = training_fingerprint(X, y, {"solver": "lstsq"})
+    assert base == training_fingerprint(X.copy(), list(y), {"solver": "lstsq"})
+    assert base != training_fingerprint(X, y, {"solver": "qr"})
+    assert base != training_fingerprint(X, y + 1e-9, {"solver": "lstsq"})
+    assert base != training_fingerprint(X.reshape(15, 4), y, {"solver": "lstsq"})
+
+
+@pytest.mark.parametrize(
+    "cls, params",
+    [
+        (LinearRegressionModel, {"solver": "cholesky", "alpha": 0.5}),
+        (OnlineLinearRegressionModel, {"forgetting_factor": 0.95}),
+    ],
+)
+def test_saved_models_round_trip(tmp_path, cls, params):
+    model, X, _ = _fitted(cls, **params)
+    store = ModelStore(tmp_path)
+
+    manifest = store.save("u1", "abc", model, {"model_mae": 1.5})
+    loaded, loaded_manifest = store.load("u1", "abc")
+
+    assert type(loaded) is cls
+    assert loaded.get_params() == model.get_params()
+    assert loaded.predict(X) == model.predict(X)
+    assert loaded_manifest == manifest
+    assert manifest["params"]["feature_names"] == ["a", "b"]
+    assert manifest["metrics"] == {"model_mae": 1.5}
+    assert store.load("u1", "missing") is None
+
+    if cls is OnlineLinearRegressionModel:
+        loaded.partial_fit(X[:3], np.zeros(3))
+        assert loaded.n_samples == model.n_samples + 3
+
+
+def test_corrupt_artifacts_are_misses(tmp_path):
+    model, _, _ = _fitted()
+    store = ModelStore(tmp_path)
+    store.save("u1", "abc", model)
+
+    (tmp_path / "u1" / "abc.npz").write_bytes(b"not an npz")
+    assert store.load("u1", "abc") is None
+
+    calls = []
+    retrained, _ = store.get_or_train(
+        "u1", "abc", lambda: calls.append(1) or (model, {})
+    )
+    assert calls == [1]
+    assert store.load("u1", "abc") is not None
+
+
+def test_unwritable_store_returns_unsaved_model(tmp_path, caplog):
+    model, _, _ = _fitted()
+    # A file where the models dir should be makes every write fail
+    (tmp_path / "models").write_text("not a directory")
+    store = ModelStore(tmp_path / "models")
+
+    with pytest.raises(OSError):
+        store.save("u1", "abc", model)
+
+    returned, manifest = store.get_or_train("u1", "abc", lambda: (model, {"mae": 1.0}))
+    assert returned is model
+    assert manifest["metrics"] == {"mae": 1.0}
+    assert "Could not store model abc" in caplog.text
+    assert store.load("u1", "abc") is None
+
+
+def test_eviction_by_count_and_age(tmp_path):
+    model, _, _ = _fitted()
+    unlimited = ModelStore(tmp_path, max_per_user=None, max_age_days=None)
+    for i, fingerprint in enumerate(["f0", "f1", "f2"]):
+        unlimited.save("u1", fingerprint, model)
+        used = time.time() - 10 + i
+        os.utime(tmp_path / "u1" / f"{fingerprint}.json", (used, used))
+
+    store = ModelStore(tmp_path, max_per_user=2, max_age_days=1)
+    assert [f for f, _ in store.list_artifacts("u1")] == ["f2", "f1", "f0"]
+    assert store.evict("u1") == 1
+    assert store.load("u1", "f0") is None
+    assert not (tmp_path / "u1" / "f0.npz").exists()
+
+    store.load("u1", "f1")  # refreshes f1
+    assert store.evict(now=time.time() + 1.5 * 86400) == 2
+    assert store.list_artifacts("u1") == []
+
+    with pytest.raises(ValueError):
+        ModelStore(tmp_path, max_per_user=0)
+
+
+def test_weekly_pipeline_reuses_stored_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "SYNTHETIC_DATA_DIR", tmp_path / "data")
+    monkeypatch.setattr(weekly, "SYNTHETIC_DATA_DIR", tmp_path / "data")
+
+    store = Store(tmp_path / "data", compaction_threshold_bytes=None)
+    store.save_user(_user())
+    model_store = ModelStore(tmp_path / "models")
+
+    trained = []
+    real = weekly._train_and_evaluate
+    monkeypatch.setattr(
+        weekly, "_train_and_evaluate", lambda X, y: trained.append(1) or real(X, y)
+    )
+
+    first = weekly.run_weekly_intelligence("model_user", cache=None, model_store=model_store)
+    second = weekly.run_weekly_intelligence("model_user", cache=None, model_store=model_store)
+
+    assert first["evaluation"]["ml_used"]
+    assert first == second
+    assert len(trained) == 1
+    assert first == weekly.run_weekly_intelligence("model_user", cache=None, model_store=None)
+
+    store.log_activity(
+        "model_user",
+        Activity("Gym", "Health", 45, datetime(2026, 1, 29, 7, 0)),
+    )
+    weekly.run_weekly_intelligence("model_user", cache=None, model_store=model_store)
+
+    assert len(trained) == 3
+    assert len(model_store.list_artifacts("model_user")) == 2
+
+
+def test_weekly_pipeline_survives_unwritable_model_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "SYNTHETIC_DATA_DIR", tmp_path / "data")
+    monkeypatch.setattr(weekly, "SYNTHETIC_DATA_DIR", tmp_path / "data")
+
+    Store(tmp_path / "data", compaction_threshold_bytes=None).save_user(_user())
+    (tmp_path / "models").write_text("not a directory")
+
+    report = weekly.run_weekly_intelligence(
+        "model_user", cache=None, model_store=ModelStore(tmp_path / "models")
+    )
+
+    assert report["evaluation"]["ml_used"]
+    assert report == weekly.run_weekly_intelligence("model_user", cache=None, model_store=None)
@@ -1,5 +1,6 @@
-from insights.risk import classify_weekly_risk
+from insights.risk import RISK_FEATURES, classify_weekly_risk
 from insights.risk import detect_risk_transition
+from ml.weekly_features import WEEKLY_FEATURES
 
 def test_classify_weekly_risk():
     # Test data for various risk levels
@@ -31,4 +32,18 @@ def test_detect_risk_transition():
 
     for prev, curr, expected_transition in test_cases:
         result = detect_risk_transition(prev, curr)
-        assert result == expected_transition, f"Failed for prev: {prev}, curr: {curr}"
\ No newline at end of file
+        assert result == expected_transition, f"Failed for prev: {prev}, curr: {curr}"
+
+
+def test_classify_weekly_risk_reads_only_risk_features():
+    features = WEEKLY_FEATURES.window(
+        day_minutes={"2024-06-01": 300, "2024-06-02": 10, "2024-06-03": 0},
+        category_minutes={"Work": 290, "Health": 20},
+    )
+
+    result = classify_weekly_risk(features)
+
+    computed = set(features.computed()) & set(WEEKLY_FEATURES.names())
+    assert computed == set(RISK_FEATURES)
+    assert result == classify_weekly_risk(dict(features))
+    assert result["risk_level"] == "R3"
@@ -0,0 +1,381 @@
+"""
+Responsibility:
+Tests persistence of users through the Store, including the journal.
+"""
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from core.activity import Activity
+from core.lazy_user import LazyUser
+from core.snapshot import read_snapshot
+from core.store import Store, _JsonLogStream, _decode_stream_entry
+from core.user import User
+
+
+def _activity(day: int, minutes: int = 30) -> Activity:
+    return Activity(
+        name="Reading",
+        category="Study",
+        duration_minutes=minutes,
+        timestamp=datetime(2026, 1, 1, 9, 0) + timedelta(days=day),
+        mood=3,
+    )
+
+
+def _totals(user: User) -> dict:
+    return {
+        log.get_date().isoformat(): log.total_duration()
+        for log in user.get_all_logs()
+    }
+
+
+def test_save_and_load_round_trip(tmp_path):
+    store = Store(tmp_path)
+    user = User("u1")
+    for day in range(3):
+        user.log_activity(_activity(day, 30 + day))
+
+    store.save_user(user)
+    loaded = store.load_user("u1")
+
+    assert _totals(loaded) == _totals(user)
+
+
+def test_missing_user_returns_none(tmp_path):
+    assert Store(tmp_path).load_user("nobody") is None
+
+
+def test_appended_activities_are_replayed(tmp_path):
+    store = Store(tmp_path, compaction_threshold_bytes=None)
+    user = User("u1")
+    user.log_activity(_activity(0))
+    store.save_user(user)
+
+    store.append_activities("u1", [_activity(0, 15), _activity(1, 45)])
+    store.log_activity("u1", _activity(2, 60))
+
+    loaded = store.load_user("u1")
+    assert _totals(loaded) == {
+        "2026-01-01": 45,
+        "2026-01-02": 45,
+        "2026-01-03": 60,
+    }
+
+
+def test_journal_without_snapshot_loads(tmp_path):
+    store = Store(tmp_path, compaction_threshold_bytes=None)
+    store.log_activity("fresh", _activity(0))
+
+    assert _totals(store.load_user("fresh")) == {"2026-01-01": 30}
+
+
+def test_compaction_folds_segments_into_snapshot(tmp_path):
+    store = Store(tmp_path, compaction_threshold_bytes=None)
+    for day in range(5):
+        store.log_activity("u1", _activity(day))
+
+    before = _totals(store.load_user("u1"))
+    store.compact("u1")
+
+    raw = json.loads((tmp_path / "u1.json").read_text(encoding="utf-8"))
+    assert raw["journal_seq"] == 1
+    assert not (tmp_path / "journal" / "u1" / "00000001.jsonl").exists()
+    assert _totals(store.load_user("u1")) == before
+
+    store.log_activity("u1", _activity(5))
+    assert len(store.load_user("u1").get_all_logs()) == 6
+
+
+def test_crash_before_segment_cleanup_does_not_duplicate(tmp_path):
+    store = Store(tmp_path, compaction_threshold_bytes=None)
+    store.log_activity("u1", _activity(0))
+    segment = tmp_path / "journal" / "u1" / "00000001.jsonl"
+    leftover = segment.read_bytes()
+
+    store.compact("u1")
+    # Simulate a crash after the snapshot rename but before deletion
+    segment.write_bytes(leftover)
+
+    assert _totals(store.load_user("u1")) == {"2026-01-01": 30}
+
+
+def test_torn_journal_line_is_skipped(tmp_path):
+    store = Store(tmp_path, compaction_threshold_bytes=None)
+    store.log_activity("u1", _activity(0))
+
+    segment = tmp_path / "journal" / "u1" / "00000001.jsonl"
+    with segment.open("a", encoding="utf-8") as f:
+        f.write('{"name": "Read')
+
+    store.log_activity("u1", _activity(1))
+
+    assert _totals(store.load_user("u1")) == {
+        "2026-01-01": 30,
+        "2026-01-02": 30,
+    }
+
+
+def test_background_compaction_is_triggered(tmp_path):
+    store = Store(tmp_path, compaction_threshold_bytes=1)
+    store.log_activity("u1", _activity(0))
+
+    thread = store.compact("u1", background=True)
+    if thread is not None:
+        thread.join()
+
+    assert (tmp_path / "u1.json").exists()
+    assert _totals(store.load_user("u1")) == {"2026-01-01": 30}
+
+
+def test_binary_snapshot_round_trip(tmp_path):
+    store = Store(tmp_path, suffix=".snap")
+    user = User("u1")
+    for day in range(4):
+        user.log_activity(_activity(day, 20 + day))
+
+    store.save_user(user)
+    loaded = store.load_user("u1")
+
+    assert (tmp_path / "u1.snap").exists()
+    assert _totals(loaded) == _totals(user)
+
+
+def test_convert_between_formats_is_lossless(tmp_path):
+    user = User("u1")
+    user.log_activity(_activity(0, 25))
+    user.log_activity(
+        Activity(
+            name="Chess",
+            category="Hobby",
+            duration_minutes=40,
+            timestamp=datetime(2026, 1, 2, 21, 15, 30, 123456),
+        )
+    )
+    Store(tmp_path).save_user(user)
+
+    Store.convert(tmp_path / "u1.json", tmp_path / "u1.snap")
+    Store.convert(tmp_path / "u1.snap", tmp_path / "copy.json")
+
+    original = json.loads((tmp_path / "u1.json").read_text(encoding="utf-8"))
+    restored = json.loads((tmp_path / "copy.json").read_text(encoding="utf-8"))
+    assert restored == original
+
+
+def test_binary_snapshot_is_memory_mapped(tmp_path):
+    store = Store(tmp_path, suffix=".snap")
+    user = User("u1")
+    user.log_activity(_activity(0))
+    store.save_user(user)
+
+    user_id, table, _ = read_snapshot(tmp_path / "u1.snap")
+
+    assert user_id == "u1"
+    assert not table.duration.flags.owndata
+    assert not table.duration.flags.writeable
+
+
+def test_journal_compacts_into_binary_snapshot(tmp_path):
+    store = Store(tmp_path, compaction_threshold_bytes=None, suffix=".snap")
+    for day in range(3):
+        store.log_activity("u1", _activity(day))
+
+    store.compact("u1")
+    store.log_activity("u1", _activity(3))
+
+    assert not (tmp_path / "u1.json").exists()
+    assert len(store.load_user("u1").get_all_logs()) == 4
+
+
+def _store_with_days(tmp_path, suffix: str, days: int) -> Store:
+    store = Store(tmp_path, compaction_threshold_bytes=None, suffix=suffix)
+    user = User("u1")
+    for day in range(days):
+        user.log_activity(_activity(day, 10 + day))
+    store.save_user(user)
+    return store
+
+
+def test_windowed_load_reads_only_requested_days(tmp_path):
+    for suffix in (".json", ".snap"):
+        store = _store_with_days(tmp_path / suffix[1:], suffix, 30)
+
+        user = store.load_user("u1", start=date(2026, 1, 10), end=date(2026, 1, 12))
+
+        assert _totals(user) == {
+            "2026-01-10": 19,
+            "2026-01-11": 20,
+            "2026-01-12": 21,
+        }
+
+
+def test_lazy_user_decodes_days_on_access(tmp_path):
+    store = _store_with_days(tmp_path, ".json", 10)
+
+    user = store.load_user("u1", start=date(2026, 1, 3))
+
+    assert isinstance(user, LazyUser)
+    assert len(user.get_dates()) == 8
+    assert user.get_day_log(date(2026, 1, 5)).total_duration() == 14
+    assert user.get_day_log(date(2026, 1, 1)) is None
+
+
+def test_windowed_load_includes_journal_tail(tmp_path):
+    store = _store_with_days(tmp_path, ".json", 5)
+    store.log_activity("u1", _activity(4, 5))
+    store.log_activity("u1", _activity(0, 5))
+
+    user = store.load_user("u1", start=date(2026, 1, 5))
+
+    assert _totals(user) == {"2026-01-05": 19}
+
+
+def test_window_loaded_user_cannot_overwrite_history(tmp_path):
+    for suffix in (".json", ".snap"):
+        store = _store_with_days(tmp_path / suffix[1:], suffix, 10)
+        store.log_activity("u1", _activity(10))
+        before = _totals(store.load_user("u1"))
+
+        user = store.load_user("u1", start=date(2026, 1, 9))
+        assert user.get_window() == (date(2026, 1, 9), None)
+        user.log_activity(_activity(11))
+
+        with pytest.raises(ValueError):
+            store.save_user(user)
+
+        assert store.load_user("u1").get_window() is None
+        assert _totals(store.load_user("u1")) == before
+
+
+def test_stale_index_is_rebuilt(tmp_path):
+    store = _store_with_days(tmp_path, ".json", 5)
+
+    (tmp_path / "u1.json").write_text(
+        json.dumps({"user_id": "u1", "logs": [
+            {"date": "2026-01-21", "activities": [
+                {
+                    "name": "Reading",
+                    "category": "Study",
+                    "duration_minutes": 99,
+                    "timestamp": "2026-01-21T09:00:00",
+                    "mood": None,
+                }
+            ]}
+        ]}),
+        encoding="utf-8",
+    )
+
+    assert store.date_bounds("u1") == (date(2026, 1, 21), date(2026, 1, 21))
+    assert _totals(store.load_user("u1", start=date(2026, 1, 20))) == {
+        "2026-01-21": 99,
+    }
+
+
+def test_unwritable_index_falls_back_to_memory(tmp_path):
+    store = _store_with_days(tmp_path, ".json", 5)
+    # A directory in the sidecar's place makes every index write fail
+    (tmp_path / "u1.idx").unlink(missing_ok=True)
+    (tmp_path / "u1.idx").mkdir()
+
+    assert store.date_bounds("u1") == (date(2026, 1, 1), date(2026, 1, 5))
+    assert _totals(store.load_user("u1", start=date(2026, 1, 4))) == {
+        "2026-01-04": 13,
+        "2026-01-05": 14,
+    }
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["u1.idx", "u1.json"]
+
+
+def test_date_bounds(tmp_path):
+    store = _store_with_days(tmp_path, ".snap", 7)
+    store.log_activity("u1", _activity(9))
+
+    assert store.date_bounds("u1") == (date(2026, 1, 1), date(2026, 1, 10))
+    assert store.date_bounds("missing") is None
+
+
+def test_data_version_changes_on_every_write(tmp_path):
+    store = Store(tmp_path, compaction_threshold_bytes=None)
+    assert store.data_version("u1") is None
+
+    user = User("u1")
+    user.log_activity(_activity(0))
+    store.save_user(user)
+    saved = store.data_version("u1")
+
+    store.log_activity("u1", _activity(1))
+    appended = store.data_version("u1")
+
+    assert saved is not None
+    assert appended != saved
+    assert store.data_version("u1") == appended
+
+
+def test_write_listeners_are_notified(tmp_path):
+    store = Store(tmp_path, compaction_threshold_bytes=None)
+    calls = []
+    listener = lambda data_dir, user_id: calls.append((data_dir, user_id))
+
+    Store.add_write_listener(listener)
+    try:
+        user = User("u1")
+        user.log_activity(_activity(0))
+        store.save_user(user)
+        store.log_activity("u1", _activity(1))
+    finally:
+        Store.remove_write_listener(listener)
+
+    store.log_activity("u1", _activity(2))
+    assert calls == [(tmp_path.resolve(), "u1")] * 2
+
+
+def test_json_log_stream_handles_chunk_boundaries_and_unicode(tmp_path):
+    store = Store(tmp_path)
+    user = User("u1")
+    for day in range(5):
+        user.log_activity(
+            Activity("Café ☕", "Leisure", 20 + day, datetime(2026, 1, 1, 9) + timedelta(days=day))
+        )
+    store.save_user(user)
+
+    path = tmp_path / "u1.json"
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    path.write_text(json.dumps(raw, ensure_ascii=False), encoding="utf-8")
+
+    for chunk_size in (1, 13, 1 << 20):
+        stream = _JsonLogStream(path, chunk_size)
+        entries = [_decode_stream_entry(entry, text) for entry, text, _, _ in stream]
+        assert entries == raw["logs"]
+        assert stream.user_id == "u1"
+
+    logs = list(store.iter_day_logs("u1"))
+    assert logs == raw["logs"]
+
+
+def test_iter_day_logs_merges_journal_and_respects_window(tmp_path):
+    for suffix in (".json", ".snap"):
+        store = Store(tmp_path / suffix[1:], compaction_threshold_bytes=None, suffix=suffix)
+        user = User("u1")
+        for day in (0, 2, 4):
+            user.log_activity(_activity(day))
+        store.save_user(user)
+        store.append_activities("u1", [_activity(1, 10), _activity(2, 15), _activity(6, 5)])
+
+        stream = store.iter_day_logs("u1")
+        store.log_activity("u1", _activity(3, 99))  # after the stream was opened
+
+        assert [
+            (log["date"], sum(a["duration_minutes"] for a in log["activities"]))
+            for log in stream
+        ] == [
+            ("2026-01-01", 30),
+            ("2026-01-02", 10),
+            ("2026-01-03", 45),
+            ("2026-01-05", 30),
+            ("2026-01-07", 5),
+        ]
+
+        window = store.iter_day_logs("u1", start=date(2026, 1, 3), end=date(2026, 1, 4))
+        assert [log["date"] for log in window] == ["2026-01-03", "2026-01-04"]
+
+    assert list(Store(tmp_path).iter_day_logs("nobody")) == []
@@ -1,12 +1,34 @@
+import random
 from datetime import datetime, timedelta
 
+import numpy as np
+import pytest
+
+from analytics.aggregations import aggregate_user
+from analytics.windows import GAP_INSUFFICIENT, GAP_SKIP, GAP_ZERO_FILL
 from core.activity import Activity
+from core.columnar import ActivityTable, ColumnarUser
+from core.day_log import DayLog
 from core.user import User
-from ml.train import build_weekly_training_data
+from config.settings import MIN_SAMPLES_FOR_TRAINING
+from ml.evaluate_weekly_model import evaluate_weekly_holdout_baseline, evaluate_weekly_model
+from ml.train import (
+    build_sliding_weekly_training_data,
+    build_weekly_training_data,
+    weekly_feature_window,
+)
+from ml.train_weekly_model import train_weekly_model, train_weekly_models, update_weekly_model
+from ml.weekly_features import (
+    WEEKLY_FEATURE_NAMES,
+    build_cohort_weekly_training_data,
+    sliding_weekly_features,
+    weekly_feature_matrix,
+)
+from pipelines.week_utils import split_into_weeks
 
 
-def _make_user_with_n_days(n: int) -> User:
-    user = User("test_user")
+def _make_user_with_n_days(n: int, user_id: str = "test_user") -> User:
+    user = User(user_id)
     today = datetime.utcnow().date()
 
     for i in range(n):
@@ -83,3 +105,233 @@ def test_category_dominance_ratio_single_category():
 
     assert "category_dominance_ratio" in features
     assert features["category_dominance_ratio"] == 1.0
+
+
+def _random_user(user_id: str, rng: random.Random, user_cls=User) -> User:
+    user = user_cls(user_id)
+    start = datetime(2026, 1, 1, 8, 0)
+    categories = ["Work", "Study", "Health", "Leisure"][: rng.randint(1, 4)]
+
+    for day in range(rng.randint(8, 35)):
+        if rng.random() < 0.2:
+            continue
+        for hour in range(rng.randint(1, 3)):
+            user.log_activity(
+                Activity(
+                    name="Task",
+                    category=rng.choice(categories),
+                    duration_minutes=rng.randint(5, 90),
+                    timestamp=start + timedelta(days=day, hours=hour),
+                )
+            )
+
+    return user
+
+
+def _assert_cohort_matches_per_user(users, **options):
+    user_ids, sample_user, X, y = build_cohort_weekly_training_data(users, **options)
+
+    assert user_ids == [user.get_user_id() for user in users]
+    assert X.shape == (len(y), len(WEEKLY_FEATURE_NAMES))
+    assert np.all(np.diff(sample_user) >= 0)
+    for index, user in enumerate(users):
+        X_user, y_user = build_sliding_weekly_training_data(user, **options)
+        rows = sample_user == index
+        assert X[rows] == pytest.approx(X_user)
+        assert y[rows].tolist() == y_user.tolist()
+    return sample_user
+
+
+def test_cohort_features_match_per_user_training_data():
+    rng = random.Random(11)
+    users = [_random_user(f"u{i}", rng) for i in range(25)]
+    users.append(_random_user("columnar", rng, ColumnarUser))
+
+    for gaps in (GAP_SKIP, GAP_ZERO_FILL, GAP_INSUFFICIENT):
+        _assert_cohort_matches_per_user(users, gaps=gaps)
+        _assert_cohort_matches_per_user(users, stride=1, lookback_days=None, gaps=gaps)
+
+    # Every week of every user, not one sample per user
+    sample_user = _assert_cohort_matches_per_user(users, stride=1, gaps=GAP_ZERO_FILL)
+    samples_per_user = np.bincount(sample_user, minlength=len(users))
+    assert samples_per_user.max() > 1
+    assert len(sample_user) == samples_per_user.sum() > len(users)
+
+
+def test_cohort_features_count_logged_days_without_activities():
+    start = datetime(2026, 1, 1, 8, 0)
+    users = []
+    for i, empty_days in enumerate(((3,), (9, 15), (14, 16, 18, 20))):
+        user = User(f"empty{i}")
+        for day in range(21):
+            if day in empty_days:
+                user.add_activity_log(DayLog((start + timedelta(days=day)).date()))
+            else:
+                user.log_activity(
+                    Activity("Task", "Work", 30 + day, start + timedelta(days=day))
+                )
+        users.append(user)
+    users.append(ColumnarUser(users[-1].get_user_id(), ActivityTable.from_user(users[-1])))
+
+    for gaps in (GAP_SKIP, GAP_ZERO_FILL, GAP_INSUFFICIENT):
+        sample_user = _assert_cohort_matches_per_user(
+            users, stride=1, lookback_days=None, gaps=gaps
+        )
+        # 21 logged days hold 8 pairs of weeks per user
+        assert np.bincount(sample_user).tolist() == [8] * len(users)
+
+
+def test_weekly_feature_matrix_edge_cases():
+    X = weekly_feature_matrix(
+        np.array([[60] * 7, [0] * 7]),
+        np.array([[420, 0], [0, 0]]),
+    )
+
+    features = dict(zip(WEEKLY_FEATURE_NAMES, X[0]))
+    assert features["category_balance"] == 1.0
+    assert features["daily_variability"] == 0.0
+    assert features["dominance_ratio"] == pytest.approx(1 / 7)
+    assert X[1].tolist() == [0.0] * len(WEEKLY_FEATURE_NAMES)
+
+
+def _first_days(user: User, n: int) -> User:
+    truncated = User(user.get_user_id())
+    for day_log in user.get_all_logs()[:n]:
+        truncated.add_activity_log(day_log)
+    return truncated
+
+
+def test_sliding_windows_match_weekly_features_of_each_prefix():
+    user = _random_user("slider", random.Random(3))
+    while len(user.get_all_logs()) < 20:
+        user = _random_user("slider", random.Random(len(user.get_all_logs())))
+    days = user.get_all_logs()
+
+    X, y = build_sliding_weekly_training_data(user, gaps=GAP_SKIP)
+
+    assert X.shape == (len(days) - 13, len(WEEKLY_FEATURE_NAMES))
+    for i in range(7, len(X)):
+        X_dicts, _ = build_weekly_training_data(_first_days(user, i + 7), gaps=GAP_SKIP)
+        assert X[i] == pytest.approx([X_dicts[0][name] for name in WEEKLY_FEATURE_NAMES])
+        assert y[i] == sum(log.total_duration() for log in days[i + 7:i + 14])
+
+
+def test_training_and_prediction_windows_agree_under_zero_fill():
+    rng = random.Random(5)
+    user = User("gappy")
+    start = datetime(2026, 1, 1, 8, 0)
+    for day in range(40):
+        if day % 5 in (1, 3) or day in (20, 21, 22):
+            continue  # days without data
+        user.log_activity(
+            Activity("Task", rng.choice(["Work", "Study"]), rng.randint(10, 90), start + timedelta(days=day))
+        )
+
+    X, y = build_sliding_weekly_training_data(user, stride=1, lookback_days=None, gaps=GAP_ZERO_FILL)
+    aggregates = aggregate_user(user)
+    current_week, previous_week = split_into_weeks(aggregates.daily_totals, gaps=GAP_ZERO_FILL)
+
+    # One sample per pair of calendar weeks; the newest one is the pair
+    # the report predicts from
+    assert len(X) == 40 - 13
+    assert X[-1] == pytest.approx(
+        [weekly_feature_window(previous_week, aggregates)[name] for name in WEEKLY_FEATURE_NAMES]
+    )
+    assert y[-1] == sum(current_week.values())
+
+    # The prediction features are the next training window once a later day arrives
+    X_pred, _ = build_weekly_training_data(user, gaps=GAP_ZERO_FILL)
+    user.log_activity(Activity("Task", "Work", 15, start + timedelta(days=46)))
+    X_next, _ = build_sliding_weekly_training_data(user, stride=1, lookback_days=None, gaps=GAP_ZERO_FILL)
+    assert X_next[-1] == pytest.approx([X_pred[0][name] for name in WEEKLY_FEATURE_NAMES])
+
+    # "insufficient" keeps only pairs of weeks without a missing day
+    X_full, _ = build_sliding_weekly_training_data(
+        user, stride=1, lookback_days=None, gaps=GAP_INSUFFICIENT
+    )
+    assert len(X_full) == 0
+
+
+def test_sliding_stride_and_lookback():
+    totals = np.arange(1, 31, dtype=float)
+    categories = totals[:, None]
+
+    X, y = sliding_weekly_features(totals, categories, stride=5)
+    assert X[:, 0].tolist() == [
+        sum(range(2, 9)), sum(range(7, 14)), sum(range(12, 19)), sum(range(17, 24))
+    ]
+    assert y[-1] == sum(range(24, 31))
+
+    X, y = sliding_weekly_features(totals, categories, lookback_days=15)
+    assert len(X) == 2
+    assert X[0, 0] == sum(range(16, 23))
+
+    X, y = sliding_weekly_features(totals[:13], categories[:13])
+    assert X.shape == (0, len(WEEKLY_FEATURE_NAMES))
+
+    with pytest.raises(ValueError):
+        sliding_weekly_features(totals, categories, stride=0)
+
+
+def test_train_weekly_model_uses_sliding_samples():
+    short = _make_user_with_n_days(14 + MIN_SAMPLES_FOR_TRAINING - 2)
+    with pytest.raises(ValueError):
+        train_weekly_model(short)
+
+    user = _make_user_with_n_days(60)
+    model, coefficients = train_weekly_model(user)
+    X, y = build_sliding_weekly_training_data(user)
+
+    assert list(coefficients) == list(WEEKLY_FEATURE_NAMES)
+    assert model.predict([dict(zip(WEEKLY_FEATURE_NAMES, X[0]))])[0] == pytest.approx(y[0])
+
+    y_true, y_pred = evaluate_weekly_model(X, y)
+    assert len(y_true) == len(y_pred) == len(X) - int(len(X) * 0.8)
+
+
+def test_holdout_baseline_scores_the_model_hold_out_samples():
+    user = User("varied")
+    start = datetime(2026, 1, 1, 8, 0)
+    for day in range(60):
+        user.log_activity(
+            Activity("Task", "Work", 30 + (day * 37) % 90, start + timedelta(days=day))
+        )
+    X, y = build_sliding_weekly_training_data(user, lookback_days=None, stride=1)
+
+    y_true_model, _ = evaluate_weekly_model(X, y, stride=1)
+    y_true, y_pred = evaluate_weekly_holdout_baseline(X, y)
+
+    assert y_true == y_true_model
+    # With stride 1, the window a week earlier targets this window's week
+    split = len(X) - len(y_true)
+    assert y_pred == y[split - 7:len(X) - 7].tolist()
+
+
+def test_update_weekly_model_only_feeds_new_windows():
+    user = _make_user_with_n_days(40)
+    X, y = build_sliding_weekly_training_data(user, lookback_days=None)
+
+    model, _ = update_weekly_model(None, training_data=(X[:-5], y[:-5]))
+    assert model.n_samples == len(X) - 5
+
+    model, coefficients = update_weekly_model(None, model, training_data=(X, y))
+    assert model.n_samples == len(X)
+    assert list(coefficients) == list(WEEKLY_FEATURE_NAMES)
+
+    with pytest.raises(ValueError):
+        update_weekly_model(None, model, training_data=(X[:3], y[:3]))
+
+
+def test_train_weekly_models_matches_individual_training():
+    users = [_make_user_with_n_days(n, f"user_{i}") for i, n in enumerate((40, 60, 15))]
+
+    table = train_weekly_models(users)
+
+    assert table.user_ids == ["user_0", "user_1", "user_2"]
+    assert np.isnan(table.intercept("user_2"))
+    for user in users[:2]:
+        model, _ = train_weekly_model(user)
+        X, _ = build_sliding_weekly_training_data(user)
+        row = table.row(user.get_user_id())
+        batched = table.intercepts[row] + X @ table.weights[row]
+        assert batched == pytest.approx(model.predict(X), rel=1e-6, abs=1e-6)
@@ -3,6 +3,7 @@ Responsibility:
 Tests week-based rolling window utilities.
 """
 
+from analytics.windows import GAP_INSUFFICIENT, GAP_SKIP, GAP_ZERO_FILL
 from pipelines.week_utils import split_into_weeks
 
 
@@ -54,7 +55,7 @@ def test_split_into_weeks_less_than_seven_days():
         "2024-06-03": 20,
     }
 
-    current_week, previous_week = split_into_weeks(daily_totals)
+    current_week, previous_week = split_into_weeks(daily_totals, gaps=GAP_SKIP)
 
     assert current_week == daily_totals
     assert previous_week is None
@@ -82,3 +83,32 @@ def test_split_into_weeks_empty_input():
 
     assert current_week == {}
     assert previous_week is None
+
+
+def test_split_into_weeks_gap_policies():
+    daily_totals = {
+        "2024-06-01": 10,
+        "2024-06-05": 20,
+        "2024-06-10": 30,
+    }
+
+    current_week, previous_week = split_into_weeks(daily_totals, gaps=GAP_SKIP)
+    assert current_week == daily_totals
+    assert previous_week is None
+
+    current_week, previous_week = split_into_weeks(daily_totals, gaps=GAP_ZERO_FILL)
+    assert current_week == {
+        "2024-06-04": 0,
+        "2024-06-05": 20,
+        "2024-06-06": 0,
+        "2024-06-07": 0,
+        "2024-06-08": 0,
+        "2024-06-09": 0,
+        "2024-06-10": 30,
+    }
+    # The previous calendar week would start before the first active day
+    assert previous_week is None
+
+    current_week, previous_week = split_into_weeks(daily_totals, gaps=GAP_INSUFFICIENT)
+    assert current_week == {}
+    assert previous_week is None
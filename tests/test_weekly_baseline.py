@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 
+from analytics.windows import GAP_INSUFFICIENT, GAP_SKIP, GAP_ZERO_FILL
 from core.activity import Activity
 from core.user import User
 from ml.evaluate_weekly_model import evaluate_weekly_baseline
@@ -50,3 +51,20 @@ def test_constant_activity_baseline_correct():
     # Each week: 7 × 60 = 420
     assert y_pred == [420.0, 420.0]
     assert y_true == [420.0, 420.0]
+
+
+
+def test_gap_policies_for_missing_days():
+    user = User("test_user")
+    start = datetime(2024, 6, 3)
+    for i in range(21):
+        if i == 10:
+            continue  # one day without data in the second week
+        user.log_activity(
+            Activity(name="Work", category="Work", duration_minutes=60, timestamp=start + timedelta(days=i))
+        )
+
+    # 20 active days: two 7-active-day weeks, the second spanning the gap
+    assert evaluate_weekly_baseline(user, gaps=GAP_SKIP) == ([420.0], [420.0])
+    assert evaluate_weekly_baseline(user, gaps=GAP_ZERO_FILL) == ([360.0, 420.0], [420.0, 360.0])
+    assert evaluate_weekly_baseline(user, gaps=GAP_INSUFFICIENT) == ([], [])
@@ -0,0 +1,165 @@
+"""
+Responsibility:
+Tests the asynchronous weekly report service.
+"""
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pipelines.weekly_service import WeeklyReportService, start_weekly_report_server
+
+
+def _process_report(user_id: str) -> dict:
+    return {"status": {"state": "ok"}, "user": user_id}
+
+
+class _FakeBackend:
+    """
+    Slow report function and a settable data version per user.
+    """
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.versions = {}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def report(self, user_id):
+        with self._lock:
+            self.calls.append(user_id)
+        time.sleep(self.delay)
+        if user_id.startswith("bad"):
+            raise RuntimeError(f"cannot process {user_id}")
+        if user_id.startswith("ghost"):
+            return {"status": {"state": "error", "message": "No data found for user"}}
+        return {"user": user_id, "version": self.versions.get(user_id)}
+
+    def version(self, user_id):
+        return self.versions.get(user_id, 1)
+
+
+def _service(backend, **options):
+    return WeeklyReportService(
+        executor=ThreadPoolExecutor(max_workers=4),
+        report_fn=backend.report,
+        version_fn=backend.version,
+        **options,
+    )
+
+
+def test_concurrent_requests_are_coalesced():
+    backend = _FakeBackend()
+    service = _service(backend)
+
+    async def burst():
+        return await asyncio.gather(
+            *(service.get_report(user) for user in ["alice"] * 40 + ["bob"] * 10)
+        )
+
+    reports = asyncio.run(burst())
+
+    assert sorted(backend.calls) == ["alice", "bob"]
+    assert reports[0] is reports[39]
+    assert reports[-1]["user"] == "bob"
+    assert service.stats["coalesced"] == 48
+
+
+def test_reports_are_cached_until_data_changes():
+    backend = _FakeBackend(delay=0.0)
+    service = _service(backend, max_reports=2)
+
+    async def scenario():
+        first = await service.get_report("alice")
+        again = await service.get_report("alice")
+        backend.versions["alice"] = 2
+        changed = await service.get_report("alice")
+        # Filling the cache evicts the least recently used user
+        await service.get_report("bob")
+        await service.get_report("carol")
+        await service.get_report("alice")
+        return first, again, changed
+
+    first, again, changed = asyncio.run(scenario())
+
+    assert first is again
+    assert changed["version"] == 2
+    assert backend.calls == ["alice", "alice", "bob", "carol", "alice"]
+    assert service.stats["cache_hits"] == 1
+
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    backend = _FakeBackend()
+    service = _service(backend)
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(service.get_report("bad_user") for _ in range(5)),
+            return_exceptions=True,
+        )
+        with pytest.raises(RuntimeError):
+            await service.get_report("bad_user")
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert backend.calls == ["bad_user", "bad_user"]
+
+
+def test_reports_run_in_a_process_pool():
+    service = WeeklyReportService(
+        max_workers=1, report_fn=_process_report, version_fn=lambda user_id: 1
+    )
+    try:
+        report = asyncio.run(service.get_report("alice"))
+    finally:
+        service.close()
+
+    assert report == {"status": {"state": "ok"}, "user": "alice"}
+
+
+def test_http_server_serves_reports_over_keep_alive():
+    backend = _FakeBackend(delay=0.0)
+    service = _service(backend)
+
+    async def request(reader, writer, path):
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: test\r\n\r\n".encode("ascii"))
+        await writer.drain()
+        head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        length = int(head.split("Content-Length: ")[1].split("\r\n")[0])
+        body = json.loads(await reader.readexactly(length))
+        return int(head.split()[1]), body
+
+    async def scenario():
+        server = await start_weekly_report_server(service, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            return [
+                await request(reader, writer, path)
+                for path in [
+                    "/reports/alice",
+                    "/reports/alice",
+                    "/reports/..%2Fx",
+                    "/nope",
+                    "/reports/ghost",
+                    "/health",
+                ]
+            ]
+        finally:
+            writer.close()
+            server.close()
+            await server.wait_closed()
+
+    responses = asyncio.run(scenario())
+
+    assert responses[0] == (200, {"user": "alice", "version": None})
+    assert responses[1] == responses[0]
+    assert [status for status, _ in responses[2:]] == [400, 404, 404, 200]
+    assert responses[4][1]["status"]["state"] == "error"
+    assert responses[5][1]["cache_hits"] == 1
+    assert backend.calls == ["alice", "ghost"]
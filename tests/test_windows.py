@@ -0,0 +1,83 @@
+"""
+Responsibility:
+Tests the day windowing engine.
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from analytics.windows import GAP_INSUFFICIENT, GAP_SKIP, GAP_ZERO_FILL, DayWindows
+
+
+def _ordinal(day: str) -> int:
+    return date.fromisoformat(day).toordinal()
+
+
+def _windows(days, values=None):
+    return DayWindows([_ordinal(d) for d in days], values)
+
+
+def test_rolling_skip_counts_days_with_data():
+    windows = _windows(["2024-01-01", "2024-03-01", "2024-03-02", "2024-06-01"], [1, 2, 3, 4])
+
+    current, previous = windows.rolling(days=2, count=2, gaps=GAP_SKIP)
+
+    assert (current.lo, current.hi, current.sufficient) == (2, 4, True)
+    assert current.start == _ordinal("2024-03-02")
+    assert current.stop == _ordinal("2024-06-02")
+    assert (previous.lo, previous.hi) == (0, 2)
+    assert windows.totals([current, previous]).tolist() == [7.0, 3.0]
+
+
+def test_rolling_calendar_policies_mark_gaps():
+    windows = _windows(["2024-06-01", "2024-06-02", "2024-06-05", "2024-06-07"], [10, 20, 30, 40])
+
+    current, previous, oldest, before = windows.rolling(days=3, count=4, gaps=GAP_ZERO_FILL)
+    assert current.start == _ordinal("2024-06-05")
+    assert windows.totals([current, previous, oldest]).tolist() == [70.0, 20.0, 10.0]
+    assert previous.sufficient
+    assert not oldest.sufficient  # starts before the first day
+    assert not before.sufficient
+
+    current, previous = windows.rolling(days=3, count=2, gaps=GAP_INSUFFICIENT)
+    assert not current.sufficient
+    assert previous.days_with_data() == 1
+
+    lenient = windows.rolling(days=3, count=1, gaps=GAP_INSUFFICIENT, min_days=2)
+    assert lenient[0].sufficient
+
+
+def test_iso_weeks_and_anchored_windows():
+    # 2024-06-01 is a Saturday
+    windows = _windows(["2024-06-01", "2024-06-04", "2024-06-17"], [1, 2, 3])
+
+    weeks = windows.iso_weeks()
+    assert [date.fromordinal(w.start).isoformat() for w in weeks] == [
+        "2024-06-17", "2024-06-10", "2024-06-03", "2024-05-27",
+    ]
+    assert all(date.fromordinal(w.start).weekday() == 0 for w in weeks)
+    assert windows.totals(weeks).tolist() == [3.0, 0.0, 2.0, 1.0]
+
+    fortnights = windows.anchored(_ordinal("2024-06-04"), days=14, count=2)
+    assert [(w.start, w.stop) for w in fortnights] == [
+        (_ordinal("2024-06-04"), _ordinal("2024-06-18")),
+        (_ordinal("2024-05-21"), _ordinal("2024-06-04")),
+    ]
+
+    with pytest.raises(ValueError):
+        windows.anchored(_ordinal("2024-06-04"), gaps=GAP_SKIP)
+
+
+def test_windows_match_full_scan_on_sparse_multi_year_history():
+    rng = np.random.default_rng(0)
+    days = np.sort(rng.choice(np.arange(730000, 734000), size=500, replace=False))
+    values = rng.integers(0, 300, size=500).astype(float)
+    windows = DayWindows(days, values)
+
+    for window in windows.iso_weeks(gaps=GAP_INSUFFICIENT, min_days=1):
+        inside = (days >= window.start) & (days < window.stop)
+        assert window.days_with_data() == inside.sum()
+        assert windows.total(window) == values[inside].sum()
+        assert window.sufficient == bool(inside.any())